@@ -0,0 +1,134 @@
+"""
+Reportes analíticos del inventario de Campitos Store Ecuador con NumPy:
+clasificación ABC por participación en el valor, percentiles de precio y cantidad,
+histogramas y productos que más aportan al valor total.
+
+Requiere NumPy (pip install numpy).
+
+Uso para medir el tiempo con datos de prueba (desde el inventario hasta el reporte):
+    python analitica.py [cantidad_de_productos]
+"""
+import sys
+import time
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+from inventario import Inventario
+from inventario_columnar import InventarioColumnar
+from producto import Producto
+
+
+def columnas_del_inventario(inventario: Inventario) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Obtiene los arreglos (ids, cantidades, precios) del inventario.
+    Con InventarioColumnar se leen las columnas sin copiarlas (mientras existan
+    estos arreglos el inventario no puede crecer ni achicarse); con Inventario
+    se construyen en una sola pasada sobre los productos.
+    """
+    if isinstance(inventario, InventarioColumnar):
+        ids, cantidades, precios = inventario.columnas()
+        return (np.frombuffer(ids, dtype=np.int64), np.frombuffer(cantidades, dtype=np.int64),
+                np.frombuffer(precios, dtype=np.float64))
+
+    productos = inventario.mostrar_todos()
+    n = len(productos)
+    ids = np.fromiter((p.id for p in productos), dtype=np.int64, count=n)
+    cantidades = np.fromiter((p.cantidad for p in productos), dtype=np.int64, count=n)
+    precios = np.fromiter((p.precio for p in productos), dtype=np.float64, count=n)
+    return ids, cantidades, precios
+
+
+def analizar_columnas(ids: np.ndarray, cantidades: np.ndarray, precios: np.ndarray,
+                      cortes_abc: Tuple[float, float] = (0.80, 0.95),
+                      percentiles: Sequence[float] = (10, 25, 50, 75, 90, 99),
+                      intervalos: int = 10, top: int = 10) -> Dict:
+    """
+    Calcula el reporte analítico a partir de las columnas del inventario.
+
+    Args:
+        ids, cantidades, precios: Arreglos alineados (una posición por producto)
+        cortes_abc: Participación acumulada del valor donde terminan las clases A y B
+        percentiles: Percentiles a calcular para precio y cantidad
+        intervalos: Número de intervalos de los histogramas
+        top: Cuántos productos incluir en el ranking de mayor valor
+
+    Returns:
+        Diccionario con 'productos', 'valor_total', 'abc', 'percentiles',
+        'histogramas' y 'top_valor'.
+    """
+    n = len(ids)
+    valores = cantidades * precios
+    valor_total = float(valores.sum())
+    reporte = {'productos': n, 'valor_total': round(valor_total, 2)}
+    if n == 0:
+        return reporte
+
+    # Clasificación ABC: ordenamos por valor descendente y acumulamos la participación.
+    # Un producto pertenece a A si la participación acumulada antes de él es menor al primer corte.
+    orden = np.argsort(-valores, kind='stable')
+    acumulado = np.concatenate(([0.0], np.cumsum(valores[orden])))  # acumulado[i] = valor de los i primeros
+    previo = acumulado[:-1] / valor_total if valor_total else np.zeros(n)
+    fin_a, fin_b = np.searchsorted(previo, cortes_abc, side='left')
+    reporte['abc'] = {}
+    for clase, (inicio, fin) in zip("ABC", ((0, fin_a), (fin_a, fin_b), (fin_b, n))):
+        valor_clase = float(acumulado[fin] - acumulado[inicio])
+        reporte['abc'][clase] = {
+            'productos': int(fin - inicio),
+            'valor': round(valor_clase, 2),
+            'porcentaje_valor': round(100 * valor_clase / valor_total, 2) if valor_total else 0.0,
+            'ids': ids[orden[inicio:fin]],
+        }
+
+    reporte['percentiles'] = {
+        'precio': dict(zip(percentiles, np.percentile(precios, percentiles).round(2).tolist())),
+        'cantidad': dict(zip(percentiles, np.percentile(cantidades, percentiles).tolist())),
+    }
+
+    reporte['histogramas'] = {}
+    for nombre, datos in (('precio', precios), ('cantidad', cantidades), ('valor', valores)):
+        frecuencias, bordes = np.histogram(datos, bins=intervalos)
+        reporte['histogramas'][nombre] = {'frecuencias': frecuencias.tolist(), 'bordes': bordes.tolist()}
+
+    # Los k de mayor valor ya están al inicio del orden descendente
+    mejores = orden[:top]
+    reporte['top_valor'] = [(int(ids[i]), round(float(valores[i]), 2)) for i in mejores]
+    return reporte
+
+
+def reporte_inventario(inventario: Inventario, **opciones) -> Dict:
+    """Genera el reporte analítico completo de un inventario (ver analizar_columnas)"""
+    return analizar_columnas(*columnas_del_inventario(inventario), **opciones)
+
+
+def _medir(inventario: Inventario) -> Tuple[Dict, float, float]:
+    """Genera el reporte y devuelve (reporte, segundos para obtener las columnas, segundos totales)"""
+    inicio = time.perf_counter()
+    columnas = columnas_del_inventario(inventario)
+    extraccion = time.perf_counter() - inicio
+    reporte = analizar_columnas(*columnas)
+    return reporte, extraccion, time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    generador = np.random.default_rng(2024)
+    cantidades = generador.integers(0, 500, cantidad, dtype=np.int64).tolist()
+    precios = generador.lognormal(1.0, 0.6, cantidad).round(2).tolist()
+
+    # Se mide desde el inventario hasta el reporte: con Inventario, armar las columnas
+    # recorriendo los objetos Producto es la parte más cara; InventarioColumnar las
+    # entrega sin copiarlas
+    print(f"Reporte de {cantidad:,} productos, desde el inventario hasta el resultado")
+    for clase in (Inventario, InventarioColumnar):
+        inventario = clase()
+        inventario.agregar_lote(Producto.desde_datos_confiables(i + 1, f"Producto {i + 1}", cantidades[i], precios[i])
+                                for i in range(cantidad))
+        resultado, extraccion, duracion = _medir(inventario)
+        print(f"{clase.__name__:<20} columnas {extraccion:>7.3f} s   total {duracion:>7.3f} s")
+        del inventario
+
+    print(f"Valor total: ${resultado['valor_total']:,.2f} USD")
+    for clase, datos in resultado['abc'].items():
+        print(f"Clase {clase}: {datos['productos']:,} productos, {datos['porcentaje_valor']}% del valor")
+    print(f"Percentiles de precio: {resultado['percentiles']['precio']}")
@@ -0,0 +1,111 @@
+import threading
+import time
+from typing import Callable, Optional
+
+
+class Autoguardado:
+    """
+    Hilo que guarda el inventario en segundo plano para no bloquear al usuario.
+    Cada cambio se avisa con avisar(); el hilo espera `ventana` segundos desde el
+    primer aviso y hace una sola escritura con todos los cambios que llegaron en ese
+    tiempo. Si el guardado falla, se vuelve a intentar después de otra ventana.
+
+    El inventario no es seguro entre hilos, así que quien lo usa debe tener tomado
+    `cerrojo`. El guardado se hace en dos partes: `preparar` lee el inventario con el
+    cerrojo tomado y devuelve la función que escribe, que corre después de soltarlo;
+    así el menú solo espera lo que tarda en copiarse el inventario, no la escritura.
+    Las escrituras van de a una y en el orden en que se prepararon.
+    """
+
+    # Cada cuántos segundos el hilo vuelve a mirar si lo detuvieron mientras espera el cerrojo
+    ESPERA_CERROJO = 0.1
+
+    def __init__(self, preparar: Callable[[], Callable[[], bool]], ventana: float = 2.0,
+                 cerrojo: Optional[threading.RLock] = None):
+        """
+        Args:
+            preparar: Función que lee el inventario (con el cerrojo tomado) y devuelve otra
+                que lo escribe sin tocarlo y devuelve True si lo logró
+            ventana: Segundos durante los cuales se agrupan los cambios antes de guardar
+            cerrojo: Cerrojo que protege al inventario (se crea uno si no se indica)
+        """
+        self.ventana = ventana
+        self.cerrojo = cerrojo if cerrojo is not None else threading.RLock()
+        self._preparar = preparar
+        self._escritura = threading.Lock()  # se toma siempre después de `cerrojo`
+        self._pendiente = threading.Event()
+        self._detenido = threading.Event()
+        self._ultimo_guardado: Optional[float] = None
+        self._hilo = threading.Thread(target=self._trabajar, name="autoguardado-inventario", daemon=True)
+
+    def iniciar(self):
+        """Arranca el hilo de guardado"""
+        self._hilo.start()
+
+    def avisar(self):
+        """Indica que el inventario cambió y hay que guardarlo"""
+        self._pendiente.set()
+
+    def ultimo_guardado(self) -> Optional[float]:
+        """Momento (time.time()) del último guardado exitoso, o None si todavía no hubo"""
+        return self._ultimo_guardado
+
+    def guardar_ahora(self) -> bool:
+        """Guarda de inmediato en el hilo que llama, sin esperar la ventana"""
+        self._pendiente.clear()
+        self.cerrojo.acquire()
+        return self._guardar_y_soltar()
+
+    def _guardar_y_soltar(self) -> bool:
+        """Prepara el guardado con `cerrojo` tomado, lo suelta y escribe"""
+        try:
+            try:
+                escribir = self._preparar()
+            except Exception as e:
+                print(f"Error al preparar el guardado del inventario: {e}")
+                return False
+            # Se toma antes de soltar `cerrojo` para que otra copia preparada después
+            # no se escriba antes que esta
+            self._escritura.acquire()
+        finally:
+            self.cerrojo.release()
+        try:
+            guardado = escribir()
+        finally:
+            self._escritura.release()
+        if guardado:
+            self._ultimo_guardado = time.time()
+        return guardado
+
+    def detener(self) -> bool:
+        """
+        Detiene el hilo y hace un último guardado con los cambios pendientes.
+
+        Returns:
+            True si el último guardado se completó.
+        """
+        self._detenido.set()
+        self._pendiente.set()  # despierta al hilo si estaba esperando cambios
+        if self._hilo.is_alive():
+            self._hilo.join()
+        return self.guardar_ahora()
+
+    def _trabajar(self):
+        while True:
+            self._pendiente.wait()
+            # Dejamos pasar la ventana para juntar los cambios que sigan llegando
+            # (detener() interrumpe la espera y hace el guardado final él mismo)
+            if self._detenido.wait(self.ventana):
+                return
+            # Quien llama a detener() puede tener el cerrojo tomado mientras espera a este
+            # hilo, así que no lo esperamos sin límite: si nos detienen, el guardado final
+            # lo hace detener()
+            while not self.cerrojo.acquire(timeout=self.ESPERA_CERROJO):
+                if self._detenido.is_set():
+                    return
+            if self._detenido.is_set():
+                self.cerrojo.release()
+                return
+            self._pendiente.clear()
+            if not self._guardar_y_soltar():
+                self._pendiente.set()  # se reintenta en la próxima ventana
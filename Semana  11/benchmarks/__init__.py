@@ -0,0 +1,5 @@
+"""
+Benchmarks y generadores de carga del inventario. Se ejecutan como módulos desde la
+carpeta de la semana (por ejemplo, python -m benchmarks.benchmark_sqlite) para que
+encuentren los módulos del inventario.
+"""
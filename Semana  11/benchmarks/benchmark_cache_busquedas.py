@@ -0,0 +1,80 @@
+"""
+Mide la caché de buscar_por_nombre con una carga parecida a la de las terminales:
+pocas consultas muy repetidas ("leche", "arroz"...), mezcladas con ventas que cambian
+cantidades y, de vez en cuando, productos nuevos o renombrados que invalidan parte de
+la caché. Compara búsquedas por segundo con y sin caché, muestra la tasa de aciertos
+y comprueba que ambos inventarios devuelven siempre los mismos resultados.
+
+Uso (desde la carpeta de la semana): python -m benchmarks.benchmark_cache_busquedas [cantidad_de_productos]
+"""
+import random
+import sys
+import time
+
+from inventario import Inventario
+from producto import Producto
+
+NOMBRES = ["Leche", "Arroz", "Azúcar", "Aceite", "Fréjol", "Atún", "Pan", "Café", "Queso", "Harina",
+           "Sal", "Fideo", "Avena", "Jabón", "Papel", "Cloro", "Huevos", "Yogur", "Mantequilla", "Galletas"]
+CONSULTAS = ["leche", "arroz", "azucar", "aceite", "frejol", "atun", "pan", "cafe", "queso", "harina",
+             "sal", "fideo", "avena", "jabon", "papel", "cloro", "huevos", "yogur", "mantequilla", "galletas"]
+OPERACIONES = 50_000
+CAPACIDADES = (0, 8, 64, 256)
+
+
+def crear(cantidad: int, capacidad: int) -> Inventario:
+    inventario = Inventario(cache_busquedas=capacidad)
+    inventario.agregar_lote(Producto.desde_datos_confiables(i, f"{NOMBRES[i % len(NOMBRES)]} {i}", 100, 1.0)
+                            for i in range(1, cantidad + 1))
+    return inventario
+
+
+def trabajar(inventario: Inventario, cantidad: int):
+    """Devuelve (segundos buscando, búsquedas, resultados) para comparar entre inventarios"""
+    azar = random.Random(11)
+    siguiente_id = cantidad + 1
+    buscando = 0.0
+    busquedas = 0
+    resultados = []
+    for numero in range(OPERACIONES):
+        sorteo = azar.random()
+        if sorteo < 0.80:
+            # Las consultas más populares se repiten mucho más (distribución tipo Zipf)
+            consulta = CONSULTAS[min(int(azar.paretovariate(1.2)) - 1, len(CONSULTAS) - 1)]
+            inicio = time.perf_counter()
+            encontrados = inventario.buscar_por_nombre(consulta)
+            buscando += time.perf_counter() - inicio
+            busquedas += 1
+            if numero % 1000 == 0:
+                resultados.append([producto.id for producto in encontrados])
+        elif sorteo < 0.98:
+            inventario.ajustar_cantidad(azar.randint(1, cantidad), azar.choice((-1, 1)))
+        elif sorteo < 0.99:
+            inventario.agregar_producto(Producto(siguiente_id, f"{azar.choice(NOMBRES)} nuevo", 10, 2.0))
+            siguiente_id += 1
+        else:
+            producto = inventario.buscar_por_id(azar.randint(1, cantidad))
+            if producto is not None:
+                producto.nombre = f"{azar.choice(NOMBRES)} renombrado {producto.id}"
+    return buscando, busquedas, resultados
+
+
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    print(f"{cantidad:,} productos, {OPERACIONES:,} operaciones (80 % búsquedas)")
+    print(f"{'Capacidad':>9} {'Búsquedas/s':>14} {'Aciertos':>10} {'Fallos':>10} {'Tasa':>8}")
+    print("-" * 56)
+    referencia = None
+    distintos = []
+    for capacidad in CAPACIDADES:
+        inventario = crear(cantidad, capacidad)
+        buscando, busquedas, resultados = trabajar(inventario, cantidad)
+        cache = inventario.estadisticas_cache_busquedas()
+        print(f"{capacidad:>9} {busquedas / buscando:>14,.0f} {cache['aciertos']:>10,} {cache['fallos']:>10,} "
+              f"{cache['tasa_aciertos']:>8.1%}")
+        if referencia is None:
+            referencia = resultados
+        elif resultados != referencia:
+            distintos.append(capacidad)
+    if distintos:
+        sys.exit(f"Con capacidad {distintos} los resultados no coinciden con los de sin caché")
@@ -0,0 +1,65 @@
+"""
+Compara tamaño en disco contra tiempo de guardado y de lectura del JSON del inventario
+sin comprimir y comprimido con gzip y lzma (xz).
+La lectura mide descomprimir, decodificar el JSON y crear los Producto, sin construir
+los índices del inventario (ese costo es el mismo para todos los formatos).
+
+Uso (desde la carpeta de la semana): python -m benchmarks.benchmark_compresion [cantidad_de_productos]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from compresion import abrir_archivo
+from inventario import Inventario
+from lector_json import iterar_arreglo_json
+from producto import Producto
+
+CATEGORIAS = ["Granos", "Lácteos", "Bebidas", "Limpieza", "Verduras"]
+EXTENSIONES = [".json", ".json.gz", ".json.xz"]
+
+
+def crear_inventario(cantidad: int) -> Inventario:
+    """Crea un inventario de prueba con nombres y precios variados"""
+    inventario = Inventario()
+    inventario.agregar_lote(
+        Producto.desde_datos_confiables(i, f"Producto {i}", i % 500, round(0.25 + (i % 400) * 0.05, 2),
+                                        CATEGORIAS[i % len(CATEGORIAS)])
+        for i in range(1, cantidad + 1))
+    return inventario
+
+
+def leer_productos(ruta: str) -> int:
+    """Lee el archivo en streaming creando cada Producto; devuelve cuántos leyó"""
+    with abrir_archivo(ruta, 'r') as archivo:
+        productos = [Producto.from_dict(item, validar=False) for item in iterar_arreglo_json(archivo)]
+    return len(productos)
+
+
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    inventario = crear_inventario(cantidad)
+
+    print(f"Copia JSON de {cantidad:,} productos")
+    print(f"{'Formato':<12} {'Tamaño':>12} {'Proporción':>11} {'Guardar':>10} {'Leer':>10}")
+    print("-" * 59)
+    with tempfile.TemporaryDirectory() as carpeta:
+        tamano_plano = None
+        for extension in EXTENSIONES:
+            ruta = os.path.join(carpeta, "inventario" + extension)
+
+            inicio = time.perf_counter()
+            inventario.guardar_en_archivo(ruta)
+            guardar = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            leidos = leer_productos(ruta)
+            leer = time.perf_counter() - inicio
+            assert leidos == cantidad
+
+            tamano = os.path.getsize(ruta)
+            if tamano_plano is None:
+                tamano_plano = tamano
+            print(f"{extension:<12} {tamano / 1024 / 1024:>9.2f} MB {tamano / tamano_plano:>10.1%} "
+                  f"{guardar:>8.2f} s {leer:>8.2f} s")
@@ -0,0 +1,130 @@
+"""
+Prueba de corrección (no de escalabilidad) de InventarioConcurrente: varios hilos
+suman unidades a productos elegidos al azar y al final se comprueba que no se perdió
+ninguna actualización (la suma de las cantidades debe ser exactamente la cantidad de
+operaciones). Como comparación, se repite la prueba con Inventario leyendo la
+cantidad y escribiéndola después sin cerrojos, que es lo que hoy haría cada caja por
+su cuenta. Al final, varios hilos despachan carritos con stock escaso y se verifica
+que no se vendió de más: lo vendido más lo que queda debe ser igual al stock inicial.
+
+Se prueba con más hilos solo para que haya más ocasiones de que aparezcan carreras.
+Las operaciones por segundo se muestran como referencia pero no miden escalabilidad:
+con GIL los hilos no ejecutan Python en paralelo, y los números con más hilos no
+deben leerse como una mejora (ni como un límite) del diseño por franjas.
+
+Uso (desde la carpeta de la semana): python -m benchmarks.benchmark_concurrencia [operaciones_por_hilo]
+"""
+import random
+import sys
+import threading
+import time
+from typing import List
+
+from inventario import Inventario
+from inventario_concurrente import InventarioConcurrente
+from producto import Producto
+
+PRODUCTOS = 1_000
+HILOS = (1, 2, 4, 8)
+
+
+def crear(clase) -> Inventario:
+    inventario = clase()
+    for i in range(1, PRODUCTOS + 1):
+        inventario.agregar_producto(Producto.desde_datos_confiables(i, f"Producto {i}", 0, 1.0))
+    return inventario
+
+
+def sumar_con_ajuste(inventario: Inventario, operaciones: int, semilla: int):
+    azar = random.Random(semilla)
+    for _ in range(operaciones):
+        inventario.ajustar_cantidad(azar.randint(1, PRODUCTOS), 1)
+
+
+def sumar_sin_cerrojo(inventario: Inventario, operaciones: int, semilla: int):
+    azar = random.Random(semilla)
+    for _ in range(operaciones):
+        id_producto = azar.randint(1, PRODUCTOS)
+        cantidad = inventario.buscar_por_id(id_producto).cantidad
+        time.sleep(0)  # cede el turno entre la lectura y la escritura, como una caja real
+        inventario.actualizar_producto(id_producto, cantidad=cantidad + 1)
+
+
+def medir(nombre: str, inventario: Inventario, trabajo, hilos: int, operaciones: int):
+    """Corre el trabajo en varios hilos y muestra operaciones por segundo y actualizaciones perdidas"""
+    trabajadores = [threading.Thread(target=trabajo, args=(inventario, operaciones, semilla))
+                    for semilla in range(hilos)]
+    inicio = time.perf_counter()
+    for hilo in trabajadores:
+        hilo.start()
+    for hilo in trabajadores:
+        hilo.join()
+    duracion = time.perf_counter() - inicio
+
+    esperado = hilos * operaciones
+    total = sum(producto.cantidad for producto in inventario.mostrar_todos())
+    # Los totales que se mantienen con los índices también tienen que coincidir
+    unidades = inventario.estadisticas()['unidades_totales']
+    print(f"{nombre:<26} {hilos:>5} {esperado / duracion:>14,.0f} {esperado - total:>10,} "
+          f"{'sí' if unidades == total else 'NO':>9}")
+    return esperado - total
+
+
+def vender_carritos(inventario: InventarioConcurrente, carritos: int, semilla: int, vendidas: List[int]):
+    """Despacha carritos de 1 a 5 líneas; anota las unidades de los carritos aceptados"""
+    azar = random.Random(semilla)
+    total = 0
+    for _ in range(carritos):
+        carrito = [(azar.randint(1, PRODUCTOS), azar.randint(1, 3)) for _ in range(azar.randint(1, 5))]
+        if inventario.despachar(carrito)['despachado']:
+            total += sum(cantidad for _, cantidad in carrito)
+    vendidas.append(total)
+
+
+def medir_carritos(hilos: int, carritos: int, stock: int) -> bool:
+    """Mide carritos por segundo y comprueba que no se vendió más de lo que había"""
+    inventario = InventarioConcurrente()
+    for i in range(1, PRODUCTOS + 1):
+        inventario.agregar_producto(Producto.desde_datos_confiables(i, f"Producto {i}", stock, 1.0))
+    vendidas: List[int] = []
+    trabajadores = [threading.Thread(target=vender_carritos, args=(inventario, carritos, semilla, vendidas))
+                    for semilla in range(hilos)]
+    inicio = time.perf_counter()
+    for hilo in trabajadores:
+        hilo.start()
+    for hilo in trabajadores:
+        hilo.join()
+    duracion = time.perf_counter() - inicio
+
+    restantes = [producto.cantidad for producto in inventario.mostrar_todos()]
+    correcto = min(restantes) >= 0 and sum(vendidas) + sum(restantes) == stock * PRODUCTOS
+    print(f"{'despachar':<26} {hilos:>5} {hilos * carritos / duracion:>14,.0f} "
+          f"{sum(vendidas):>10,} {'sí' if correcto else 'NO':>9}")
+    return correcto
+
+
+if __name__ == "__main__":
+    operaciones = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    # Cambiar de hilo con más frecuencia hace más probable que aparezcan las carreras
+    sys.setswitchinterval(1e-5)
+
+    print(f"{operaciones:,} operaciones por hilo sobre {PRODUCTOS:,} productos")
+    print(f"{'Inventario':<26} {'Hilos':>5} {'Operaciones/s':>14} {'Perdidas':>10} {'Totales ok':>9}")
+    print("-" * 70)
+    perdidas = 0
+    for hilos in HILOS:
+        perdidas += medir("InventarioConcurrente", crear(InventarioConcurrente), sumar_con_ajuste,
+                          hilos, operaciones)
+    for hilos in HILOS:
+        medir("Inventario sin cerrojos", crear(Inventario), sumar_sin_cerrojo, hilos, operaciones)
+
+    print()
+    print(f"{'Carritos':<26} {'Hilos':>5} {'Carritos/s':>14} {'Vendidas':>10} {'Stock ok':>9}")
+    print("-" * 70)
+    stock_correcto = all([medir_carritos(hilos, operaciones // 4, stock=20) for hilos in HILOS])
+
+    if perdidas:
+        sys.exit("InventarioConcurrente perdió actualizaciones")
+    if not stock_correcto:
+        sys.exit("InventarioConcurrente vendió más stock del que había")
+    print("\nInventarioConcurrente: sin actualizaciones perdidas ni stock vendido de más")
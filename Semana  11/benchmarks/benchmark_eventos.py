@@ -0,0 +1,138 @@
+"""
+Mide cuánto cuestan los eventos de cambio en las operaciones del inventario: sin
+suscriptores, con un suscriptor que se llama en el momento y con una ColaEventos que
+un hilo consume. Compara también con la alternativa que reemplazan: recorrer
+mostrar_todos() y compararlo con la copia anterior.
+
+Al final comprueba que una copia mantenida solo con los eventos (cantidad y precio
+por ID) queda igual al inventario, tanto la sincrónica como la de la cola.
+
+Uso (desde la carpeta de la semana): python -m benchmarks.benchmark_eventos [cantidad_de_productos]
+"""
+import random
+import sys
+import threading
+import time
+from typing import Dict, Tuple
+
+from eventos import (CantidadCambiada, Evento, InventarioRecargado, PrecioCambiado, ProductoAgregado,
+                     ProductoEliminado)
+from inventario import Inventario
+from producto import Producto
+
+OPERACIONES = 100_000
+SONDEOS = 20
+
+
+class Copia:
+    """Cantidad y precio por ID, mantenidos solo con eventos"""
+
+    def __init__(self, inventario: Inventario):
+        self.inventario = inventario
+        self.datos: Dict[int, Tuple[int, float]] = {}
+        self.recargar()
+
+    def recargar(self):
+        self.datos = {p.id: (p.cantidad, p.precio) for p in self.inventario.mostrar_todos()}
+
+    def aplicar(self, evento: Evento):
+        if isinstance(evento, ProductoAgregado):
+            self.datos[evento.id_producto] = (evento.nuevo['cantidad'], evento.nuevo['precio'])
+        elif isinstance(evento, ProductoEliminado):
+            del self.datos[evento.id_producto]
+        elif isinstance(evento, CantidadCambiada):
+            self.datos[evento.id_producto] = (evento.nuevo, self.datos[evento.id_producto][1])
+        elif isinstance(evento, PrecioCambiado):
+            self.datos[evento.id_producto] = (self.datos[evento.id_producto][0], evento.nuevo)
+        elif isinstance(evento, InventarioRecargado):
+            self.recargar()
+
+    def igual_al_inventario(self) -> bool:
+        return self.datos == {p.id: (p.cantidad, p.precio) for p in self.inventario.mostrar_todos()}
+
+
+def crear(cantidad: int) -> Inventario:
+    inventario = Inventario()
+    inventario.agregar_lote(Producto.desde_datos_confiables(i, f"Producto {i}", 100, 1.0 + i % 50)
+                            for i in range(1, cantidad + 1))
+    return inventario
+
+
+def trabajar(inventario: Inventario, cantidad: int) -> float:
+    """Ventas, cambios de precio, altas y bajas al azar; devuelve operaciones por segundo"""
+    azar = random.Random(5)
+    siguiente_id = cantidad + 1
+    inicio = time.perf_counter()
+    for _ in range(OPERACIONES):
+        sorteo = azar.random()
+        if sorteo < 0.85:
+            inventario.ajustar_cantidad(azar.randint(1, cantidad), azar.choice((-1, 1)))
+        elif sorteo < 0.95:
+            producto = inventario.buscar_por_id(azar.randint(1, cantidad))
+            if producto is not None:
+                producto.precio = round(producto.precio + 0.05, 2)
+        elif sorteo < 0.98:
+            inventario.agregar_producto(Producto(siguiente_id, f"Nuevo {siguiente_id}", 5, 2.5))
+            siguiente_id += 1
+        else:
+            inventario.eliminar_producto(azar.randint(cantidad + 1, max(cantidad + 1, siguiente_id - 1)))
+    return OPERACIONES / (time.perf_counter() - inicio)
+
+
+def medir_sondeo(cantidad: int) -> float:
+    """Segundos por cada vez que se recorre mostrar_todos() y se compara con la copia anterior"""
+    inventario = crear(cantidad)
+    anterior = {p.id: (p.cantidad, p.precio) for p in inventario.mostrar_todos()}
+    inicio = time.perf_counter()
+    for _ in range(SONDEOS):
+        actual = {p.id: (p.cantidad, p.precio) for p in inventario.mostrar_todos()}
+        cambiados = [i for i, datos in actual.items() if anterior.get(i) != datos]
+        anterior = actual
+    return (time.perf_counter() - inicio) / SONDEOS
+
+
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{cantidad:,} productos, {OPERACIONES:,} operaciones")
+    print(f"{'Suscriptores':<22} {'Operaciones/s':>14} {'Perdidos':>10}")
+    print("-" * 48)
+
+    inventario = crear(cantidad)
+    print(f"{'ninguno':<22} {trabajar(inventario, cantidad):>14,.0f} {'-':>10}")
+
+    inventario = crear(cantidad)
+    sincronica = Copia(inventario)
+    inventario.suscribir(sincronica.aplicar)
+    print(f"{'sincrónico':<22} {trabajar(inventario, cantidad):>14,.0f} {'-':>10}")
+
+    inventario = crear(cantidad)
+    de_cola = Copia(inventario)
+    cola = inventario.cola_de_eventos(capacidad=10_000, bloquear=True)
+    terminado = threading.Event()
+
+    def consumir():
+        while not (terminado.is_set() and len(cola) == 0):
+            evento = cola.obtener(espera=0.05)
+            if evento is not None:
+                de_cola.aplicar(evento)
+
+    consumidor = threading.Thread(target=consumir)
+    consumidor.start()
+    operaciones = trabajar(inventario, cantidad)
+    terminado.set()
+    consumidor.join()
+    cola.cerrar()
+    print(f"{'cola (bloquea)':<22} {operaciones:>14,.0f} {cola.perdidos:>10,}")
+
+    # Una cola pequeña que nadie consume: descarta y cuenta en lugar de frenar al inventario
+    inventario = crear(cantidad)
+    with inventario.cola_de_eventos(capacidad=1_000) as desbordada:
+        operaciones = trabajar(inventario, cantidad)
+    print(f"{'cola sin consumir':<22} {operaciones:>14,.0f} {desbordada.perdidos:>10,}")
+
+    print(f"\nSondear mostrar_todos() y comparar: {medir_sondeo(cantidad) * 1000:.1f} ms por sondeo")
+
+    iguales = sincronica.igual_al_inventario() and de_cola.igual_al_inventario()
+    print(f"Copias mantenidas con eventos iguales al inventario: {'sí' if iguales else 'NO'}")
+    if not iguales:
+        sys.exit("Una copia mantenida con eventos no coincide con el inventario")
@@ -0,0 +1,81 @@
+"""
+Compara el Inventario de un solo proceso con InventarioFragmentado repartido en
+varios procesos: operaciones sueltas por ID, lotes de actualizaciones, búsquedas por
+nombre y estadísticas. Al final comprueba que ambos terminan con los mismos totales.
+
+Una operación suelta en InventarioFragmentado paga el viaje de ida y vuelta entre
+procesos, así que es más lenta que en un solo proceso; la ganancia aparece en los
+lotes y en las consultas que reparten el trabajo, y solo si hay tantos núcleos como
+procesos (en una máquina de un núcleo los fragmentos se turnan la misma CPU).
+
+Uso (desde la carpeta de la semana): python -m benchmarks.benchmark_fragmentado [cantidad_de_productos]
+"""
+import os
+import random
+import sys
+import time
+
+from inventario import Inventario
+from inventario_fragmentado import InventarioFragmentado
+from producto import Producto
+
+PROCESOS = (1, 2, 4)
+SUELTAS = 20_000
+LOTES = 10
+BUSQUEDAS = 200
+ESTADISTICAS = 2_000
+
+
+def generar_productos(cantidad: int):
+    return [Producto.desde_datos_confiables(i, f"Producto {i}", i % 500, round(0.25 + (i % 400) * 0.05, 2))
+            for i in range(1, cantidad + 1)]
+
+
+def por_segundo(operaciones: int, trabajo) -> float:
+    inicio = time.perf_counter()
+    trabajo()
+    return operaciones / (time.perf_counter() - inicio)
+
+
+def medir(nombre: str, inventario, cantidad: int):
+    """Corre la misma carga sobre un inventario y muestra operaciones por segundo"""
+    azar = random.Random(42)
+    inventario.agregar_lote(generar_productos(cantidad))
+
+    def sueltas():
+        for _ in range(SUELTAS):
+            inventario.actualizar_producto(azar.randint(1, cantidad), cantidad=azar.randint(0, 500))
+
+    def lotes():
+        for _ in range(LOTES):
+            inventario.actualizar_lote([(i, azar.randint(0, 500), None) for i in range(1, cantidad + 1)])
+
+    def busquedas():
+        for i in range(BUSQUEDAS):
+            inventario.buscar_por_nombre(f"Producto {i % 100 + 1}")
+
+    def estadisticas():
+        for _ in range(ESTADISTICAS):
+            inventario.estadisticas()
+
+    print(f"{nombre:<26} {por_segundo(SUELTAS, sueltas):>12,.0f} "
+          f"{por_segundo(LOTES * cantidad, lotes):>14,.0f} "
+          f"{por_segundo(BUSQUEDAS, busquedas):>12,.0f} "
+          f"{por_segundo(ESTADISTICAS, estadisticas):>14,.0f}")
+    return inventario.estadisticas()
+
+
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{cantidad:,} productos, {os.cpu_count()} CPU")
+    print(f"{'Inventario':<26} {'Sueltas/s':>12} {'En lote/s':>14} {'Búsquedas/s':>12} "
+          f"{'Estadísticas/s':>14}")
+    print("-" * 82)
+    esperado = medir("Un proceso", Inventario(), cantidad)
+    distintos = []
+    for procesos in PROCESOS:
+        with InventarioFragmentado(procesos) as fragmentado:
+            if medir(f"Fragmentado ({procesos} procesos)", fragmentado, cantidad) != esperado:
+                distintos.append(procesos)
+    if distintos:
+        sys.exit(f"Los totales no coinciden con {distintos} procesos")
@@ -0,0 +1,102 @@
+"""
+Compara la memoria del almacenamiento tradicional (diccionario de objetos Producto)
+con el almacenamiento por columnas de InventarioColumnar.
+
+Primero mide solo dónde se guardan los productos, y después los inventarios
+completos: con sus índices ya construidos (se hace una consulta de cada tipo, porque
+algunos índices se arman recién en la primera búsqueda) y con los IDs cambiados que
+deja la carga. Para cada inventario muestra también cuánto tarda una búsqueda por
+nombre, que es lo que se paga al no tener índices en el modo compacto (el de
+InventarioColumnar por omisión). Bajo
+tracemalloc los inventarios con índices tardan bastante en armarse (sobre todo el
+árbol BK), por eso la cantidad por omisión es menor que en los otros benchmarks.
+
+Uso (desde la carpeta de la semana): python -m benchmarks.benchmark_memoria [cantidad_de_productos]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+from indices import normalizar_texto
+from inventario import Inventario
+from inventario_columnar import AlmacenColumnar, InventarioColumnar
+from producto import Producto
+
+CATEGORIAS = ["Granos", "Lácteos", "Bebidas", "Limpieza", "Verduras"]
+
+
+def generar_productos(cantidad: int):
+    """Genera productos de prueba uno por uno (sin guardarlos todos en una lista)"""
+    for i in range(1, cantidad + 1):
+        yield Producto(i, f"Producto {i}", i % 500, round(0.25 + (i % 400) * 0.05, 2),
+                       CATEGORIAS[i % len(CATEGORIAS)])
+
+
+def medir(nombre: str, construir, cantidad: int):
+    """Construye un almacén y muestra la memoria que retiene y el tiempo que tomó"""
+    # Lo que se libera durante la medición pero se creó antes (como la caché de
+    # normalizar_texto de la medición anterior) se restaría de la memoria retenida
+    normalizar_texto.cache_clear()
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    almacen = construir(cantidad)
+    duracion = time.perf_counter() - inicio
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{nombre:<28} {memoria / 1024 / 1024:>10.1f} MB {memoria / cantidad:>10.0f} B/producto "
+          f"{duracion:>8.2f} s", end="")
+    return almacen
+
+
+def construir_diccionario(cantidad: int):
+    return {producto.id: producto for producto in generar_productos(cantidad)}
+
+
+def construir_columnas(cantidad: int):
+    almacen = AlmacenColumnar()
+    for producto in generar_productos(cantidad):
+        almacen[producto.id] = producto
+    return almacen
+
+
+def construir_inventario(crear):
+    """Carga un inventario y hace una consulta de cada tipo para que todos sus índices queden armados"""
+    def construir(cantidad: int):
+        inventario = crear()
+        inventario.agregar_lote(generar_productos(cantidad))
+        inventario.buscar_por_nombre("producto 1")
+        inventario.autocompletar("producto 2")
+        inventario.buscar_aproximado("prodcto 3")
+        inventario.buscar_por_rango_precio(1.0, 2.0)
+        inventario.buscar_por_rango_cantidad(0, 10)
+        inventario.resumen_por_categoria()
+        return inventario
+    return construir
+
+
+def medir_busqueda(inventario) -> float:
+    """Milisegundos de una búsqueda por nombre que no está en la caché"""
+    inicio = time.perf_counter()
+    inventario.buscar_por_nombre("producto 12345")
+    return (time.perf_counter() - inicio) * 1000
+
+
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    print(f"Almacenamiento de {cantidad:,} productos (sin índices)")
+    print("-" * 72)
+    medir("Diccionario de Producto", construir_diccionario, cantidad)
+    print()
+    medir("Columnas (array)", construir_columnas, cantidad)
+    print()
+
+    print(f"\nInventarios completos de {cantidad:,} productos (con índices y cambios sin guardar)")
+    print("-" * 88)
+    for nombre, crear in (("Inventario", Inventario),
+                          ("InventarioColumnar con índices", lambda: InventarioColumnar(compacto=False)),
+                          ("InventarioColumnar", InventarioColumnar)):
+        inventario = medir(nombre, construir_inventario(crear), cantidad)
+        print(f" {medir_busqueda(inventario):>8.1f} ms/búsqueda")
+        del inventario
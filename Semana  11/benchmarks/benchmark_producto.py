@@ -0,0 +1,57 @@
+"""
+Mide la memoria y la velocidad de construcción de Producto (con __slots__ y nombres
+internados) frente a una clase equivalente con __dict__ como la versión original,
+y compara el constructor validado con Producto.desde_datos_confiables.
+
+Uso (desde la carpeta de la semana): python -m benchmarks.benchmark_producto [cantidad_de_productos]
+"""
+import sys
+import time
+import tracemalloc
+
+from producto import Producto
+
+# Pocos nombres distintos, como ocurre con "Leche" o "Arroz" repetidos en varias tiendas
+NOMBRES = ["Arroz", "Fréjol", "Aceite", "Azúcar", "Leche", "Pan", "Huevos", "Café"]
+
+
+class ProductoConDict:
+    """Misma estructura que el Producto original: un __dict__ por instancia y sin internar"""
+
+    def __init__(self, id_producto, nombre, cantidad, precio, categoria=None):
+        if id_producto <= 0:
+            raise ValueError("El ID debe ser un número positivo")
+        if cantidad < 0:
+            raise ValueError("La cantidad no puede ser negativa")
+        if precio < 0:
+            raise ValueError("El precio no puede ser negativo")
+        self._id = id_producto
+        self._nombre = nombre
+        self._cantidad = cantidad
+        self._precio = precio
+        self._categoria = categoria
+        self._observadores = []
+
+
+def medir(descripcion: str, constructor, cantidad: int):
+    """Construye `cantidad` productos y muestra memoria retenida y tiempo"""
+    # Cada nombre es un string nuevo (como al leerlo de un archivo), no el literal compartido
+    nombres = [f"{NOMBRES[i % len(NOMBRES)]} " for i in range(cantidad)]
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    productos = [constructor(i + 1, nombres[i].strip(), i % 500, 1.25) for i in range(cantidad)]
+    duracion = time.perf_counter() - inicio
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{descripcion:<34} {memoria / 1024 / 1024:>8.1f} MB {memoria / cantidad:>6.0f} B/producto "
+          f"{duracion:>7.2f} s")
+    return productos
+
+
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"Construcción de {cantidad:,} productos")
+    print("-" * 72)
+    medir("Clase con __dict__ (original)", ProductoConDict, cantidad)
+    medir("Producto (__slots__, validado)", Producto, cantidad)
+    medir("Producto.desde_datos_confiables", Producto.desde_datos_confiables, cantidad)
@@ -0,0 +1,122 @@
+"""
+Compara dos formas de dar el inventario a un proceso que solo consulta:
+cargar su propia copia con cargar_desde_archivo, o abrir una ReplicaInventario en
+memoria compartida. Muestra el tiempo hasta poder consultar, la memoria de Python que
+retiene cada proceso y las consultas de precio por segundo.
+
+Después comprueba que las réplicas siempre ven versiones completas: el publicador
+publica versiones en las que todos los productos tienen la misma cantidad (el número
+de versión), y varios procesos lectores verifican que nunca ven una mezcla.
+
+Uso (desde la carpeta de la semana): python -m benchmarks.benchmark_replicas [cantidad_de_productos]
+"""
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from inventario import Inventario
+from producto import Producto
+from replica_compartida import PublicadorInventario, ReplicaInventario
+
+NOMBRE = f"benchmark_replicas_{os.getpid()}"
+CONSULTAS = 100_000
+LECTORES = 3
+VERSIONES = 30
+
+
+def crear_inventario(cantidad: int, valor: int = 0) -> Inventario:
+    inventario = Inventario()
+    inventario.agregar_lote(Producto.desde_datos_confiables(i, f"Producto {i}", valor or i % 500,
+                                                            round(0.25 + (i % 400) * 0.05, 2))
+                            for i in range(1, cantidad + 1))
+    return inventario
+
+
+def medir(nombre: str, abrir, precio, cantidad: int):
+    """Abre el inventario, mide memoria retenida y consulta precios al azar"""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    abierto = abrir()
+    apertura = time.perf_counter() - inicio
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    azar = random.Random(1)
+    inicio = time.perf_counter()
+    for _ in range(CONSULTAS):
+        precio(abierto, azar.randint(1, cantidad))
+    consultas = CONSULTAS / (time.perf_counter() - inicio)
+    print(f"{nombre:<24} {apertura * 1000:>10.1f} ms {memoria / 1024 / 1024:>10.1f} MB {consultas:>14,.0f}")
+    return abierto
+
+
+def leer_versiones(nombre: str, resultado):
+    """Proceso lector: actualiza la réplica en bucle y cuenta versiones mezcladas"""
+    vistas = mezcladas = 0
+    with ReplicaInventario(nombre) as replica:
+        while replica.version < VERSIONES:
+            if replica.actualizar():
+                vistas += 1
+                if len({producto.cantidad for producto in replica}) != 1:
+                    mezcladas += 1
+            else:
+                time.sleep(0.001)
+    resultado.put((vistas, mezcladas))
+
+
+def comprobar_consistencia(cantidad: int) -> bool:
+    nombre = NOMBRE + "_consistencia"
+    with PublicadorInventario(nombre) as publicador:
+        publicador.publicar(crear_inventario(cantidad, valor=1))
+        resultado = multiprocessing.Queue()
+        lectores = [multiprocessing.Process(target=leer_versiones, args=(nombre, resultado))
+                    for _ in range(LECTORES)]
+        for lector in lectores:
+            lector.start()
+        inventario = crear_inventario(cantidad, valor=1)
+        for version in range(2, VERSIONES + 1):
+            inventario.actualizar_lote((i, version, None) for i in range(1, cantidad + 1))
+            publicador.publicar(inventario)
+        conteos = [resultado.get() for _ in lectores]
+        for lector in lectores:
+            lector.join()
+    mezcladas = sum(m for _, m in conteos)
+    print(f"{LECTORES} lectores vieron {[v for v, _ in conteos]} versiones de {VERSIONES}; "
+          f"versiones mezcladas: {mezcladas}")
+    return mezcladas == 0
+
+
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    inventario = crear_inventario(cantidad)
+
+    with tempfile.TemporaryDirectory() as carpeta, PublicadorInventario(NOMBRE) as publicador:
+        archivo = os.path.join(carpeta, "inventario.json")
+        inventario.guardar_en_archivo(archivo)
+        publicador.publicar(inventario)
+
+        print(f"{cantidad:,} productos, {CONSULTAS:,} consultas de precio")
+        print(f"{'Cada lector usa':<24} {'Apertura':>13} {'Memoria':>13} {'Consultas/s':>14}")
+        print("-" * 68)
+
+        def cargar():
+            copia = Inventario()
+            copia.cargar_desde_archivo(archivo)
+            return copia
+
+        copia = medir("cargar_desde_archivo", cargar,
+                      lambda copia, i: copia.buscar_por_id(i).precio, cantidad)
+        replica = medir("ReplicaInventario", lambda: ReplicaInventario(NOMBRE),
+                        lambda replica, i: replica.precio(i), cantidad)
+        iguales = replica.estadisticas() == copia.estadisticas()
+        replica.cerrar()
+        print(f"Estadísticas de la réplica iguales a las del inventario: {'sí' if iguales else 'NO'}")
+
+    print()
+    consistente = comprobar_consistencia(min(cantidad, 20_000))
+    if not iguales or not consistente:
+        sys.exit("La réplica no coincide con el inventario publicado")
@@ -0,0 +1,119 @@
+"""
+Compara el Inventario en memoria que se guarda en JSON con InventarioSQLite:
+carga inicial, reapertura, memoria retenida, actualizaciones sueltas (incluido
+guardarlas) y consultas por ID, por nombre y por prefijo. Al final comprueba que
+ambos terminan con las mismas estadísticas.
+
+En SQLite cada actualización suelta se confirma en la base al terminar, y la carga
+incluye armar los índices de precio, cantidad y trigramas del nombre. La búsqueda
+por nombre usa el índice de trigramas, así que no recorre la tabla (sin él, o con
+consultas de menos de 3 caracteres, es O(n)); lo que más cuesta es crear los
+productos de las filas que coinciden.
+
+La reapertura se mide con tracemalloc activo para contar la memoria que retiene cada
+inventario, así que su tiempo es mayor que el de una carga normal.
+
+Uso (desde la carpeta de la semana): python -m benchmarks.benchmark_sqlite [cantidad_de_productos]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from inventario import Inventario
+from inventario_sqlite import InventarioSQLite
+from producto import Producto
+
+NOMBRES = ["Leche", "Arroz", "Azúcar", "Aceite", "Fréjol", "Atún", "Pan", "Café", "Queso", "Harina"]
+CATEGORIAS = ["Lácteos", "Granos", "Bebidas", "Limpieza", None]
+ACTUALIZACIONES = 20_000
+CONSULTAS_ID = 20_000
+BUSQUEDAS = 20
+AUTOCOMPLETAR = 2_000
+
+
+def generar_productos(cantidad: int):
+    for i in range(1, cantidad + 1):
+        yield Producto.desde_datos_confiables(i, f"{NOMBRES[i % len(NOMBRES)]} {i}", i % 500,
+                                              round(0.25 + (i % 400) * 0.05, 2),
+                                              CATEGORIAS[i % len(CATEGORIAS)])
+
+
+def cronometrar(trabajo):
+    inicio = time.perf_counter()
+    resultado = trabajo()
+    return time.perf_counter() - inicio, resultado
+
+
+def medir(nombre: str, crear, guardar, reabrir, cantidad: int):
+    """Corre la misma carga sobre un tipo de inventario y muestra los tiempos"""
+    azar = random.Random(7)
+
+    def cargar():
+        inventario = crear()
+        inventario.agregar_lote(generar_productos(cantidad))
+        guardar(inventario)
+        return inventario
+
+    carga, inventario = cronometrar(cargar)
+    if isinstance(inventario, InventarioSQLite):
+        inventario.cerrar()
+
+    tracemalloc.start()
+    reapertura, inventario = cronometrar(reabrir)
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    def actualizar():
+        for _ in range(ACTUALIZACIONES):
+            inventario.actualizar_producto(azar.randint(1, cantidad), cantidad=azar.randint(0, 500))
+        guardar(inventario)
+
+    def consultar_ids():
+        for _ in range(CONSULTAS_ID):
+            inventario.buscar_por_id(azar.randint(1, cantidad))
+
+    def buscar():
+        for i in range(BUSQUEDAS):
+            inventario.buscar_por_nombre(f"{NOMBRES[i % len(NOMBRES)]} {i + 1}")
+
+    def autocompletar():
+        for i in range(AUTOCOMPLETAR):
+            inventario.autocompletar(f"{NOMBRES[i % len(NOMBRES)][:3]}", 10)
+
+    actualizaciones = ACTUALIZACIONES / cronometrar(actualizar)[0]
+    consultas = CONSULTAS_ID / cronometrar(consultar_ids)[0]
+    busquedas = BUSQUEDAS / cronometrar(buscar)[0]
+    sugerencias = AUTOCOMPLETAR / cronometrar(autocompletar)[0]
+    print(f"{nombre:<14} {carga:>8.2f} s {reapertura:>8.2f} s {memoria / 1024 / 1024:>8.1f} MB "
+          f"{actualizaciones:>12,.0f} {consultas:>10,.0f} {busquedas:>10,.0f} {sugerencias:>10,.0f}")
+    return inventario
+
+
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as carpeta:
+        archivo_json = os.path.join(carpeta, "inventario.json")
+        archivo_bd = os.path.join(carpeta, "inventario.db")
+
+        def reabrir_json():
+            inventario = Inventario()
+            inventario.cargar_desde_archivo(archivo_json)
+            return inventario
+
+        print(f"{cantidad:,} productos; actualizaciones sueltas incluyendo guardarlas")
+        print(f"{'Inventario':<14} {'Carga':>10} {'Reapertura':>10} {'Memoria':>11} "
+              f"{'Actualiz./s':>12} {'Por ID/s':>10} {'Nombre/s':>10} {'Prefijo/s':>10}")
+        print("-" * 96)
+        en_json = medir("dict + JSON", Inventario,
+                        lambda inventario: inventario.guardar_cambios(archivo_json), reabrir_json, cantidad)
+        en_sqlite = medir("SQLite", lambda: InventarioSQLite(archivo_bd),
+                          lambda inventario: inventario.confirmar(),
+                          lambda: InventarioSQLite(archivo_bd), cantidad)
+        iguales = en_json.estadisticas() == en_sqlite.estadisticas()
+        en_sqlite.cerrar()
+        print(f"Estadísticas iguales: {'sí' if iguales else 'NO'}")
+    if not iguales:
+        sys.exit("InventarioSQLite no coincide con Inventario")
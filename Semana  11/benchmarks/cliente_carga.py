@@ -0,0 +1,114 @@
+"""
+Generador de carga para servidor.py: abre varias conexiones, envía peticiones con
+pipelining (varias en vuelo por conexión) y mide el rendimiento y la latencia
+(p50, p99) de punta a punta.
+
+Mezcla de operaciones: 50 % actualizar, 30 % buscar_id, 10 % buscar y 10 % estadisticas.
+
+Uso (con el servidor ya corriendo en la misma máquina):
+    python servidor.py --puerto 8765
+    python -m benchmarks.cliente_carga --peticiones 200000 --conexiones 8 --en-vuelo 64
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, List
+
+PRODUCTOS = 5_000
+
+
+def generar_peticion(azar: random.Random, numero: int) -> Dict:
+    """Crea una petición al azar según la mezcla de operaciones"""
+    id_producto = azar.randint(1, PRODUCTOS)
+    sorteo = azar.random()
+    if sorteo < 0.5:
+        return {'id': numero, 'op': 'actualizar', 'id_producto': id_producto,
+                'cantidad': azar.randint(0, 500)}
+    if sorteo < 0.8:
+        return {'id': numero, 'op': 'buscar_id', 'id_producto': id_producto}
+    if sorteo < 0.9:
+        return {'id': numero, 'op': 'buscar', 'nombre': f"Producto {id_producto}", 'limite': 5}
+    return {'id': numero, 'op': 'estadisticas'}
+
+
+async def preparar(host: str, puerto: int):
+    """Agrega los productos de prueba (los que ya existen se dejan como están)"""
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    for i in range(1, PRODUCTOS + 1):
+        producto = {'id': i, 'nombre': f"Producto {i}", 'cantidad': 100, 'precio': 1.0}
+        escritor.write(json.dumps({'op': 'agregar', 'producto': producto}).encode() + b"\n")
+    await escritor.drain()
+    for _ in range(PRODUCTOS):
+        await lector.readline()
+    escritor.close()
+    await escritor.wait_closed()
+
+
+async def conexion(host: str, puerto: int, peticiones: int, en_vuelo: int,
+                   semilla: int, latencias: List[float], errores: List[str]):
+    """Envía `peticiones` por una conexión con hasta `en_vuelo` sin respuesta"""
+    lector, escritor = await asyncio.open_connection(host, puerto, limit=1024 * 1024)
+    azar = random.Random(semilla)
+    cupos = asyncio.Semaphore(en_vuelo)
+    enviadas: Dict[int, float] = {}
+
+    async def enviar():
+        for numero in range(peticiones):
+            await cupos.acquire()
+            linea = json.dumps(generar_peticion(azar, numero)).encode() + b"\n"
+            enviadas[numero] = time.perf_counter()
+            escritor.write(linea)
+            await escritor.drain()
+
+    async def recibir():
+        for _ in range(peticiones):
+            respuesta = json.loads(await lector.readline())
+            latencias.append(time.perf_counter() - enviadas.pop(respuesta['id']))
+            if not respuesta['ok']:
+                errores.append(respuesta['error'])
+            cupos.release()
+
+    await asyncio.gather(enviar(), recibir())
+    escritor.close()
+    await escritor.wait_closed()
+
+
+def percentil(valores: List[float], porcentaje: float) -> float:
+    """Percentil por rango más cercano sobre valores ya ordenados"""
+    return valores[min(len(valores) - 1, int(len(valores) * porcentaje / 100))]
+
+
+async def _ejecutar(opciones):
+    await preparar(opciones.host, opciones.puerto)
+    latencias: List[float] = []
+    errores: List[str] = []
+    por_conexion = opciones.peticiones // opciones.conexiones
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(conexion(opciones.host, opciones.puerto, por_conexion, opciones.en_vuelo,
+                                    semilla, latencias, errores)
+                           for semilla in range(opciones.conexiones)))
+    duracion = time.perf_counter() - inicio
+
+    latencias.sort()
+    total = len(latencias)
+    print(f"{total:,} peticiones en {duracion:.2f} s con {opciones.conexiones} conexiones "
+          f"y {opciones.en_vuelo} en vuelo por conexión")
+    print(f"Rendimiento: {total / duracion:,.0f} peticiones/s")
+    print(f"Latencia p50: {percentil(latencias, 50) * 1000:.2f} ms   "
+          f"p99: {percentil(latencias, 99) * 1000:.2f} ms   "
+          f"máx: {latencias[-1] * 1000:.2f} ms")
+    if errores:
+        print(f"Errores: {len(errores)} (por ejemplo: {errores[0]})")
+
+
+if __name__ == "__main__":
+    argumentos = argparse.ArgumentParser(description="Generador de carga para servidor.py")
+    argumentos.add_argument("--host", default="127.0.0.1")
+    argumentos.add_argument("--puerto", type=int, default=8765)
+    argumentos.add_argument("--peticiones", type=int, default=100_000)
+    argumentos.add_argument("--conexiones", type=int, default=8)
+    argumentos.add_argument("--en-vuelo", type=int, default=64)
+    asyncio.run(_ejecutar(argumentos.parse_args()))
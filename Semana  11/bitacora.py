@@ -0,0 +1,299 @@
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from compresion import escribir_atomicamente
+from eventos import InventarioRecargado
+from inventario import Inventario
+from producto import Producto
+
+
+class Bitacora:
+    """
+    Archivo de solo escritura al final (write-ahead log) con una línea JSON por cambio.
+    Cada cambio se entrega al sistema operativo apenas se registra (sobrevive a que el
+    proceso muera). Para no pagar un fsync por cada cambio, el paso al disco (que además
+    sobrevive a un corte de luz) se hace por grupos: cada `fsync_cada` cambios o, como
+    mucho, `fsync_intervalo` segundos después del primer cambio sin sincronizar, aunque
+    no lleguen más.
+    """
+
+    def __init__(self, ruta: str, fsync_cada: int = 32, fsync_intervalo: float = 1.0):
+        self.ruta = ruta
+        self.fsync_cada = fsync_cada
+        self.fsync_intervalo = fsync_intervalo
+        _descartar_linea_cortada(ruta)
+        self._archivo = open(ruta, 'a', encoding='utf-8')
+        self._sin_sincronizar = 0
+        self.entradas = 0  # cambios escritos desde que se abrió este archivo
+        # El temporizador sincroniza desde otro hilo, así que escribir y sincronizar se excluyen
+        self._cerrojo = threading.Lock()
+        self._temporizador: Optional[threading.Timer] = None
+
+    def registrar(self, entrada: Dict):
+        """Agrega un cambio al final del archivo"""
+        linea = json.dumps(entrada, ensure_ascii=False) + "\n"
+        with self._cerrojo:
+            self._archivo.write(linea)
+            self._archivo.flush()
+            self._sin_sincronizar += 1
+            self.entradas += 1
+            if self._sin_sincronizar >= self.fsync_cada:
+                self._sincronizar()
+            elif self._temporizador is None:
+                self._temporizador = threading.Timer(self.fsync_intervalo, self.sincronizar)
+                self._temporizador.daemon = True
+                self._temporizador.start()
+
+    def sincronizar(self):
+        """Fuerza que todos los cambios escritos lleguen al disco"""
+        with self._cerrojo:
+            self._sincronizar()
+
+    def _sincronizar(self):
+        """Hace el fsync pendiente (requiere el cerrojo)"""
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+            self._temporizador = None
+        if self._sin_sincronizar and not self._archivo.closed:
+            os.fsync(self._archivo.fileno())
+            self._sin_sincronizar = 0
+
+    def cerrar(self):
+        """Sincroniza y cierra el archivo"""
+        with self._cerrojo:
+            if not self._archivo.closed:
+                self._sincronizar()
+                self._archivo.close()
+
+    @staticmethod
+    def leer(ruta: str) -> Iterator[Dict]:
+        """
+        Recorre las entradas de una bitácora. Una última línea incompleta (por un corte
+        de luz en medio de la escritura) se ignora.
+        """
+        if not os.path.exists(ruta):
+            return
+        with open(ruta, 'r', encoding='utf-8') as archivo:
+            for linea in archivo:
+                if not linea.endswith("\n"):
+                    break
+                try:
+                    yield json.loads(linea)
+                except json.JSONDecodeError:
+                    break
+
+
+def _descartar_linea_cortada(ruta: str):
+    """
+    Si el archivo termina en una línea incompleta (un corte en medio de una escritura),
+    la quita. Si no, lo que se agregue después quedaría pegado a ella y al leer se
+    perdería junto con la línea cortada.
+    """
+    if not os.path.exists(ruta):
+        return
+    with open(ruta, 'rb+') as archivo:
+        archivo.seek(0, os.SEEK_END)
+        tamano = archivo.tell()
+        if tamano == 0:
+            return
+        archivo.seek(tamano - 1)
+        if archivo.read(1) == b"\n":
+            return
+        # Se busca el último salto de línea hacia atrás, de a bloques
+        fin = tamano
+        while fin > 0:
+            inicio = max(0, fin - 64 * 1024)
+            archivo.seek(inicio)
+            bloque = archivo.read(fin - inicio)
+            salto = bloque.rfind(b"\n")
+            if salto >= 0:
+                archivo.truncate(inicio + salto + 1)
+                return
+            fin = inicio
+        archivo.truncate(0)
+
+
+class InventarioPersistente(Inventario):
+    """
+    Inventario que guarda cada cambio en una bitácora en lugar de reescribir todo el JSON.
+    Al abrir, carga la última copia completa (snapshot) y vuelve a aplicar la bitácora.
+    La compactación escribe una copia nueva en un hilo en segundo plano y descarta la
+    bitácora que ya quedó incluida en ella.
+
+    Archivos usados, a partir de `ruta` (por ejemplo "inventario.json"):
+        inventario.json                       copia completa, mismo formato que guardar_en_archivo
+        inventario.json.bitacora              cambios posteriores a la copia
+        inventario.json.bitacora.compactando  cambios que se están incorporando a una copia nueva
+    """
+
+    def __init__(self, ruta: str, fsync_cada: int = 32, fsync_intervalo: float = 1.0,
+                 compactar_cada: Optional[int] = 10_000, cache_busquedas: int = 256):
+        super().__init__(cache_busquedas)
+        self.ruta = ruta
+        self.compactar_cada = compactar_cada
+        self._ruta_bitacora = ruta + ".bitacora"
+        self._ruta_compactando = ruta + ".bitacora.compactando"
+        self._fsync_cada = fsync_cada
+        self._fsync_intervalo = fsync_intervalo
+        self._bitacora: Optional[Bitacora] = None
+        self._hilo_compactacion: Optional[threading.Thread] = None
+        self._registrando = False  # solo se registran cambios después de abrir
+
+    def abrir(self) -> int:
+        """
+        Carga la copia completa (si existe) y aplica encima las bitácoras pendientes.
+
+        Returns:
+            Número de cambios de bitácora aplicados.
+
+        Raises:
+            ValueError: Si la copia completa existe pero no se pudo leer. No se sigue con
+                un inventario vacío: la próxima compactación reemplazaría esa copia.
+        """
+        self._registrando = False
+        # Para los suscriptores, abrir es un solo reemplazo del inventario completo
+        with self._eventos.en_silencio():
+            if os.path.exists(self.ruta):
+                if not self.cargar_desde_archivo(self.ruta, validar=False):
+                    raise ValueError(f"No se pudo leer la copia completa {self.ruta}; "
+                                     f"revísela o restáurela antes de abrir el inventario")
+            else:
+                self._limpiar()
+            aplicados = 0
+            # Si una compactación quedó a medias, sus cambios van antes que los actuales.
+            # Todas las entradas guardan valores absolutos, así que repetirlas no hace daño.
+            for ruta in (self._ruta_compactando, self._ruta_bitacora):
+                for entrada in Bitacora.leer(ruta):
+                    self._aplicar(entrada)
+                    aplicados += 1
+        if os.path.exists(self._ruta_compactando):
+            # Los cambios de esa compactación todavía no están en ninguna copia: se escribe
+            # una ahora, antes de que otra compactación necesite ese archivo
+            self._escribir_copia(list(self._productos.values()))
+        self._eventos.emitir(InventarioRecargado())
+        self._bitacora = Bitacora(self._ruta_bitacora, self._fsync_cada, self._fsync_intervalo)
+        self._bitacora.entradas = aplicados
+        self._registrando = True
+        return aplicados
+
+    def _aplicar(self, entrada: Dict):
+        """Reproduce una entrada de la bitácora sobre el inventario"""
+        operacion = entrada['op']
+        if operacion == 'agregar':
+            producto = Producto.from_dict(entrada['producto'], validar=False)
+            if producto.id in self._productos:
+                self._desregistrar(self._productos[producto.id])
+            self._registrar(producto)
+        elif operacion == 'eliminar':
+            if entrada['id'] in self._productos:
+                self._desregistrar(self._productos[entrada['id']])
+        elif operacion == 'actualizar':
+            producto = self._productos.get(entrada['id'])
+            if producto is not None:
+                setattr(producto, entrada['campo'], entrada['valor'])
+
+    def _registrar(self, producto: Producto):
+        super()._registrar(producto)
+        if self._registrando:
+            self._escribir({'op': 'agregar', 'producto': producto.to_dict()})
+
+    def _desregistrar(self, producto: Producto):
+        id_producto = producto.id
+        super()._desregistrar(producto)
+        if self._registrando:
+            self._escribir({'op': 'eliminar', 'id': id_producto})
+
+    def _al_cambiar_producto(self, producto: Producto, campo: str, anterior, nuevo):
+        super()._al_cambiar_producto(producto, campo, anterior, nuevo)
+        if self._registrando:
+            self._escribir({'op': 'actualizar', 'id': producto.id, 'campo': campo, 'valor': nuevo})
+
+    def _escribir(self, entrada: Dict):
+        """Registra un cambio y compacta si la bitácora creció demasiado"""
+        self._bitacora.registrar(entrada)
+        # Dentro de un lote se espera a que termine: ahí los índices todavía no están al día
+        if self._reordenes_pendientes is None:
+            self._compactar_si_hace_falta()
+
+    def _compactar_si_hace_falta(self):
+        if (self.compactar_cada is not None and self._bitacora is not None
+                and self._bitacora.entradas >= self.compactar_cada):
+            self.compactar()
+
+    @contextmanager
+    def _lote(self):
+        """Una operación por lotes compacta (si hace falta) recién al terminar"""
+        exterior = self._reordenes_pendientes is None
+        with super()._lote():
+            yield
+        if exterior and self._registrando:
+            self._compactar_si_hace_falta()
+
+    def cargar_desde_archivo(self, nombre_archivo: str, validar: bool = True) -> bool:
+        # Cargar otro archivo reemplaza todo el inventario: no se registra cambio por cambio
+        registrando, self._registrando = self._registrando, False
+        try:
+            return super().cargar_desde_archivo(nombre_archivo, validar)
+        finally:
+            self._registrando = registrando
+
+    def sincronizar(self):
+        """Fuerza que los cambios pendientes de la bitácora lleguen al disco"""
+        if self._bitacora is not None:
+            self._bitacora.sincronizar()
+
+    def compactar(self, en_segundo_plano: bool = True):
+        """
+        Incorpora la bitácora en una copia completa nueva.
+        Aquí solo se toma la lista de productos; convertirlos, escribir la copia y
+        reemplazar la anterior ocurre en un hilo aparte mientras los cambios nuevos
+        siguen yendo a una bitácora vacía.
+        """
+        self.esperar_compactacion()
+        self._bitacora.cerrar()
+        if os.path.exists(self._ruta_compactando):
+            # La compactación anterior no pudo escribir su copia: sus cambios siguen sin
+            # estar en ninguna, así que los nuevos se agregan detrás en lugar de reemplazarlos
+            with open(self._ruta_bitacora, 'rb') as origen, open(self._ruta_compactando, 'ab') as destino:
+                shutil.copyfileobj(origen, destino)
+                destino.flush()
+                os.fsync(destino.fileno())
+            os.remove(self._ruta_bitacora)
+        else:
+            os.replace(self._ruta_bitacora, self._ruta_compactando)
+        self._bitacora = Bitacora(self._ruta_bitacora, self._fsync_cada, self._fsync_intervalo)
+        # Copiar la lista es barato; los productos se leen en el hilo y pueden tener ya
+        # cambios posteriores. No importa: esos cambios también están en la bitácora nueva
+        # con valores absolutos, y al abrir se vuelven a aplicar encima de la copia.
+        productos = list(self._productos.values())
+
+        self._hilo_compactacion = threading.Thread(target=self._escribir_copia, args=(productos,),
+                                                   name="compactacion-inventario", daemon=True)
+        self._hilo_compactacion.start()
+        if not en_segundo_plano:
+            self.esperar_compactacion()
+
+    def _escribir_copia(self, productos: List[Producto]):
+        """Escribe la copia completa de forma atómica y borra la bitácora ya incorporada"""
+        datos = [producto.to_dict() for producto in productos]
+        with escribir_atomicamente(self.ruta) as archivo:
+            json.dump(datos, archivo, ensure_ascii=False)
+        os.remove(self._ruta_compactando)
+
+    def esperar_compactacion(self):
+        """Espera a que termine la compactación en curso, si hay una"""
+        if self._hilo_compactacion is not None:
+            self._hilo_compactacion.join()
+            self._hilo_compactacion = None
+
+    def cerrar(self):
+        """Sincroniza la bitácora, espera la compactación en curso y cierra los archivos"""
+        self.esperar_compactacion()
+        if self._bitacora is not None:
+            self._bitacora.cerrar()
+            self._bitacora = None
+        self._registrando = False
@@ -0,0 +1,74 @@
+"""
+Apertura de archivos de texto con compresión según la extensión:
+".gz" usa gzip, ".xz" y ".lzma" usan lzma; cualquier otra extensión es texto plano.
+Los archivos comprimidos se leen y escriben en modo streaming, sin descomprimir
+todo el contenido en memoria.
+"""
+import gzip
+import lzma
+import os
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+# Nivel 6 de gzip comprime casi lo mismo que el 9 (el predeterminado) en bastante menos tiempo
+NIVEL_GZIP = 6
+# Con el JSON del inventario el preset 3 de lzma comprime igual o mejor que el 6 y es varias
+# veces más rápido al guardar (ver benchmarks/benchmark_compresion.py)
+PRESET_LZMA = 3
+
+CODECS = {
+    '.gz': 'gzip',
+    '.xz': 'xz',
+    '.lzma': 'lzma',
+}
+
+
+def codec_de(ruta: str) -> str:
+    """Devuelve el códec que corresponde a la extensión del archivo ('texto' si no se comprime)"""
+    return CODECS.get(os.path.splitext(ruta)[1].lower(), 'texto')
+
+
+def abrir_archivo(ruta: str, modo: str = 'r') -> IO[str]:
+    """
+    Abre un archivo de texto UTF-8, comprimido o no según su extensión.
+
+    Args:
+        ruta: Ruta del archivo
+        modo: 'r' para leer, 'w' para escribir
+
+    Returns:
+        Archivo de texto listo para usar en un bloque with.
+    """
+    if modo not in ('r', 'w'):
+        raise ValueError(f"Modo no soportado: {modo!r}")
+    codec = codec_de(ruta)
+    if codec == 'gzip':
+        return gzip.open(ruta, modo + 't', compresslevel=NIVEL_GZIP, encoding='utf-8')
+    if codec in ('xz', 'lzma'):
+        if modo == 'r':
+            # FORMAT_AUTO reconoce tanto .xz como el formato .lzma antiguo
+            return lzma.open(ruta, 'rt', encoding='utf-8')
+        formato = lzma.FORMAT_XZ if codec == 'xz' else lzma.FORMAT_ALONE
+        return lzma.open(ruta, 'wt', format=formato, preset=PRESET_LZMA, encoding='utf-8')
+    return open(ruta, modo, encoding='utf-8')
+
+
+@contextmanager
+def escribir_atomicamente(ruta: str) -> Iterator[IO[str]]:
+    """
+    Escribe en un archivo temporal junto a `ruta` (con la misma compresión) y, si el
+    bloque with termina sin errores, lo sincroniza con el disco y lo renombra sobre
+    `ruta`. Quien lea el archivo ve la versión anterior o la nueva, nunca una a medias.
+    """
+    raiz, extension = os.path.splitext(ruta)
+    temporal = raiz + ".tmp" + extension
+    try:
+        with abrir_archivo(temporal, 'w') as archivo:
+            yield archivo
+        with open(temporal, 'rb') as archivo:
+            os.fsync(archivo.fileno())
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
@@ -0,0 +1,229 @@
+"""
+Eventos de cambio del inventario.
+
+En lugar de recorrer mostrar_todos() y comparar para saber qué cambió, otros
+componentes (cachés, pantallas, reportes) se suscriben al inventario y reciben un
+evento por cada alta, baja o cambio de un campo, con el valor anterior y el nuevo.
+
+Hay dos formas de recibirlos:
+- suscribir(funcion): la función se llama en el momento, dentro de la operación que
+  hizo el cambio (y en el mismo hilo). Debe ser rápida y no modificar el inventario.
+- ColaEventos: los eventos se guardan en una cola de tamaño limitado y otro hilo los
+  consume a su ritmo. Si la cola se llena, los eventos nuevos se descartan y se cuentan
+  en "perdidos"; quien consume debe volver a leer el inventario completo al verlo.
+
+Si un suscriptor falla, el error se registra con logging (logger "eventos", con la
+traza completa) y los demás suscriptores reciben el evento igual.
+"""
+import logging
+import queue
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+_registro = logging.getLogger(__name__)
+
+
+class Evento:
+    """
+    Cambio ocurrido en el inventario.
+
+    Attributes:
+        id_producto: ID del producto afectado (None si el evento es de todo el inventario)
+        anterior: Valor antes del cambio (None en un alta)
+        nuevo: Valor después del cambio (None en una baja)
+    """
+
+    __slots__ = ('id_producto', 'anterior', 'nuevo')
+
+    def __init__(self, id_producto: Optional[int] = None, anterior=None, nuevo=None):
+        self.id_producto = id_producto
+        self.anterior = anterior
+        self.nuevo = nuevo
+
+    def __eq__(self, otro) -> bool:
+        return (type(self) is type(otro) and self.id_producto == otro.id_producto
+                and self.anterior == otro.anterior and self.nuevo == otro.nuevo)
+
+    def __repr__(self) -> str:
+        return (f"{type(self).__name__}(id_producto={self.id_producto!r}, "
+                f"anterior={self.anterior!r}, nuevo={self.nuevo!r})")
+
+
+class ProductoAgregado(Evento):
+    """Se agregó un producto; nuevo tiene sus datos (el diccionario de to_dict)"""
+    __slots__ = ()
+
+
+class ProductoEliminado(Evento):
+    """Se eliminó un producto; anterior tiene sus datos (el diccionario de to_dict)"""
+    __slots__ = ()
+
+
+class CantidadCambiada(Evento):
+    """Cambió la cantidad disponible de un producto"""
+    __slots__ = ()
+
+
+class PrecioCambiado(Evento):
+    """Cambió el precio de un producto"""
+    __slots__ = ()
+
+
+class NombreCambiado(Evento):
+    """Cambió el nombre de un producto"""
+    __slots__ = ()
+
+
+class CategoriaCambiada(Evento):
+    """Cambió la categoría de un producto"""
+    __slots__ = ()
+
+
+class InventarioRecargado(Evento):
+    """
+    Se reemplazó todo el inventario (por ejemplo, al cargarlo desde un archivo).
+    No se envía un evento por producto: quien mantenga una copia debe leerlo completo.
+    """
+    __slots__ = ()
+
+
+# Evento que corresponde a cada campo de Producto que avisa a sus observadores
+EVENTOS_POR_CAMPO: Dict[str, Type[Evento]] = {
+    'cantidad': CantidadCambiada,
+    'precio': PrecioCambiado,
+    'nombre': NombreCambiado,
+    'categoria': CategoriaCambiada,
+}
+
+TiposEvento = Optional[Tuple[Type[Evento], ...]]
+
+
+class EmisorEventos:
+    """
+    Reparte los eventos entre los suscriptores. La lista de suscriptores se reemplaza
+    en lugar de modificarse, así que se puede suscribir o desuscribir desde otro hilo
+    (o desde un suscriptor) mientras se reparte un evento.
+    """
+
+    def __init__(self):
+        self._suscriptores: Tuple[Tuple[Callable[[Evento], None], TiposEvento], ...] = ()
+        self._silencio = 0
+
+    def suscribir(self, funcion: Callable[[Evento], None], tipos: TiposEvento = None):
+        """
+        Args:
+            funcion: Se llama con cada evento
+            tipos: Clases de evento que interesan (None para recibirlos todos)
+        """
+        self._suscriptores += ((funcion, tuple(tipos) if tipos is not None else None),)
+
+    def desuscribir(self, funcion: Callable[[Evento], None]) -> bool:
+        """
+        Returns:
+            True si la función estaba suscrita, False si no.
+        """
+        restantes = tuple(s for s in self._suscriptores if s[0] != funcion)
+        quitada = len(restantes) != len(self._suscriptores)
+        self._suscriptores = restantes
+        return quitada
+
+    def activo(self) -> bool:
+        """Indica si hay a quién enviarle eventos (para no construirlos en vano)"""
+        return bool(self._suscriptores) and not self._silencio
+
+    def emitir(self, evento: Evento):
+        """
+        Entrega el evento a cada suscriptor interesado. Un suscriptor que falla no
+        impide que los demás lo reciban (el cambio ya ocurrió): su error se registra
+        con logging.exception.
+        """
+        if self._silencio:
+            return
+        for funcion, tipos in self._suscriptores:
+            if tipos is None or isinstance(evento, tipos):
+                try:
+                    funcion(evento)
+                except Exception:
+                    _registro.exception("Error en el suscriptor de eventos %r con %r", funcion, evento)
+
+    @contextmanager
+    def en_silencio(self) -> Iterator[None]:
+        """No emite eventos mientras dura el bloque (se puede anidar)"""
+        self._silencio += 1
+        try:
+            yield
+        finally:
+            self._silencio -= 1
+
+
+class ColaEventos:
+    """
+    Suscripción que guarda los eventos en una cola limitada para consumirlos desde
+    otro hilo. Se crea con Inventario.cola_de_eventos().
+    """
+
+    def __init__(self, emisor: EmisorEventos, capacidad: int = 1000, tipos: TiposEvento = None,
+                 bloquear: bool = False):
+        """
+        Args:
+            emisor: Emisor al que se suscribe
+            capacidad: Máximo de eventos sin consumir
+            tipos: Clases de evento que interesan (None para todas)
+            bloquear: True para que quien modifica el inventario espere a que haya lugar
+                en lugar de descartar el evento. Ese consumidor no debe modificar el
+                inventario, o ambos pueden quedar esperándose.
+        """
+        if capacidad <= 0:
+            raise ValueError("La capacidad de la cola debe ser positiva")
+        self._cola: 'queue.Queue[Evento]' = queue.Queue(capacidad)
+        self._emisor = emisor
+        self.bloquear = bloquear
+        # Eventos descartados porque la cola estaba llena
+        self.perdidos = 0
+        emisor.suscribir(self._recibir, tipos)
+
+    def _recibir(self, evento: Evento):
+        if self.bloquear:
+            self._cola.put(evento)
+            return
+        try:
+            self._cola.put_nowait(evento)
+        except queue.Full:
+            self.perdidos += 1
+
+    def obtener(self, espera: Optional[float] = None) -> Optional[Evento]:
+        """
+        Saca el siguiente evento.
+
+        Args:
+            espera: Segundos a esperar si la cola está vacía (None espera sin límite, 0 no espera)
+
+        Returns:
+            El evento, o None si no llegó ninguno a tiempo.
+        """
+        try:
+            return self._cola.get(timeout=espera) if espera != 0 else self._cola.get_nowait()
+        except queue.Empty:
+            return None
+
+    def pendientes(self) -> List[Evento]:
+        """Saca todos los eventos que hay en la cola sin esperar"""
+        eventos = []
+        while True:
+            try:
+                eventos.append(self._cola.get_nowait())
+            except queue.Empty:
+                return eventos
+
+    def cerrar(self):
+        """Deja de recibir eventos; los que ya están en la cola se pueden seguir sacando"""
+        self._emisor.desuscribir(self._recibir)
+
+    def __len__(self) -> int:
+        return self._cola.qsize()
+
+    def __enter__(self) -> 'ColaEventos':
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
@@ -0,0 +1,579 @@
+import heapq
+import unicodedata
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+# Marcas combinantes del bloque U+0300-U+036F (tildes, diéresis, virgulilla...), para
+# quitarlas con str.translate; cubre todo lo que aparece en nombres en español
+_SIN_MARCAS = {codigo: None for codigo in range(0x300, 0x370) if unicodedata.combining(chr(codigo))}
+
+
+@lru_cache(maxsize=4096)
+def normalizar_texto(texto: str) -> str:
+    """
+    Normaliza un texto para búsquedas: minúsculas y sin tildes.
+    Ejemplo: "Fréjol" -> "frejol", "AZÚCAR" -> "azucar"
+    Se guarda en caché porque cada índice normaliza el mismo nombre al agregar un producto.
+    """
+    if texto.isascii():
+        return texto.lower()
+    descompuesto = unicodedata.normalize('NFD', texto.casefold()).translate(_SIN_MARCAS)
+    if descompuesto.isascii():
+        return descompuesto
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def trigramas(texto: str) -> Set[str]:
+    """Devuelve el conjunto de trigramas (subcadenas de 3 caracteres) de un texto ya normalizado"""
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def distancia_levenshtein(a: str, b: str) -> int:
+    """Número mínimo de inserciones, eliminaciones o sustituciones para convertir a en b"""
+    return _PatronLevenshtein(b).distancia(a)
+
+
+class _PatronLevenshtein:
+    """
+    Calcula distancias de Levenshtein desde un texto fijo con el algoritmo de vectores
+    de bits de Myers/Hyyrö: cada columna de la matriz de programación dinámica se
+    representa con enteros y se calcula con unas pocas operaciones de bits en lugar
+    de celda por celda. Las máscaras del patrón se preparan una sola vez, lo que
+    conviene cuando el mismo texto se compara contra muchos nombres (árbol BK).
+    """
+
+    def __init__(self, patron: str):
+        self.largo = len(patron)
+        self.mascaras: Dict[str, int] = {}  # carácter -> bits de las posiciones donde aparece
+        for i, caracter in enumerate(patron):
+            self.mascaras[caracter] = self.mascaras.get(caracter, 0) | (1 << i)
+
+    def distancia(self, texto: str) -> int:
+        if not self.largo:
+            return len(texto)
+        mascaras = self.mascaras
+        positivos, negativos = -1, 0  # diferencias verticales +1 y -1 (todas +1 al inicio)
+        distancia = self.largo
+        ultimo_bit = 1 << (self.largo - 1)
+        for caracter in texto:
+            iguales = mascaras.get(caracter, 0)
+            xv = iguales | negativos
+            xh = (((iguales & positivos) + positivos) ^ positivos) | iguales
+            horizontal_pos = negativos | ~(xh | positivos)
+            horizontal_neg = positivos & xh
+            if horizontal_pos & ultimo_bit:
+                distancia += 1
+            elif horizontal_neg & ultimo_bit:
+                distancia -= 1
+            horizontal_pos = (horizontal_pos << 1) | 1
+            horizontal_neg <<= 1
+            positivos = horizontal_neg | ~(xv | horizontal_pos)
+            negativos = horizontal_pos & xv
+        return distancia
+
+
+class IndiceTrigramas:
+    """
+    Índice invertido de trigramas sobre nombres normalizados.
+    Cada trigrama apunta al conjunto de IDs cuyos nombres lo contienen, de modo que una
+    búsqueda por subcadena solo revisa los candidatos que comparten todos sus trigramas.
+
+    Como en el árbol BK, los nombres nuevos esperan y se normalizan e indexan recién en
+    la siguiente búsqueda: cargar el inventario no paga por el índice más caro de armar.
+    """
+
+    def __init__(self):
+        self._indice: Dict[str, Set[int]] = {}
+        self._nombres: Dict[int, str] = {}  # ID -> nombre normalizado
+        self._cortos: Set[int] = set()  # IDs con nombres de menos de 3 caracteres (sin trigramas)
+        self._por_indexar: Dict[int, str] = {}  # ID -> nombre que aún no está en el índice
+
+    def agregar(self, id_producto: int, nombre: str):
+        """Indexa el nombre de un producto (se agrega al índice en la próxima búsqueda)"""
+        self._por_indexar[id_producto] = nombre
+
+    def _indexar_pendientes(self):
+        """Normaliza los nombres que esperaban y agrega sus trigramas al índice"""
+        indice = self._indice
+        for id_producto, nombre in self._por_indexar.items():
+            normalizado = normalizar_texto(nombre)
+            self._nombres[id_producto] = normalizado
+            if len(normalizado) < 3:
+                self._cortos.add(id_producto)
+            for i in range(len(normalizado) - 2):
+                ids = indice.get(normalizado[i:i + 3])
+                if ids is None:
+                    indice[normalizado[i:i + 3]] = {id_producto}
+                else:
+                    ids.add(id_producto)
+        self._por_indexar = {}
+
+    def eliminar(self, id_producto: int):
+        """Quita un producto del índice"""
+        if self._por_indexar.pop(id_producto, None) is not None:
+            return
+        normalizado = self._nombres.pop(id_producto, None)
+        if normalizado is None:
+            return
+        self._cortos.discard(id_producto)
+        for trigrama in trigramas(normalizado):
+            ids = self._indice.get(trigrama)
+            if ids is not None:
+                ids.discard(id_producto)
+                if not ids:
+                    del self._indice[trigrama]
+
+    def actualizar(self, id_producto: int, nuevo_nombre: str):
+        """Reindexa un producto que cambió de nombre"""
+        self.eliminar(id_producto)
+        self.agregar(id_producto, nuevo_nombre)
+
+    def limpiar(self):
+        """Vacía el índice"""
+        self._indice.clear()
+        self._nombres.clear()
+        self._cortos.clear()
+        self._por_indexar = {}
+
+    def buscar(self, texto: str) -> List[int]:
+        """
+        Devuelve los IDs (ordenados) cuyos nombres contienen el texto, sin importar
+        mayúsculas ni tildes.
+        """
+        if self._por_indexar:
+            self._indexar_pendientes()
+        consulta = normalizar_texto(texto)
+        if not consulta:
+            return sorted(self._nombres)
+
+        if len(consulta) >= 3:
+            # Intersectamos empezando por el conjunto más pequeño
+            conjuntos = sorted((self._indice.get(t, set()) for t in trigramas(consulta)), key=len)
+            candidatos: Iterable[int] = set.intersection(*conjuntos) if conjuntos[0] else set()
+        else:
+            # Consultas de 1-2 caracteres: unimos los trigramas que contienen la consulta.
+            # El número de trigramas distintos no depende del tamaño del catálogo.
+            candidatos = set()
+            for trigrama, ids in self._indice.items():
+                if consulta in trigrama:
+                    candidatos.update(ids)
+            candidatos.update(self._cortos)
+
+        # Verificamos la subcadena completa (los trigramas solo filtran candidatos)
+        return sorted(i for i in candidatos if consulta in self._nombres[i])
+
+    def __len__(self) -> int:
+        return len(self._nombres) + len(self._por_indexar)
+
+
+class _ArregloOrdenado:
+    """
+    Base de los índices ordenados: un arreglo de pares (clave, ID) ordenado más un
+    diccionario ID -> clave para poder ubicar y quitar cada entrada con bisect.
+
+    Los cambios masivos (actualizar_varios) no se mezclan enseguida: esperan hasta la
+    próxima consulta, y mientras tanto los cambios sueltos se suman a la espera. Así una
+    carga completa no ordena índices que quizá nadie consulte.
+    """
+
+    def __init__(self):
+        self._entradas: List[Tuple] = []
+        self._claves: Dict[int, object] = {}  # ID -> clave indexada
+        self._sin_mezclar: Dict[int, object] = {}  # ID -> valor que espera la próxima consulta
+
+    def _clave(self, valor):
+        """Convierte el valor recibido en la clave por la que se ordena"""
+        return valor
+
+    def agregar(self, id_producto: int, valor):
+        """Inserta un producto manteniendo el orden"""
+        if self._sin_mezclar:
+            self._sin_mezclar[id_producto] = valor
+            return
+        clave = self._clave(valor)
+        self._claves[id_producto] = clave
+        insort(self._entradas, (clave, id_producto))
+
+    def eliminar(self, id_producto: int):
+        """Quita un producto del índice"""
+        self._sin_mezclar.pop(id_producto, None)
+        clave = self._claves.pop(id_producto, None)
+        if clave is None:
+            return
+        posicion = bisect_left(self._entradas, (clave, id_producto))
+        del self._entradas[posicion]
+
+    def actualizar(self, id_producto: int, nuevo_valor):
+        """Reubica un producto cuyo valor cambió"""
+        if self._sin_mezclar:
+            self._sin_mezclar[id_producto] = nuevo_valor
+            return
+        self.eliminar(id_producto)
+        self.agregar(id_producto, nuevo_valor)
+
+    def actualizar_varios(self, valores: Dict[int, object]):
+        """
+        Agrega o reubica muchos productos a la vez. Con pocos cambios se reubica cada uno;
+        con muchos quedan esperando y en la próxima consulta se filtran las entradas
+        viejas y se mezclan las nuevas ya ordenadas, en O(n + k log k) en lugar de O(k · n).
+        """
+        if len(valores) < 64 and not self._sin_mezclar:
+            for id_producto, valor in valores.items():
+                self.actualizar(id_producto, valor)
+            return
+        self._sin_mezclar.update(valores)
+
+    def eliminar_varios(self, ids: Set[int]):
+        """
+        Quita muchos productos a la vez. Con pocos se quita cada uno; con muchos se
+        filtra el arreglo una sola vez, en O(n) en lugar de O(k · n).
+        """
+        if len(ids) < 64:
+            for id_producto in ids:
+                self.eliminar(id_producto)
+            return
+        quitados = set()
+        for id_producto in ids:
+            self._sin_mezclar.pop(id_producto, None)
+            if self._claves.pop(id_producto, None) is not None:
+                quitados.add(id_producto)
+        if quitados:
+            self._entradas = [entrada for entrada in self._entradas if entrada[1] not in quitados]
+
+    def _mezclar(self):
+        """Lleva al arreglo los cambios que esperaban"""
+        claves = {id_producto: self._clave(valor) for id_producto, valor in self._sin_mezclar.items()}
+        self._sin_mezclar = {}
+        nuevas = sorted((clave, id_producto) for id_producto, clave in claves.items())
+        if self._entradas:
+            conservadas = [entrada for entrada in self._entradas if entrada[1] not in claves]
+            self._entradas = list(heapq.merge(conservadas, nuevas))
+        else:
+            self._entradas = nuevas
+        self._claves.update(claves)
+
+    def _ordenadas(self) -> List[Tuple]:
+        """Devuelve el arreglo de entradas con todos los cambios aplicados"""
+        if self._sin_mezclar:
+            self._mezclar()
+        return self._entradas
+
+    def limpiar(self):
+        """Vacía el índice"""
+        self._entradas.clear()
+        self._claves.clear()
+        self._sin_mezclar = {}
+
+    def __len__(self) -> int:
+        return len(self._claves.keys() | self._sin_mezclar.keys()) if self._sin_mezclar else len(self._claves)
+
+
+class IndicePrefijos(_ArregloOrdenado):
+    """
+    Arreglo ordenado de pares (nombre normalizado, ID) para autocompletar.
+    Con búsqueda binaria encontramos el primer nombre con el prefijo y luego
+    leemos los siguientes k elementos contiguos: O(len(prefijo) · log n + k).
+    """
+
+    def _clave(self, nombre: str) -> str:
+        return normalizar_texto(nombre)
+
+    def buscar(self, prefijo: str, limite: int) -> List[int]:
+        """Devuelve hasta `limite` IDs cuyos nombres empiezan con el prefijo, en orden alfabético"""
+        consulta = normalizar_texto(prefijo)
+        entradas = self._ordenadas()
+        resultados = []
+        posicion = bisect_left(entradas, (consulta,))
+        while len(resultados) < limite and posicion < len(entradas):
+            nombre, id_producto = entradas[posicion]
+            if not nombre.startswith(consulta):
+                break
+            resultados.append(id_producto)
+            posicion += 1
+        return resultados
+
+
+class _NodoBK:
+    """Nodo de un árbol BK: un nombre normalizado, los IDs que lo usan y sus hijos por distancia"""
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+        self.ids: Set[int] = set()
+        self.hijos: Dict[int, '_NodoBK'] = {}
+
+
+class ArbolBK:
+    """
+    Árbol BK sobre nombres normalizados para búsquedas tolerantes a errores de escritura.
+    Gracias a la desigualdad triangular solo se calcula la distancia de Levenshtein
+    contra una fracción de los nombres: de cada nodo se visitan únicamente los hijos
+    cuya distancia está en [d - k, d + k].
+
+    Insertar en el árbol cuesta varias distancias por nombre, así que los nombres nuevos
+    esperan en una lista y se cuelgan del árbol recién en la siguiente búsqueda: cargar
+    el inventario no paga por un índice que quizá nunca se consulte.
+    """
+
+    def __init__(self):
+        self._raiz: Optional[_NodoBK] = None
+        self._nodos: Dict[str, _NodoBK] = {}  # nombre normalizado -> nodo
+        self._nombres: Dict[int, str] = {}   # ID -> nombre normalizado de los que están en el árbol
+        self._por_insertar: Dict[int, str] = {}  # ID -> nombre que aún no está en el árbol
+        self._vacios = 0  # nodos sin IDs que quedan solo como ruta
+
+    def agregar(self, id_producto: int, nombre: str):
+        """Indexa el nombre de un producto (se normaliza e inserta en la próxima búsqueda)"""
+        self._por_insertar[id_producto] = nombre
+
+    def _colocar(self, id_producto: int, normalizado: str):
+        """Agrega el ID al nodo de su nombre, creando el nodo si hace falta"""
+        nodo = self._nodos.get(normalizado)
+        if nodo is None:
+            nodo = self._insertar_nodo(normalizado)
+        elif not nodo.ids:
+            self._vacios -= 1
+        nodo.ids.add(id_producto)
+
+    def _insertar_nodo(self, nombre: str) -> _NodoBK:
+        """Crea el nodo para un nombre nuevo y lo cuelga en su lugar del árbol"""
+        nuevo = _NodoBK(nombre)
+        self._nodos[nombre] = nuevo
+        if self._raiz is None:
+            self._raiz = nuevo
+            return nuevo
+        patron = _PatronLevenshtein(nombre)
+        nodo = self._raiz
+        while True:
+            distancia = patron.distancia(nodo.nombre)
+            hijo = nodo.hijos.get(distancia)
+            if hijo is None:
+                nodo.hijos[distancia] = nuevo
+                return nuevo
+            nodo = hijo
+
+    def eliminar(self, id_producto: int):
+        """
+        Quita un producto del índice. El nodo queda en el árbol como ruta;
+        cuando los nodos vacíos superan a los ocupados el árbol se descarta y
+        todos los nombres vuelven a la lista de espera.
+        """
+        if self._por_insertar.pop(id_producto, None) is not None:
+            return
+        normalizado = self._nombres.pop(id_producto, None)
+        if normalizado is None:
+            return
+        nodo = self._nodos[normalizado]
+        nodo.ids.discard(id_producto)
+        if not nodo.ids:
+            self._vacios += 1
+            if self._vacios > len(self._nodos) - self._vacios:
+                self._raiz = None
+                self._nodos = {}
+                self._vacios = 0
+                self._por_insertar.update(self._nombres)
+                self._nombres = {}
+
+    def actualizar(self, id_producto: int, nuevo_nombre: str):
+        """Reindexa un producto que cambió de nombre"""
+        self.eliminar(id_producto)
+        self.agregar(id_producto, nuevo_nombre)
+
+    def limpiar(self):
+        """Vacía el índice"""
+        self._raiz = None
+        self._nodos = {}
+        self._nombres = {}
+        self._por_insertar = {}
+        self._vacios = 0
+
+    def buscar(self, texto: str, max_distancia: int) -> List[Tuple[int, int]]:
+        """
+        Devuelve pares (ID, distancia) de los nombres a distancia <= max_distancia,
+        ordenados por distancia y luego por ID.
+        """
+        for id_producto, nombre in self._por_insertar.items():
+            normalizado = normalizar_texto(nombre)
+            self._nombres[id_producto] = normalizado
+            self._colocar(id_producto, normalizado)
+        self._por_insertar.clear()
+        if self._raiz is None:
+            return []
+        patron = _PatronLevenshtein(normalizar_texto(texto))
+        resultados = []
+        pendientes = [self._raiz]
+        while pendientes:
+            nodo = pendientes.pop()
+            distancia = patron.distancia(nodo.nombre)
+            if distancia <= max_distancia:
+                resultados.extend((id_producto, distancia) for id_producto in nodo.ids)
+            for d, hijo in nodo.hijos.items():
+                if distancia - max_distancia <= d <= distancia + max_distancia:
+                    pendientes.append(hijo)
+        resultados.sort(key=lambda par: (par[1], par[0]))
+        return resultados
+
+    def __len__(self) -> int:
+        return len(self._nombres) + len(self._por_insertar)
+
+
+class IndiceOrdenado(_ArregloOrdenado):
+    """
+    Índice secundario ordenado por un valor numérico (precio o cantidad).
+    Guarda pares (valor, ID) en un arreglo ordenado, así las consultas por rango
+    cuestan O(log n + k) y recorrerlo en orden no requiere ordenar nada.
+    """
+
+    def rango(self, minimo: Optional[float] = None, maximo: Optional[float] = None) -> List[int]:
+        """Devuelve los IDs con minimo <= valor <= maximo, ordenados por valor (los límites son opcionales)"""
+        entradas = self._ordenadas()
+        inicio = 0 if minimo is None else bisect_left(entradas, (minimo,))
+        fin = len(entradas) if maximo is None else bisect_right(entradas, (maximo, float('inf')))
+        return [id_producto for _, id_producto in entradas[inicio:fin]]
+
+    def recorrer(self, descendente: bool = False) -> Iterator[int]:
+        """Recorre los IDs en orden de valor"""
+        entradas = self._ordenadas()
+        entradas = reversed(entradas) if descendente else iter(entradas)
+        return (id_producto for _, id_producto in entradas)
+
+
+class IndiceCategorias:
+    """
+    Índice hash por categoría: cada categoría apunta a sus IDs y a sus totales
+    acumulados (productos, unidades y valor), así el resumen por categoría cuesta
+    O(número de categorías) y listar una categoría cuesta O(k).
+    """
+
+    def __init__(self):
+        self._ids: Dict[Optional[str], Set[int]] = {}
+        self._totales: Dict[Optional[str], Dict] = {}
+
+    def agregar(self, id_producto: int, categoria: Optional[str], unidades: int, valor: float):
+        """Agrega un producto a su categoría"""
+        self._ids.setdefault(categoria, set()).add(id_producto)
+        totales = self._totales.setdefault(categoria, {'productos': 0, 'unidades': 0, 'valor': 0.0})
+        totales['productos'] += 1
+        totales['unidades'] += unidades
+        totales['valor'] += valor
+
+    def eliminar(self, id_producto: int, categoria: Optional[str], unidades: int, valor: float):
+        """Quita un producto de su categoría; las categorías vacías desaparecen"""
+        ids = self._ids.get(categoria)
+        if ids is None or id_producto not in ids:
+            return
+        ids.discard(id_producto)
+        if not ids:
+            del self._ids[categoria]
+            del self._totales[categoria]
+            return
+        totales = self._totales[categoria]
+        totales['productos'] -= 1
+        totales['unidades'] -= unidades
+        totales['valor'] -= valor
+
+    def ajustar(self, categoria: Optional[str], unidades: int, valor: float):
+        """Suma diferencias de unidades y valor a los totales de una categoría"""
+        totales = self._totales[categoria]
+        totales['unidades'] += unidades
+        totales['valor'] += valor
+
+    def limpiar(self):
+        """Vacía el índice"""
+        self._ids.clear()
+        self._totales.clear()
+
+    def ids(self, categoria: Optional[str]) -> Set[int]:
+        """Devuelve los IDs de una categoría (conjunto vacío si no existe)"""
+        return self._ids.get(categoria, set())
+
+    def resumen(self) -> Dict[Optional[str], Dict]:
+        """Devuelve una copia de los totales de cada categoría"""
+        return {categoria: {'productos': t['productos'], 'unidades': t['unidades'],
+                            'valor': round(t['valor'], 2)}
+                for categoria, t in self._totales.items()}
+
+
+class CacheBusquedas:
+    """
+    Caché LRU de resultados de búsquedas por nombre, indexada por la consulta normalizada.
+
+    Solo se invalida lo necesario: cuando aparece, desaparece o cambia un nombre se
+    descartan las consultas que son subcadena de ese nombre (las únicas cuyo resultado
+    puede cambiar). Los cambios de cantidad o precio no la afectan, porque los
+    resultados guardan los productos mismos y no una copia de sus datos.
+
+    Durante una operación por lotes la invalidación se pausa: si algún nombre cambió,
+    al reanudar se vacía la caché completa una sola vez en lugar de revisarla por cada
+    producto.
+    """
+
+    def __init__(self, capacidad: int = 256):
+        """
+        Args:
+            capacidad: Máximo de consultas guardadas (0 desactiva la caché)
+        """
+        self.capacidad = capacidad
+        self._entradas: 'OrderedDict[str, List]' = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+        self._pausada = False
+        self._cambios_en_pausa = False
+
+    def obtener(self, consulta: str) -> Optional[List]:
+        """Devuelve el resultado guardado para la consulta normalizada, o None (y cuenta un fallo)"""
+        resultado = self._entradas.get(consulta)
+        if resultado is None or self._cambios_en_pausa:
+            self.fallos += 1
+            return None
+        self._entradas.move_to_end(consulta)
+        self.aciertos += 1
+        return resultado
+
+    def guardar(self, consulta: str, resultado: List):
+        """Guarda el resultado de una consulta normalizada, descartando la menos usada si no hay lugar"""
+        if self.capacidad <= 0 or self._cambios_en_pausa:
+            return
+        self._entradas[consulta] = resultado
+        self._entradas.move_to_end(consulta)
+        if len(self._entradas) > self.capacidad:
+            self._entradas.popitem(last=False)
+
+    def invalidar(self, nombre: str):
+        """Descarta las consultas cuyo resultado puede cambiar porque cambió este nombre"""
+        if not self._entradas:
+            return
+        if self._pausada:
+            self._cambios_en_pausa = True
+            return
+        normalizado = normalizar_texto(nombre)
+        for consulta in [c for c in self._entradas if c in normalizado]:
+            del self._entradas[consulta]
+
+    def pausar(self):
+        """Deja de invalidar consulta por consulta (al empezar un lote)"""
+        self._pausada = True
+
+    def reanudar(self):
+        """Vuelve a invalidar con precisión y vacía la caché si hubo cambios durante la pausa"""
+        if self._cambios_en_pausa:
+            self._entradas.clear()
+        self._pausada = False
+        self._cambios_en_pausa = False
+
+    def limpiar(self):
+        """Descarta todas las consultas guardadas (los contadores se mantienen)"""
+        self._entradas.clear()
+
+    def estadisticas(self) -> Dict:
+        """Aciertos, fallos, tasa de aciertos y ocupación, para dimensionar la caché"""
+        consultas = self.aciertos + self.fallos
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': round(self.aciertos / consultas, 4) if consultas else 0.0,
+            'entradas': len(self._entradas),
+            'capacidad': self.capacidad,
+        }
@@ -1,7 +1,58 @@
 from producto import Producto
+from compresion import abrir_archivo, escribir_atomicamente
+from eventos import (EVENTOS_POR_CAMPO, ColaEventos, EmisorEventos, Evento, InventarioRecargado,
+                     ProductoAgregado, ProductoEliminado, TiposEvento)
+from indices import (ArbolBK, CacheBusquedas, IndiceCategorias, IndiceOrdenado, IndicePrefijos,
+                     IndiceTrigramas, normalizar_texto)
+from lector_json import iterar_arreglo_json
+from snapshot_binario import SnapshotBinario, escribir_snapshot
 import json
 import os
-from typing import Dict, List, Optional
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+
+class ErrorLote(ValueError):
+    """
+    Error al validar una operación por lotes. Contiene todas las filas con problemas
+    como una lista de tuplas (posición en el lote, mensaje) en el atributo `errores`.
+    """
+
+    def __init__(self, errores: List[Tuple[int, str]]):
+        self.errores = errores
+        detalle = "; ".join(f"fila {fila}: {mensaje}" for fila, mensaje in errores[:10])
+        if len(errores) > 10:
+            detalle += f"; ... ({len(errores) - 10} errores más)"
+        super().__init__(f"El lote tiene {len(errores)} fila(s) inválida(s): {detalle}")
+
+    def __reduce__(self):
+        # Por omisión se reconstruiría con el mensaje en lugar de la lista de errores
+        # (por ejemplo, al volver de otro proceso)
+        return type(self), (self.errores,)
+
+
+def _es_numero(valor) -> bool:
+    """Verifica que el valor sea numérico (int o float, pero no bool)"""
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool)
+
+
+def ruta_delta(nombre_archivo: str) -> str:
+    """Devuelve la ruta del archivo de cambios que acompaña a una copia JSON"""
+    return nombre_archivo + ".delta"
+
+
+def _leer_delta(ruta: str) -> Iterator[Dict]:
+    """
+    Recorre los grupos de cambios de un archivo delta (una línea JSON por guardado).
+    Una última línea incompleta, por un corte en medio de la escritura, se ignora.
+    """
+    if not os.path.exists(ruta):
+        return
+    with open(ruta, 'r', encoding='utf-8') as archivo:
+        for linea in archivo:
+            if not linea.endswith("\n"):
+                break
+            yield json.loads(linea)
 
 
 class Inventario:
@@ -10,9 +61,40 @@ class Inventario:
     Utiliza un diccionario para almacenar los productos, permitiendo operaciones eficientes.
     """
 
-    def __init__(self):
+    def __init__(self, cache_busquedas: int = 256):
+        """
+        Args:
+            cache_busquedas: Cuántas búsquedas por nombre recordar (0 para no usar caché)
+        """
         # Usamos un diccionario para acceso rápido por ID (O(1) para búsquedas por ID)
         self._productos: Dict[int, Producto] = {}
+        # Índice invertido de trigramas para buscar por nombre sin recorrer todo el inventario
+        self._indice_nombres = IndiceTrigramas()
+        # Nombres ordenados para autocompletar por prefijo
+        self._indice_prefijos = IndicePrefijos()
+        # Árbol BK para búsquedas tolerantes a errores de escritura
+        self._indice_aproximado = ArbolBK()
+        # Índices ordenados por precio y por cantidad para consultas por rango
+        self._indice_precios = IndiceOrdenado()
+        self._indice_cantidades = IndiceOrdenado()
+        # Productos agrupados por categoría con sus totales
+        self._indice_categorias = IndiceCategorias()
+        # Resultados recientes de buscar_por_nombre (las terminales repiten mucho las mismas)
+        self._cache_busquedas = CacheBusquedas(cache_busquedas)
+        # Totales acumulados que se actualizan en O(1) con cada cambio
+        self._unidades_totales = 0
+        self._valor_total = 0.0
+        # Cambios de los índices ordenados acumulados durante un lote (None fuera de un lote)
+        self._reordenes_pendientes: Optional[Dict[object, Dict[int, object]]] = None
+        # IDs a quitar de los índices ordenados al terminar el lote en curso
+        self._quitados_pendientes: Dict[object, Set[int]] = {}
+        # IDs agregados, eliminados o modificados desde la última vez que se cargó o guardó
+        self._sucios: Set[int] = set()
+        # Suscriptores a los eventos de cambio (altas, bajas y cambios de campos)
+        self._eventos = EmisorEventos()
+        # Un solo observador para todos los productos: cada acceso a self._al_cambiar_producto
+        # crea un método ligado nuevo, y cada producto guardaría el suyo
+        self._observadores_productos = (self._al_cambiar_producto,)
 
     def agregar_producto(self, producto: Producto) -> bool:
         """
@@ -27,7 +109,7 @@ class Inventario:
         if producto.id in self._productos:
             return False  # El ID ya existe
 
-        self._productos[producto.id] = producto
+        self._registrar(producto)
         return True
 
     def eliminar_producto(self, id_producto: int) -> bool:
@@ -41,7 +123,7 @@ class Inventario:
             True si se eliminó correctamente, False si el ID no existe.
         """
         if id_producto in self._productos:
-            del self._productos[id_producto]
+            self._desregistrar(self._productos[id_producto])
             return True
         return False
 
@@ -69,25 +151,228 @@ class Inventario:
 
         return True
 
+    def ajustar_cantidad(self, id_producto: int, diferencia: int) -> bool:
+        """
+        Suma (o resta, si es negativa) unidades al stock de un producto en un solo paso,
+        sin que quien llama tenga que leer la cantidad y volver a escribirla.
+
+        Args:
+            id_producto: ID del producto
+            diferencia: Unidades a sumar (negativo para descontar)
+
+        Returns:
+            True si se ajustó, False si el ID no existe o la cantidad quedaría negativa.
+        """
+        producto = self._productos.get(id_producto)
+        if producto is None or producto.cantidad + diferencia < 0:
+            return False
+        producto.cantidad += diferencia
+        return True
+
+    def despachar(self, carrito: Union[Dict[int, int], Iterable[Tuple[int, int]]]) -> Dict:
+        """
+        Descuenta del stock todas las líneas de un carrito de una sola vez. Si alguna
+        línea no se puede atender no se descuenta ninguna (todo o nada).
+
+        Args:
+            carrito: Diccionario ID -> unidades, o pares (ID, unidades); un mismo ID
+                puede aparecer en varias líneas y se suman
+
+        Returns:
+            Diccionario con 'despachado' (True si se descontó el carrito) y 'lineas':
+            una entrada por línea, en el mismo orden, con 'id', 'cantidad', 'disponible'
+            (stock antes de despachar) y 'estado' ('ok', 'no_existe',
+            'cantidad_invalida' o 'sin_stock').
+        """
+        lineas = list(carrito.items()) if isinstance(carrito, dict) else list(carrito)
+        resultado = []
+        pedidos: Dict[int, int] = {}  # unidades pedidas por ID sumando todas sus líneas
+        despachado = True
+        for id_producto, cantidad in lineas:
+            producto = self._productos.get(id_producto)
+            disponible = producto.cantidad if producto is not None else 0
+            if producto is None:
+                estado = 'no_existe'
+            elif not isinstance(cantidad, int) or isinstance(cantidad, bool) or cantidad <= 0:
+                estado = 'cantidad_invalida'
+            elif pedidos.get(id_producto, 0) + cantidad > disponible:
+                estado = 'sin_stock'
+            else:
+                pedidos[id_producto] = pedidos.get(id_producto, 0) + cantidad
+                estado = 'ok'
+            despachado = despachado and estado == 'ok'
+            resultado.append({'id': id_producto, 'cantidad': cantidad,
+                              'disponible': disponible, 'estado': estado})
+
+        if despachado:
+            for id_producto, pedido in pedidos.items():
+                self._productos[id_producto].cantidad -= pedido
+        return {'despachado': despachado, 'lineas': resultado}
+
+    def agregar_lote(self, productos: Iterable[Producto]) -> int:
+        """
+        Agrega varios productos a la vez. Primero se valida todo el lote y solo si
+        no hay errores se aplican los cambios (todo o nada).
+
+        Args:
+            productos: Productos a agregar
+
+        Returns:
+            Número de productos agregados.
+
+        Raises:
+            ErrorLote: Si algún ID ya existe o se repite dentro del lote.
+        """
+        productos = list(productos)
+        errores = self._errores_alta(productos)
+        if errores:
+            raise ErrorLote(errores)
+
+        with self._lote():
+            for producto in productos:
+                self._registrar(producto)
+        return len(productos)
+
+    def actualizar_lote(self, cambios: Iterable[Tuple[int, Optional[int], Optional[float]]]) -> int:
+        """
+        Actualiza cantidad y/o precio de varios productos. Se valida todo el lote
+        antes de tocar el inventario, así que o se aplican todos los cambios o ninguno.
+        Los índices ordenados se reconstruyen una sola vez al final.
+
+        Args:
+            cambios: Tuplas (id, cantidad, precio); cantidad o precio pueden ser None
+
+        Returns:
+            Número de productos actualizados.
+
+        Raises:
+            ErrorLote: Con todas las filas inválidas (ID inexistente o repetido,
+                cantidad o precio negativos o no numéricos).
+        """
+        cambios = list(cambios)
+        errores = self._errores_actualizacion(cambios)
+        if errores:
+            raise ErrorLote(errores)
+
+        # Aplicamos con los setters para que los observadores y totales sigan al día;
+        # como el lote ya está validado, ninguna asignación puede fallar a mitad de camino.
+        with self._lote():
+            for id_producto, cantidad, precio in cambios:
+                producto = self._productos[id_producto]
+                if cantidad is not None:
+                    producto.cantidad = cantidad
+                if precio is not None:
+                    producto.precio = precio
+        return len(cambios)
+
+    def eliminar_lote(self, ids: Iterable[int]) -> int:
+        """
+        Elimina varios productos a la vez (todo o nada).
+
+        Args:
+            ids: IDs de los productos a eliminar
+
+        Returns:
+            Número de productos eliminados.
+
+        Raises:
+            ErrorLote: Si algún ID no existe o se repite dentro del lote.
+        """
+        ids = list(ids)
+        errores = []
+        vistos = set()
+        for fila, id_producto in enumerate(ids):
+            if id_producto not in self._productos:
+                errores.append((fila, f"no existe un producto con ID {id_producto}"))
+            elif id_producto in vistos:
+                errores.append((fila, f"el ID {id_producto} está repetido en el lote"))
+            vistos.add(id_producto)
+        if errores:
+            raise ErrorLote(errores)
+
+        with self._lote():
+            for id_producto in ids:
+                self._desregistrar(self._productos[id_producto])
+        return len(ids)
+
+    def ajustar_precios(self, porcentaje: float,
+                        filtro: Optional[Callable[[Producto], bool]] = None) -> int:
+        """
+        Sube o baja en un porcentaje el precio de los productos que cumplen el filtro.
+        Por ejemplo, ajustar_precios(10, lambda p: p.categoria == "Lácteos") sube un 10 %
+        los lácteos. Los precios resultantes se redondean a centavos.
+
+        Args:
+            porcentaje: Porcentaje de ajuste (negativo para bajar, mayor que -100)
+            filtro: Función que decide qué productos ajustar (todos si es None)
+
+        Returns:
+            Número de productos cuyo precio se ajustó.
+        """
+        if porcentaje <= -100:
+            raise ValueError("El porcentaje debe ser mayor que -100")
+        factor = 1 + porcentaje / 100
+        cambios = [(producto.id, None, round(producto.precio * factor, 2))
+                   for producto in self._productos.values()
+                   if filtro is None or filtro(producto)]
+        return self.actualizar_lote(cambios)
+
     def buscar_por_nombre(self, nombre: str) -> List[Producto]:
         """
-        Busca productos por nombre (búsqueda parcial case-insensitive).
+        Busca productos por nombre (búsqueda parcial sin distinguir mayúsculas ni tildes).
+        Usa el índice de trigramas, así que solo revisa los productos candidatos, y
+        recuerda los resultados de las búsquedas recientes hasta que cambie un nombre
+        que las afecte.
 
         Args:
             nombre: Texto a buscar en los nombres de productos
 
         Returns:
-            Lista de productos que coinciden con el nombre.
+            Lista de productos que coinciden con el nombre, ordenada por ID.
         """
-        resultados = []
-        nombre_lower = nombre.lower()
+        consulta = normalizar_texto(nombre)
+        productos = self._cache_busquedas.obtener(consulta)
+        if productos is None:
+            productos = [self._productos[i] for i in self._indice_nombres.buscar(consulta)]
+            self._cache_busquedas.guardar(consulta, productos)
+        # Una copia, para que quien llama pueda modificar la lista sin tocar la caché
+        return list(productos)
+
+    def estadisticas_cache_busquedas(self) -> Dict:
+        """
+        Devuelve aciertos, fallos, tasa de aciertos y ocupación de la caché de
+        buscar_por_nombre, para decidir su capacidad.
+        """
+        return self._cache_busquedas.estadisticas()
 
-        # Recorremos todos los productos para buscar coincidencias
-        for producto in self._productos.values():
-            if nombre_lower in producto.nombre.lower():
-                resultados.append(producto)
+    def buscar_aproximado(self, nombre: str, max_distancia: int = 2) -> List[Tuple[Producto, int]]:
+        """
+        Busca productos cuyo nombre está a lo sumo a `max_distancia` ediciones del texto
+        (por ejemplo "Aseite" encuentra "Aceite"). No distingue mayúsculas ni tildes.
+
+        Args:
+            nombre: Nombre, posiblemente mal escrito, a buscar
+            max_distancia: Máximo número de letras erradas permitido
+
+        Returns:
+            Lista de tuplas (producto, distancia) ordenada de la más cercana a la más lejana.
+        """
+        return [(self._productos[i], distancia)
+                for i, distancia in self._indice_aproximado.buscar(nombre, max_distancia)]
+
+    def autocompletar(self, prefijo: str, limite: int = 10) -> List[Producto]:
+        """
+        Sugiere productos cuyo nombre empieza con el prefijo (sin distinguir
+        mayúsculas ni tildes), pensado para búsquedas mientras se escribe.
+
+        Args:
+            prefijo: Inicio del nombre escrito hasta el momento
+            limite: Máximo de sugerencias a devolver
 
-        return resultados
+        Returns:
+            Lista de hasta `limite` productos en orden alfabético.
+        """
+        return [self._productos[i] for i in self._indice_prefijos.buscar(prefijo, limite)]
 
     def buscar_por_id(self, id_producto: int) -> Optional[Producto]:
         """
@@ -101,6 +386,44 @@ class Inventario:
         """
         return self._productos.get(id_producto)
 
+    def buscar_por_rango_precio(self, minimo: Optional[float] = None,
+                                maximo: Optional[float] = None) -> List[Producto]:
+        """
+        Busca productos con precio entre `minimo` y `maximo` (ambos incluidos).
+
+        Args:
+            minimo: Precio mínimo en dólares (opcional)
+            maximo: Precio máximo en dólares (opcional)
+
+        Returns:
+            Lista de productos ordenada de menor a mayor precio.
+        """
+        return [self._productos[i] for i in self._indice_precios.rango(minimo, maximo)]
+
+    def buscar_por_rango_cantidad(self, minimo: Optional[int] = None,
+                                  maximo: Optional[int] = None) -> List[Producto]:
+        """
+        Busca productos con cantidad entre `minimo` y `maximo` (ambos incluidos).
+        Por ejemplo, buscar_por_rango_cantidad(maximo=9) devuelve los de menos de 10 unidades.
+
+        Args:
+            minimo: Cantidad mínima (opcional)
+            maximo: Cantidad máxima (opcional)
+
+        Returns:
+            Lista de productos ordenada de menor a mayor cantidad.
+        """
+        return [self._productos[i] for i in self._indice_cantidades.rango(minimo, maximo)]
+
+    def productos_por_precio(self, descendente: bool = False) -> Iterator[Producto]:
+        """
+        Recorre los productos ordenados por precio usando el índice, sin ordenar la lista.
+
+        Args:
+            descendente: True para ir del más caro al más barato
+        """
+        return (self._productos[i] for i in self._indice_precios.recorrer(descendente))
+
     def mostrar_todos(self) -> List[Producto]:
         """
         Obtiene todos los productos del inventario.
@@ -119,9 +442,48 @@ class Inventario:
         """
         return len(self._productos)
 
+    def estadisticas(self) -> Dict:
+        """
+        Devuelve los totales del inventario sin recorrer los productos,
+        ya que se mantienen al día con cada alta, baja y modificación.
+
+        Returns:
+            Diccionario con 'productos', 'unidades_totales' y 'valor_total' (USD).
+        """
+        return {
+            'productos': len(self._productos),
+            'unidades_totales': self._unidades_totales,
+            # Redondeamos a centavos para ocultar el error acumulado de punto flotante
+            'valor_total': round(self._valor_total, 2)
+        }
+
+    def resumen_por_categoria(self) -> Dict[Optional[str], Dict]:
+        """
+        Devuelve, para cada categoría, cuántos productos tiene, sus unidades y su valor
+        en dólares. Los productos sin categoría aparecen bajo la clave None.
+        El costo es proporcional al número de categorías, no al de productos.
+
+        Returns:
+            Diccionario categoría -> {'productos', 'unidades', 'valor'}.
+        """
+        return self._indice_categorias.resumen()
+
+    def productos_por_categoria(self, categoria: Optional[str]) -> List[Producto]:
+        """
+        Obtiene los productos de una categoría, ordenados por ID.
+
+        Args:
+            categoria: Nombre de la categoría (None para los productos sin categoría)
+
+        Returns:
+            Lista de productos de esa categoría (vacía si no existe).
+        """
+        return [self._productos[i] for i in sorted(self._indice_categorias.ids(categoria))]
+
     def guardar_en_archivo(self, nombre_archivo: str) -> bool:
         """
-        Guarda el inventario completo en un archivo JSON.
+        Guarda el inventario completo en un archivo JSON. Si el nombre termina en
+        ".gz", ".xz" o ".lzma" el archivo se comprime mientras se escribe.
 
         Args:
             nombre_archivo: Ruta del archivo donde guardar
@@ -130,23 +492,134 @@ class Inventario:
             True si se guardó correctamente, False en caso de error.
         """
         try:
-            # Convertimos todos los productos a diccionarios
-            datos = [producto.to_dict() for producto in self._productos.values()]
+            escribir = self.preparar_copia(nombre_archivo)
+        except Exception as e:
+            print(f"Error al guardar el inventario: {e}")
+            return False
+        return escribir()
 
-            with open(nombre_archivo, 'w', encoding='utf-8') as archivo:
-                json.dump(datos, archivo, indent=4, ensure_ascii=False)
+    def hay_cambios(self) -> bool:
+        """Indica si hubo altas, bajas o modificaciones desde la última carga o guardado"""
+        return bool(self._sucios)
 
-            return True
+    def guardar_cambios(self, nombre_archivo: str, consolidar_desde: float = 0.25) -> bool:
+        """
+        Guarda solo lo que cambió desde la última carga o guardado. Si no hubo cambios no
+        escribe nada; si los hubo, agrega una línea al archivo delta (nombre_archivo + ".delta")
+        con los productos modificados y los IDs eliminados. Cuando el delta supera
+        `consolidar_desde` veces el tamaño de la copia, se reescribe la copia completa
+        y el delta se borra.
+
+        Args:
+            nombre_archivo: Ruta de la copia JSON completa
+            consolidar_desde: Proporción delta/copia a partir de la cual se consolida
+
+        Returns:
+            True si se guardó correctamente (o no hacía falta), False en caso de error.
+        """
+        try:
+            escribir = self.preparar_cambios(nombre_archivo, consolidar_desde)
         except Exception as e:
-            print(f"Error al guardar el inventario: {e}")
+            print(f"Error al guardar los cambios del inventario: {e}")
             return False
+        return escribir()
 
-    def cargar_desde_archivo(self, nombre_archivo: str) -> bool:
+    def preparar_cambios(self, nombre_archivo: str, consolidar_desde: float = 0.25) -> Callable[[], bool]:
         """
-        Carga el inventario desde un archivo JSON.
+        Hace la parte de guardar_cambios que lee el inventario y devuelve la función que
+        escribe el archivo. Esa función ya no toca los productos, así que puede correr en
+        otro hilo mientras el inventario se sigue modificando (los cambios que lleguen
+        quedan para el próximo guardado). Si la escritura falla, los productos vuelven a
+        quedar como cambiados.
+
+        Args:
+            nombre_archivo: Ruta de la copia JSON completa
+            consolidar_desde: Proporción delta/copia a partir de la cual se consolida
+
+        Returns:
+            Función sin argumentos que escribe y devuelve True si lo logró, False si no.
+
+        Raises:
+            OSError: Si no se pudo consultar el tamaño de los archivos.
+        """
+        if not os.path.exists(nombre_archivo):
+            return self.preparar_copia(nombre_archivo)
+        if not self._sucios:
+            return lambda: True
+        delta = ruta_delta(nombre_archivo)
+        if (os.path.exists(delta)
+                and os.path.getsize(delta) > consolidar_desde * os.path.getsize(nombre_archivo)):
+            return self.preparar_copia(nombre_archivo)
+
+        guardar, eliminar = [], []
+        for id_producto in sorted(self._sucios):
+            producto = self._productos.get(id_producto)
+            if producto is None:
+                eliminar.append(id_producto)
+            else:
+                guardar.append(producto.to_dict())
+        guardados = self._tomar_sucios()
+
+        def escribir() -> bool:
+            try:
+                with open(delta, 'a', encoding='utf-8') as archivo:
+                    archivo.write(json.dumps({'guardar': guardar, 'eliminar': eliminar},
+                                             ensure_ascii=False) + "\n")
+                    archivo.flush()
+                    os.fsync(archivo.fileno())
+                return True
+            except Exception as e:
+                print(f"Error al guardar los cambios del inventario: {e}")
+                self._sucios.update(guardados)
+                return False
+
+        return escribir
+
+    def preparar_copia(self, nombre_archivo: str) -> Callable[[], bool]:
+        """
+        Como preparar_cambios, pero para la copia completa de guardar_en_archivo: la
+        función devuelta la escribe en un archivo temporal y la renombra.
+        """
+        # Convertimos todos los productos a diccionarios
+        datos = [producto.to_dict() for producto in self._recorrer_productos()]
+        guardados = self._tomar_sucios()
+
+        def escribir() -> bool:
+            try:
+                # Se escribe en un temporal y se renombra, así un corte no deja el archivo a medias
+                with escribir_atomicamente(nombre_archivo) as archivo:
+                    json.dump(datos, archivo, indent=4, ensure_ascii=False)
+
+                # La copia completa ya incluye los cambios que estaban en el delta
+                if os.path.exists(ruta_delta(nombre_archivo)):
+                    os.remove(ruta_delta(nombre_archivo))
+                return True
+            except Exception as e:
+                print(f"Error al guardar el inventario: {e}")
+                self._sucios.update(guardados)
+                return False
+
+        return escribir
+
+    def _marcar_cambiado(self, id_producto: int):
+        """Anota que el producto cambió, para que guardar_cambios lo incluya"""
+        self._sucios.add(id_producto)
+
+    def _tomar_sucios(self) -> Set[int]:
+        """Devuelve los IDs cambiados y empieza a anotar los siguientes en un conjunto nuevo"""
+        sucios, self._sucios = self._sucios, set()
+        return sucios
+
+    def cargar_desde_archivo(self, nombre_archivo: str, validar: bool = True) -> bool:
+        """
+        Carga el inventario desde un archivo JSON leyéndolo de forma incremental.
+        Los archivos ".gz", ".xz" y ".lzma" se descomprimen a medida que se leen.
+        Si existe un archivo delta (ver guardar_cambios) sus cambios se aplican encima.
 
         Args:
             nombre_archivo: Ruta del archivo desde donde cargar
+            validar: False para omitir las validaciones de Producto cuando el archivo
+                es una copia confiable guardada por este mismo sistema
 
         Returns:
             True si se cargó correctamente, False en caso de error.
@@ -156,20 +629,310 @@ class Inventario:
             if not os.path.exists(nombre_archivo):
                 return False
 
-            with open(nombre_archivo, 'r', encoding='utf-8') as archivo:
-                datos = json.load(archivo)
-
-            # Limpiamos el inventario actual y cargamos los nuevos datos
-            self._productos.clear()
-            for item in datos:
-                producto = Producto.from_dict(item)
-                self._productos[producto.id] = producto
+            # Leemos el arreglo elemento por elemento y creamos cada Producto de inmediato,
+            # sin construir antes la lista completa de diccionarios en memoria
+            with abrir_archivo(nombre_archivo, 'r') as archivo:
+                productos = {}
+                for item in iterar_arreglo_json(archivo):
+                    producto = Producto.from_dict(item, validar)
+                    productos[producto.id] = producto
+
+            # Los grupos del delta se aplican en el orden en que se guardaron
+            for cambios in _leer_delta(ruta_delta(nombre_archivo)):
+                for item in cambios['guardar']:
+                    producto = Producto.from_dict(item, validar)
+                    productos[producto.id] = producto
+                for id_producto in cambios['eliminar']:
+                    productos.pop(id_producto, None)
+
+            # Solo si todo el archivo se leyó bien reemplazamos el inventario actual
+            with self._eventos.en_silencio():
+                self._limpiar()
+                with self._lote():
+                    for producto in productos.values():
+                        self._registrar(producto)
+                self._sucios.clear()
+            self._eventos.emitir(InventarioRecargado())
 
             return True
         except Exception as e:
             print(f"Error al cargar el inventario: {e}")
             return False
 
+    def guardar_snapshot_binario(self, nombre_archivo: str) -> bool:
+        """
+        Guarda el inventario en el formato binario de snapshot_binario, que se abre
+        con mmap mucho más rápido que el JSON. El JSON sigue siendo el formato de intercambio.
+
+        Args:
+            nombre_archivo: Ruta del archivo binario
+
+        Returns:
+            True si se guardó correctamente, False en caso de error.
+        """
+        try:
+            escribir_snapshot(self._recorrer_productos(), nombre_archivo)
+            return True
+        except Exception as e:
+            print(f"Error al guardar la copia binaria: {e}")
+            return False
+
+    def cargar_snapshot_binario(self, nombre_archivo: str, verificar: bool = True) -> bool:
+        """
+        Carga el inventario desde una copia binaria. Los registros se leen directamente
+        del archivo mapeado en memoria, sin decodificar JSON.
+
+        Args:
+            nombre_archivo: Ruta del archivo binario
+            verificar: Comprobar el CRC del archivo antes de cargarlo
+
+        Returns:
+            True si se cargó correctamente, False en caso de error.
+        """
+        try:
+            if not os.path.exists(nombre_archivo):
+                return False
+
+            with SnapshotBinario(nombre_archivo, verificar) as snapshot:
+                productos = list(snapshot)
+
+            with self._eventos.en_silencio():
+                self._limpiar()
+                with self._lote():
+                    for producto in productos:
+                        self._registrar(producto)
+                self._sucios.clear()
+            self._eventos.emitir(InventarioRecargado())
+            return True
+        except Exception as e:
+            print(f"Error al cargar la copia binaria: {e}")
+            return False
+
+    def suscribir(self, funcion: Callable[[Evento], None], tipos: TiposEvento = None
+                  ) -> Callable[[Evento], None]:
+        """
+        Llama a la función con cada evento de cambio del inventario (ver eventos.py),
+        en el momento y en el mismo hilo que hizo el cambio. Los cambios hechos
+        directamente con los setters de un producto del inventario también se avisan.
+
+        Args:
+            funcion: Recibe el evento; debe ser rápida y no modificar el inventario
+            tipos: Clases de evento que interesan, por ejemplo (CantidadCambiada,)
+                (None para recibirlos todos)
+
+        Returns:
+            La misma función, para poder desuscribirla después.
+        """
+        self._eventos.suscribir(funcion, tipos)
+        return funcion
+
+    def desuscribir(self, funcion: Callable[[Evento], None]) -> bool:
+        """
+        Deja de enviarle eventos a la función.
+
+        Returns:
+            True si estaba suscrita, False si no.
+        """
+        return self._eventos.desuscribir(funcion)
+
+    def cola_de_eventos(self, capacidad: int = 1000, tipos: TiposEvento = None,
+                        bloquear: bool = False) -> ColaEventos:
+        """
+        Crea una suscripción que guarda los eventos en una cola limitada, para
+        consumirlos desde otro hilo sin frenar las operaciones del inventario.
+
+        Args:
+            capacidad: Máximo de eventos sin consumir; si se llena los nuevos se
+                descartan y se cuentan en perdidos (salvo con bloquear=True)
+            tipos: Clases de evento que interesan (None para todas)
+            bloquear: Hacer esperar al inventario cuando la cola está llena
+
+        Returns:
+            La cola; se deja de llenar con cerrar().
+        """
+        return ColaEventos(self._eventos, capacidad, tipos, bloquear)
+
+    def _errores_alta(self, productos: List[Producto]) -> List[Tuple[int, str]]:
+        """Filas de un lote de altas cuyo ID ya existe o se repite, con su mensaje"""
+        errores = []
+        vistos = set()
+        for fila, producto in enumerate(productos):
+            if producto.id in self._productos:
+                errores.append((fila, f"ya existe un producto con ID {producto.id}"))
+            elif producto.id in vistos:
+                errores.append((fila, f"el ID {producto.id} está repetido en el lote"))
+            vistos.add(producto.id)
+        return errores
+
+    def _errores_actualizacion(self, cambios: List[Tuple[int, Optional[int], Optional[float]]]
+                               ) -> List[Tuple[int, str]]:
+        """Filas de un lote de actualizaciones que no se pueden aplicar, con su mensaje"""
+        errores = []
+        vistos = set()
+        for fila, (id_producto, cantidad, precio) in enumerate(cambios):
+            if id_producto not in self._productos:
+                errores.append((fila, f"no existe un producto con ID {id_producto}"))
+            elif id_producto in vistos:
+                errores.append((fila, f"el ID {id_producto} está repetido en el lote"))
+            vistos.add(id_producto)
+            if cantidad is not None and (not _es_numero(cantidad) or cantidad < 0):
+                errores.append((fila, f"cantidad inválida: {cantidad!r}"))
+            if precio is not None and (not _es_numero(precio) or precio < 0):
+                errores.append((fila, f"precio inválido: {precio!r}"))
+        return errores
+
+    def _registrar(self, producto: Producto):
+        """Guarda el producto, lo indexa y se suscribe a sus cambios"""
+        self._productos[producto.id] = producto
+        self._indexar(producto)
+        self._suscribir(producto)
+        self._marcar_cambiado(producto.id)
+        if self._eventos.activo():
+            self._eventos.emitir(ProductoAgregado(producto.id, None, producto.to_dict()))
+
+    def _desregistrar(self, producto: Producto):
+        """Quita el producto del inventario y de todos los índices"""
+        # Los datos se toman antes de quitarlo: algunos almacenes no los conservan después
+        datos = producto.to_dict() if self._eventos.activo() else None
+        id_producto = producto.id
+        self._desuscribir(producto)
+        self._desindexar(producto)
+        del self._productos[id_producto]
+        self._marcar_cambiado(id_producto)
+        if datos is not None:
+            self._eventos.emitir(ProductoEliminado(id_producto, datos, None))
+
+    def _indexar(self, producto: Producto):
+        """Agrega el producto a los índices y a los totales"""
+        # Cada atributo se lee una vez: en las cargas masivas esto corre por cada producto
+        id_producto, nombre, cantidad, precio = producto.id, producto.nombre, producto.cantidad, producto.precio
+        self._cache_busquedas.invalidar(nombre)
+        self._indice_nombres.agregar(id_producto, nombre)
+        self._reordenar(self._indice_prefijos, id_producto, nombre)
+        self._indice_aproximado.agregar(id_producto, nombre)
+        self._reordenar(self._indice_precios, id_producto, precio)
+        self._reordenar(self._indice_cantidades, id_producto, cantidad)
+        self._indice_categorias.agregar(id_producto, producto.categoria, cantidad, cantidad * precio)
+        self._unidades_totales += cantidad
+        self._valor_total += cantidad * precio
+
+    def _desindexar(self, producto: Producto):
+        """Quita el producto de los índices y de los totales"""
+        self._cache_busquedas.invalidar(producto.nombre)
+        self._indice_nombres.eliminar(producto.id)
+        self._quitar_ordenado(self._indice_prefijos, producto.id)
+        self._indice_aproximado.eliminar(producto.id)
+        self._quitar_ordenado(self._indice_precios, producto.id)
+        self._quitar_ordenado(self._indice_cantidades, producto.id)
+        self._indice_categorias.eliminar(producto.id, producto.categoria, producto.cantidad,
+                                         producto.cantidad * producto.precio)
+        self._unidades_totales -= producto.cantidad
+        self._valor_total -= producto.cantidad * producto.precio
+
+    def _recorrer_productos(self) -> Iterable[Producto]:
+        """Recorre todos los productos para guardarlos en un archivo"""
+        return self._productos.values()
+
+    def _suscribir(self, producto: Producto):
+        """Empieza a escuchar los cambios del producto"""
+        producto.agregar_observadores(self._observadores_productos)
+
+    def _desuscribir(self, producto: Producto):
+        """Deja de escuchar los cambios del producto"""
+        producto.quitar_observador(self._observadores_productos[0])
+
+    def _limpiar(self):
+        """Vacía el inventario y sus índices"""
+        for producto in self._productos.values():
+            self._desuscribir(producto)
+        self._productos.clear()
+        self._indice_nombres.limpiar()
+        self._indice_prefijos.limpiar()
+        self._indice_aproximado.limpiar()
+        self._indice_precios.limpiar()
+        self._indice_cantidades.limpiar()
+        self._indice_categorias.limpiar()
+        self._cache_busquedas.limpiar()
+        self._unidades_totales = 0
+        self._valor_total = 0.0
+        self._sucios.clear()
+
+    def _al_cambiar_producto(self, producto: Producto, campo: str, anterior, nuevo):
+        """Registra el cambio de un producto hecho a través de sus setters"""
+        self._marcar_cambiado(producto.id)
+        self._reindexar(producto, campo, anterior, nuevo)
+        if self._eventos.activo():
+            self._eventos.emitir(EVENTOS_POR_CAMPO[campo](producto.id, anterior, nuevo))
+
+    def _reindexar(self, producto: Producto, campo: str, anterior, nuevo):
+        """Mantiene los índices y totales al día cuando cambia un campo del producto"""
+        if campo == 'nombre':
+            self._cache_busquedas.invalidar(anterior)
+            self._cache_busquedas.invalidar(nuevo)
+            self._indice_nombres.actualizar(producto.id, nuevo)
+            self._reordenar(self._indice_prefijos, producto.id, nuevo)
+            self._indice_aproximado.actualizar(producto.id, nuevo)
+        elif campo == 'cantidad':
+            self._reordenar(self._indice_cantidades, producto.id, nuevo)
+            self._indice_categorias.ajustar(producto.categoria, nuevo - anterior,
+                                            (nuevo - anterior) * producto.precio)
+            self._unidades_totales += nuevo - anterior
+            self._valor_total += (nuevo - anterior) * producto.precio
+        elif campo == 'precio':
+            self._reordenar(self._indice_precios, producto.id, nuevo)
+            self._indice_categorias.ajustar(producto.categoria, 0, producto.cantidad * (nuevo - anterior))
+            self._valor_total += producto.cantidad * (nuevo - anterior)
+        elif campo == 'categoria':
+            valor = producto.cantidad * producto.precio
+            self._indice_categorias.eliminar(producto.id, anterior, producto.cantidad, valor)
+            self._indice_categorias.agregar(producto.id, nuevo, producto.cantidad, valor)
+
+    def _reordenar(self, indice, id_producto: int, valor):
+        """
+        Agrega o reubica un producto en un índice ordenado (prefijos, precios o cantidades),
+        o deja el cambio pendiente si hay un lote en curso.
+        """
+        if self._reordenes_pendientes is None:
+            indice.actualizar(id_producto, valor)
+        else:
+            self._reordenes_pendientes.setdefault(indice, {})[id_producto] = valor
+
+    def _quitar_ordenado(self, indice, id_producto: int):
+        """
+        Quita un producto de un índice ordenado. Durante un lote se descarta su cambio
+        pendiente y se anota para quitarlo junto con los demás al terminar.
+        """
+        if self._reordenes_pendientes is None:
+            indice.eliminar(id_producto)
+        else:
+            self._reordenes_pendientes.get(indice, {}).pop(id_producto, None)
+            self._quitados_pendientes.setdefault(indice, set()).add(id_producto)
+
+    @contextmanager
+    def _lote(self):
+        """
+        Agrupa los cambios de los índices ordenados y los aplica juntos al terminar,
+        para que cargar o modificar miles de productos no reubique uno por uno.
+        La caché de búsquedas tampoco se revisa producto por producto: si cambió algún
+        nombre, se vacía una vez al final.
+        """
+        if self._reordenes_pendientes is not None:
+            yield  # ya hay un lote en curso
+            return
+        self._reordenes_pendientes = {}
+        self._cache_busquedas.pausar()
+        try:
+            yield
+        finally:
+            pendientes, self._reordenes_pendientes = self._reordenes_pendientes, None
+            quitados, self._quitados_pendientes = self._quitados_pendientes, {}
+            # Primero las bajas: un ID quitado y vuelto a agregar en el lote queda con su valor nuevo
+            for indice, ids in quitados.items():
+                indice.eliminar_varios(ids)
+            for indice, valores in pendientes.items():
+                indice.actualizar_varios(valores)
+            self._cache_busquedas.reanudar()
+
     def __len__(self) -> int:
         """Devuelve la cantidad de productos en el inventario"""
         return len(self._productos)
@@ -0,0 +1,373 @@
+import heapq
+import sys
+from array import array
+from collections.abc import MutableMapping
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from indices import _PatronLevenshtein, normalizar_texto
+from inventario import Inventario
+from producto import Producto
+
+
+class AlmacenColumnar(MutableMapping):
+    """
+    Almacena los productos por columnas en lugar de un objeto por producto.
+    IDs, cantidades y precios viven en arreglos contiguos (`array`), los nombres en
+    una tabla de strings y las categorías como códigos hacia una tabla de categorías.
+    Se comporta como un diccionario ID -> Producto que entrega vistas (VistaProducto)
+    sobre las columnas.
+    """
+
+    def __init__(self):
+        self._ids = array('q')
+        self._cantidades = array('q')
+        self._precios = array('d')
+        self._categorias = array('i')  # código en la tabla de categorías, -1 = sin categoría
+        self._nombres: List[str] = []
+        self._filas: Dict[int, int] = {}  # ID -> fila en las columnas
+        self._tabla_categorias: List[str] = []
+        self._codigos_categorias: Dict[str, int] = {}
+        # Observadores compartidos por todas las vistas (las vistas no guardan estado propio)
+        self.observadores: List[Callable] = []
+
+    def _codigo_categoria(self, categoria: Optional[str]) -> int:
+        """Devuelve el código de una categoría, registrándola si es nueva"""
+        if categoria is None:
+            return -1
+        codigo = self._codigos_categorias.get(categoria)
+        if codigo is None:
+            codigo = len(self._tabla_categorias)
+            self._tabla_categorias.append(categoria)
+            self._codigos_categorias[categoria] = codigo
+        return codigo
+
+    def __setitem__(self, id_producto: int, producto: Producto):
+        """Copia los datos del producto en las columnas (el objeto original no se guarda)"""
+        fila = self._filas.get(id_producto)
+        if fila is None:
+            self._filas[id_producto] = len(self._ids)
+            self._ids.append(id_producto)
+            self._cantidades.append(producto.cantidad)
+            self._precios.append(producto.precio)
+            self._categorias.append(self._codigo_categoria(producto.categoria))
+            self._nombres.append(producto.nombre)
+        else:
+            self._cantidades[fila] = producto.cantidad
+            self._precios[fila] = producto.precio
+            self._categorias[fila] = self._codigo_categoria(producto.categoria)
+            self._nombres[fila] = producto.nombre
+
+    def __getitem__(self, id_producto: int) -> 'VistaProducto':
+        if id_producto not in self._filas:
+            raise KeyError(id_producto)
+        return VistaProducto(self, id_producto)
+
+    def __delitem__(self, id_producto: int):
+        """Elimina en O(1) moviendo la última fila al hueco que queda"""
+        fila = self._filas.pop(id_producto)
+        ultima = len(self._ids) - 1
+        if fila != ultima:
+            id_movido = self._ids[ultima]
+            self._ids[fila] = id_movido
+            self._cantidades[fila] = self._cantidades[ultima]
+            self._precios[fila] = self._precios[ultima]
+            self._categorias[fila] = self._categorias[ultima]
+            self._nombres[fila] = self._nombres[ultima]
+            self._filas[id_movido] = fila
+        for columna in (self._ids, self._cantidades, self._precios, self._categorias, self._nombres):
+            columna.pop()
+
+    def __contains__(self, id_producto) -> bool:
+        return id_producto in self._filas
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def clear(self):
+        """Vacía todas las columnas de una vez"""
+        for columna in (self._ids, self._cantidades, self._precios, self._categorias):
+            del columna[:]
+        self._nombres.clear()
+        self._filas.clear()
+
+    def columnas(self) -> Tuple[array, array, array]:
+        """Devuelve las columnas (ids, cantidades, precios) tal como están guardadas"""
+        return self._ids, self._cantidades, self._precios
+
+    def filas(self) -> Iterator[Tuple[int, str, int, float, int]]:
+        """Recorre las filas como tuplas (id, nombre, cantidad, precio, código de categoría)"""
+        return zip(self._ids, self._nombres, self._cantidades, self._precios, self._categorias)
+
+    def categoria_de_codigo(self, codigo: int) -> Optional[str]:
+        """Nombre de la categoría con ese código (None para -1, sin categoría)"""
+        return None if codigo < 0 else self._tabla_categorias[codigo]
+
+    def codigo_existente(self, categoria: Optional[str]) -> Optional[int]:
+        """Código de una categoría ya registrada, o None si ningún producto la usó"""
+        return -1 if categoria is None else self._codigos_categorias.get(categoria)
+
+    def tamano_en_bytes(self) -> int:
+        """Memoria aproximada de las columnas y tablas (sin contar los índices del inventario)"""
+        total = sum(columna.buffer_info()[1] * columna.itemsize
+                    for columna in (self._ids, self._cantidades, self._precios, self._categorias))
+        total += sys.getsizeof(self._nombres) + sum(sys.getsizeof(n) for n in self._nombres)
+        total += sys.getsizeof(self._filas)
+        total += sum(sys.getsizeof(c) for c in self._tabla_categorias)
+        return total
+
+
+class VistaProducto(Producto):
+    """
+    Vista compatible con Producto sobre una fila de AlmacenColumnar.
+    Reemplaza los atributos internos de Producto por propiedades que leen y escriben
+    en las columnas, así los getters, setters (con su validación), to_dict y __str__
+    de Producto funcionan sin cambios. Cada consulta crea una vista nueva, por lo que
+    dos vistas del mismo producto no son el mismo objeto, pero sí ven los mismos datos.
+    """
+
+    __slots__ = ('_almacen', '_clave')
+
+    def __init__(self, almacen: AlmacenColumnar, id_producto: int):
+        # No llamamos a Producto.__init__: los datos ya están en las columnas
+        self._almacen = almacen
+        self._clave = id_producto
+
+    def _fila(self) -> int:
+        return self._almacen._filas[self._clave]
+
+    @property
+    def _id(self) -> int:
+        return self._clave
+
+    @property
+    def _nombre(self) -> str:
+        return self._almacen._nombres[self._fila()]
+
+    @_nombre.setter
+    def _nombre(self, valor: str):
+        self._almacen._nombres[self._fila()] = valor
+
+    @property
+    def _cantidad(self) -> int:
+        return self._almacen._cantidades[self._fila()]
+
+    @_cantidad.setter
+    def _cantidad(self, valor: int):
+        self._almacen._cantidades[self._fila()] = valor
+
+    @property
+    def _precio(self) -> float:
+        return self._almacen._precios[self._fila()]
+
+    @_precio.setter
+    def _precio(self, valor: float):
+        self._almacen._precios[self._fila()] = valor
+
+    @property
+    def _categoria(self) -> Optional[str]:
+        codigo = self._almacen._categorias[self._fila()]
+        return None if codigo < 0 else self._almacen._tabla_categorias[codigo]
+
+    @_categoria.setter
+    def _categoria(self, valor: Optional[str]):
+        self._almacen._categorias[self._fila()] = self._almacen._codigo_categoria(valor)
+
+    @property
+    def _observadores(self) -> List[Callable]:
+        return self._almacen.observadores
+
+    # Los observadores son del almacén, no de cada vista: no hay dónde guardar los de una fila
+
+    def agregar_observador(self, observador: Callable):
+        raise TypeError("Las vistas de InventarioColumnar no admiten observadores propios; "
+                        "use InventarioColumnar.suscribir para recibir los cambios")
+
+    def agregar_observadores(self, observadores: Tuple[Callable, ...]):
+        self.agregar_observador(observadores)
+
+    def quitar_observador(self, observador: Callable):
+        self.agregar_observador(observador)
+
+    def __eq__(self, otro) -> bool:
+        """Dos vistas son iguales si apuntan al mismo producto del mismo almacén"""
+        if isinstance(otro, VistaProducto):
+            return self._almacen is otro._almacen and self._clave == otro._clave
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((id(self._almacen), self._clave))
+
+
+class InventarioColumnar(Inventario):
+    """
+    Inventario con almacenamiento por columnas para catálogos muy grandes.
+    Ofrece la misma interfaz que Inventario (búsquedas, índices, estadísticas, archivos),
+    pero en lugar de un objeto Producto por artículo guarda arreglos contiguos, y
+    buscar_por_id, mostrar_todos, etc. devuelven vistas VistaProducto.
+    El Producto que se pasa a agregar_producto se copia: los cambios posteriores
+    deben hacerse sobre la vista que devuelve buscar_por_id.
+
+    Por omisión (compacto=True) tampoco se mantienen los índices por producto
+    (trigramas, prefijos, árbol BK, rangos y categorías) ni la lista de IDs cambiados,
+    que ocupan mucho más que las columnas: las búsquedas recorren las columnas, cuyo
+    costo es O(n) por consulta, y guardar_cambios escribe la copia completa.
+    estadisticas() sigue siendo O(1). Con compacto=False se mantienen los mismos
+    índices que Inventario (búsquedas rápidas, pero casi sin ahorro de memoria).
+    """
+
+    def __init__(self, cache_busquedas: int = 256, compacto: bool = True):
+        """
+        Args:
+            cache_busquedas: Cuántas búsquedas por nombre recordar (0 para no usar caché;
+                en modo compacto no se usa)
+            compacto: False para mantener los índices por producto y los IDs cambiados
+        """
+        super().__init__(0 if compacto else cache_busquedas)
+        self.compacto = compacto
+        self._productos = AlmacenColumnar()
+        self._productos.observadores.append(self._al_cambiar_producto)
+
+    def _suscribir(self, producto: Producto):
+        """Las vistas avisan al inventario a través de los observadores del almacén"""
+
+    def _desuscribir(self, producto: Producto):
+        """Las vistas avisan al inventario a través de los observadores del almacén"""
+
+    def memoria_almacen(self) -> int:
+        """Devuelve los bytes aproximados que ocupan las columnas de productos"""
+        return self._productos.tamano_en_bytes()
+
+    def columnas(self) -> Tuple[array, array, array]:
+        """Devuelve las columnas (ids, cantidades, precios) para análisis vectorizados"""
+        return self._productos.columnas()
+
+    # En modo compacto las consultas recorren las columnas en lugar de usar índices,
+    # con el mismo orden de resultados que Inventario
+
+    def buscar_por_nombre(self, nombre: str) -> List[Producto]:
+        if not self.compacto:
+            return super().buscar_por_nombre(nombre)
+        consulta = normalizar_texto(nombre)
+        return self._vistas(sorted(i for i, nombre_fila, _, _, _ in self._productos.filas()
+                                   if consulta in normalizar_texto(nombre_fila)))
+
+    def buscar_aproximado(self, nombre: str, max_distancia: int = 2) -> List[Tuple[Producto, int]]:
+        if not self.compacto:
+            return super().buscar_aproximado(nombre, max_distancia)
+        consulta = normalizar_texto(nombre)
+        patron = _PatronLevenshtein(consulta)
+        distancias: Dict[str, int] = {}
+        cercanos = []
+        for id_producto, nombre_fila, _, _, _ in self._productos.filas():
+            normalizado = normalizar_texto(nombre_fila)
+            # Dos textos cuyas longitudes difieren en más de max_distancia no pueden estar más cerca
+            if abs(len(normalizado) - len(consulta)) > max_distancia:
+                continue
+            distancia = distancias.get(normalizado)
+            if distancia is None:
+                distancia = distancias[normalizado] = patron.distancia(normalizado)
+            if distancia <= max_distancia:
+                cercanos.append((id_producto, distancia))
+        cercanos.sort(key=lambda par: (par[1], par[0]))
+        return [(self._productos[id_producto], distancia) for id_producto, distancia in cercanos]
+
+    def autocompletar(self, prefijo: str, limite: int = 10) -> List[Producto]:
+        if not self.compacto:
+            return super().autocompletar(prefijo, limite)
+        consulta = normalizar_texto(prefijo)
+        coincidencias = ((normalizado, i) for i, normalizado in
+                         ((i, normalizar_texto(n)) for i, n, _, _, _ in self._productos.filas())
+                         if normalizado.startswith(consulta))
+        return self._vistas(i for _, i in heapq.nsmallest(limite, coincidencias))
+
+    def buscar_por_rango_precio(self, minimo: Optional[float] = None,
+                                maximo: Optional[float] = None) -> List[Producto]:
+        if not self.compacto:
+            return super().buscar_por_rango_precio(minimo, maximo)
+        return self._por_rango(3, minimo, maximo)
+
+    def buscar_por_rango_cantidad(self, minimo: Optional[int] = None,
+                                  maximo: Optional[int] = None) -> List[Producto]:
+        if not self.compacto:
+            return super().buscar_por_rango_cantidad(minimo, maximo)
+        return self._por_rango(2, minimo, maximo)
+
+    def productos_por_precio(self, descendente: bool = False) -> Iterator[Producto]:
+        if not self.compacto:
+            return super().productos_por_precio(descendente)
+        ids, _, precios = self._productos.columnas()
+        orden = sorted(zip(precios, ids), reverse=descendente)
+        return (self._productos[id_producto] for _, id_producto in orden)
+
+    def resumen_por_categoria(self) -> Dict[Optional[str], Dict]:
+        if not self.compacto:
+            return super().resumen_por_categoria()
+        totales: Dict[int, List] = {}
+        for _, _, cantidad, precio, codigo in self._productos.filas():
+            acumulado = totales.get(codigo)
+            if acumulado is None:
+                acumulado = totales[codigo] = [0, 0, 0.0]
+            acumulado[0] += 1
+            acumulado[1] += cantidad
+            acumulado[2] += cantidad * precio
+        return {self._productos.categoria_de_codigo(codigo): {'productos': productos, 'unidades': unidades,
+                                                              'valor': round(valor, 2)}
+                for codigo, (productos, unidades, valor) in totales.items()}
+
+    def productos_por_categoria(self, categoria: Optional[str]) -> List[Producto]:
+        if not self.compacto:
+            return super().productos_por_categoria(categoria)
+        buscado = self._productos.codigo_existente(categoria)
+        if buscado is None:
+            return []
+        return self._vistas(sorted(i for i, _, _, _, codigo in self._productos.filas() if codigo == buscado))
+
+    def preparar_cambios(self, nombre_archivo: str, consolidar_desde: float = 0.25):
+        if not self.compacto:
+            return super().preparar_cambios(nombre_archivo, consolidar_desde)
+        # Sin la lista de IDs cambiados no se puede armar un delta: se escribe la copia completa
+        return self.preparar_copia(nombre_archivo)
+
+    def _por_rango(self, columna: int, minimo, maximo) -> List[Producto]:
+        """Productos con minimo <= valor <= maximo en la columna indicada de filas(), ordenados por valor"""
+        entradas = sorted((fila[columna], fila[0]) for fila in self._productos.filas()
+                          if (minimo is None or fila[columna] >= minimo)
+                          and (maximo is None or fila[columna] <= maximo))
+        return self._vistas(id_producto for _, id_producto in entradas)
+
+    def _vistas(self, ids) -> List[Producto]:
+        return [self._productos[id_producto] for id_producto in ids]
+
+    def _marcar_cambiado(self, id_producto: int):
+        if not self.compacto:
+            super()._marcar_cambiado(id_producto)
+        elif not self._sucios:
+            # Basta un ID para que hay_cambios() responda; guardar escribe la copia completa
+            self._sucios.add(id_producto)
+
+    def _indexar(self, producto: Producto):
+        if not self.compacto:
+            super()._indexar(producto)
+            return
+        cantidad = producto.cantidad
+        self._unidades_totales += cantidad
+        self._valor_total += cantidad * producto.precio
+
+    def _desindexar(self, producto: Producto):
+        if not self.compacto:
+            super()._desindexar(producto)
+            return
+        self._unidades_totales -= producto.cantidad
+        self._valor_total -= producto.cantidad * producto.precio
+
+    def _reindexar(self, producto: Producto, campo: str, anterior, nuevo):
+        if not self.compacto:
+            super()._reindexar(producto, campo, anterior, nuevo)
+        elif campo == 'cantidad':
+            self._unidades_totales += nuevo - anterior
+            self._valor_total += (nuevo - anterior) * producto.precio
+        elif campo == 'precio':
+            self._valor_total += producto.cantidad * (nuevo - anterior)
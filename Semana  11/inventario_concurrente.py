@@ -0,0 +1,209 @@
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from inventario import Inventario
+from producto import Producto
+
+
+def _exclusivo(metodo):
+    """Envuelve un método que recorre o reemplaza muchos productos para que corra sin concurrencia"""
+    @wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        with self._todas_las_franjas():
+            return metodo(self, *args, **kwargs)
+    return envoltura
+
+
+def _consolidado(metodo):
+    """Envuelve un método que lee los índices: primero les aplica los cambios pendientes"""
+    @wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        with self._cerrojo_indices:
+            self._consolidar()
+            return metodo(self, *args, **kwargs)
+    return envoltura
+
+
+class InventarioConcurrente(Inventario):
+    """
+    Inventario que pueden compartir varios hilos (por ejemplo, varias cajas registradoras).
+
+    Cada ID pertenece a una franja con su propio cerrojo, así que dos cajas que
+    actualizan productos distintos casi nunca se esperan entre sí; la verificación y
+    la escritura sobre un mismo producto (actualizar_producto, ajustar_cantidad,
+    despachar) quedan dentro del cerrojo de su franja y no se pierden actualizaciones.
+
+    Las escrituras no tocan los índices compartidos: solo anotan el ID en la franja.
+    Las búsquedas y estadísticas que usan índices toman un único cerrojo de índices y
+    antes de responder aplican lo anotado, comparando cada producto con la copia de lo
+    que ya reflejan los índices. Eliminar también toma ese cerrojo, para que una
+    búsqueda no encuentre un ID que desapareció a mitad de camino.
+
+    Las lecturas por ID toman el cerrojo de su franja. mostrar_todos y la cantidad de
+    productos toman todas las franjas, igual que las operaciones por lotes y las de
+    archivos, así que ven el inventario entre dos escrituras y no a mitad de una. No
+    se depende de que las operaciones de diccionario sean atómicas en CPython.
+
+    Orden de los cerrojos (para no bloquearse): franjas en orden creciente y después
+    el de índices; nadie toma una franja teniendo el cerrojo de índices.
+    """
+
+    def __init__(self, franjas: int = 64, cache_busquedas: int = 256):
+        super().__init__(cache_busquedas)
+        self._cerrojos = [threading.RLock() for _ in range(franjas)]
+        # IDs cuyo estado todavía no se pasó a los índices, uno por franja
+        self._pendientes: List[Set[int]] = [set() for _ in range(franjas)]
+        self._cerrojo_indices = threading.RLock()
+        # Copia de cada producto tal como lo ven los índices (se usa para quitar lo viejo)
+        self._reflejados: Dict[int, Producto] = {}
+
+    def _franja(self, id_producto: int) -> int:
+        return hash(id_producto) % len(self._cerrojos)
+
+    def _cerrojo(self, id_producto: int) -> threading.RLock:
+        """Cerrojo de la franja a la que pertenece el ID"""
+        return self._cerrojos[self._franja(id_producto)]
+
+    @contextmanager
+    def _todas_las_franjas(self) -> Iterator[None]:
+        """Toma los cerrojos de todas las franjas, en orden, y el de índices"""
+        for cerrojo in self._cerrojos:
+            cerrojo.acquire()
+        try:
+            with self._cerrojo_indices:
+                yield
+        finally:
+            for cerrojo in reversed(self._cerrojos):
+                cerrojo.release()
+
+    def agregar_producto(self, producto: Producto) -> bool:
+        with self._cerrojo(producto.id):
+            return super().agregar_producto(producto)
+
+    def eliminar_producto(self, id_producto: int) -> bool:
+        # También se toma el cerrojo de índices: una búsqueda en curso no debe encontrar
+        # en los índices un ID cuyo producto ya no existe
+        with self._cerrojo(id_producto), self._cerrojo_indices:
+            return super().eliminar_producto(id_producto)
+
+    def actualizar_producto(self, id_producto: int, cantidad: Optional[int] = None,
+                            precio: Optional[float] = None) -> bool:
+        with self._cerrojo(id_producto):
+            return super().actualizar_producto(id_producto, cantidad, precio)
+
+    def ajustar_cantidad(self, id_producto: int, diferencia: int) -> bool:
+        with self._cerrojo(id_producto):
+            return super().ajustar_cantidad(id_producto, diferencia)
+
+    def buscar_por_id(self, id_producto: int) -> Optional[Producto]:
+        with self._cerrojo(id_producto):
+            return super().buscar_por_id(id_producto)
+
+    def __contains__(self, id_producto: int) -> bool:
+        with self._cerrojo(id_producto):
+            return super().__contains__(id_producto)
+
+    def despachar(self, carrito: Union[Dict[int, int], Iterable[Tuple[int, int]]]) -> Dict:
+        """
+        Como en Inventario, pero reservando los productos del carrito mientras se verifica
+        y descuenta: se toman solo las franjas de sus IDs, siempre en orden creciente,
+        así dos carritos con productos en común no se bloquean mutuamente.
+        """
+        lineas = list(carrito.items()) if isinstance(carrito, dict) else list(carrito)
+        cerrojos = [self._cerrojos[franja]
+                    for franja in sorted({self._franja(id_producto) for id_producto, _ in lineas})]
+        for cerrojo in cerrojos:
+            cerrojo.acquire()
+        try:
+            return super().despachar(lineas)
+        finally:
+            for cerrojo in reversed(cerrojos):
+                cerrojo.release()
+
+    def productos_por_precio(self, descendente: bool = False) -> Iterator[Producto]:
+        """Como en Inventario, pero el recorrido se copia mientras se tiene el cerrojo de índices"""
+        with self._cerrojo_indices:
+            self._consolidar()
+            return iter(list(super().productos_por_precio(descendente)))
+
+    def _marcar(self, id_producto: int):
+        """Anota que los índices deben ponerse al día con este producto"""
+        self._pendientes[self._franja(id_producto)].add(id_producto)
+
+    def _indexar(self, producto: Producto):
+        self._marcar(producto.id)
+
+    def _desindexar(self, producto: Producto):
+        self._marcar(producto.id)
+
+    def _reindexar(self, producto: Producto, campo: str, anterior, nuevo):
+        self._marcar(producto.id)
+
+    def _consolidar(self):
+        """Aplica a los índices los productos anotados (requiere el cerrojo de índices)"""
+        with self._lote():
+            for pendientes in self._pendientes:
+                while pendientes:
+                    try:
+                        id_producto = pendientes.pop()
+                    except KeyError:  # otro hilo vació el conjunto justo antes
+                        break
+                    self._reflejar(id_producto)
+
+    def _reflejar(self, id_producto: int):
+        """
+        Lleva a los índices el estado actual de un producto. El ID se saca de pendientes
+        antes de leer el producto, así que un cambio que ocurra mientras tanto lo vuelve
+        a anotar y se aplica en la próxima consolidación.
+        """
+        reflejado = self._reflejados.get(id_producto)
+        actual = self._productos.get(id_producto)
+        if actual is None:
+            if reflejado is not None:
+                Inventario._desindexar(self, reflejado)
+                del self._reflejados[id_producto]
+            return
+        if reflejado is None:
+            copia = Producto.desde_datos_confiables(actual.id, actual.nombre, actual.cantidad,
+                                                    actual.precio, actual.categoria)
+            Inventario._indexar(self, copia)
+            self._reflejados[id_producto] = copia
+            return
+        # Se aplican las diferencias campo por campo, como si la copia pasara por los setters
+        for campo in ('nombre', 'categoria', 'cantidad', 'precio'):
+            anterior, nuevo = getattr(reflejado, campo), getattr(actual, campo)
+            if anterior != nuevo:
+                setattr(reflejado, '_' + campo, nuevo)
+                Inventario._reindexar(self, reflejado, campo, anterior, nuevo)
+
+    def _limpiar(self):
+        with self._cerrojo_indices:
+            super()._limpiar()
+            self._reflejados.clear()
+            for pendientes in self._pendientes:
+                pendientes.clear()
+
+    buscar_por_nombre = _consolidado(Inventario.buscar_por_nombre)
+    buscar_aproximado = _consolidado(Inventario.buscar_aproximado)
+    autocompletar = _consolidado(Inventario.autocompletar)
+    buscar_por_rango_precio = _consolidado(Inventario.buscar_por_rango_precio)
+    buscar_por_rango_cantidad = _consolidado(Inventario.buscar_por_rango_cantidad)
+    estadisticas = _consolidado(Inventario.estadisticas)
+    resumen_por_categoria = _consolidado(Inventario.resumen_por_categoria)
+    productos_por_categoria = _consolidado(Inventario.productos_por_categoria)
+
+    mostrar_todos = _exclusivo(Inventario.mostrar_todos)
+    cantidad_productos = _exclusivo(Inventario.cantidad_productos)
+    __len__ = _exclusivo(Inventario.__len__)
+    agregar_lote = _exclusivo(Inventario.agregar_lote)
+    actualizar_lote = _exclusivo(Inventario.actualizar_lote)
+    eliminar_lote = _exclusivo(Inventario.eliminar_lote)
+    ajustar_precios = _exclusivo(Inventario.ajustar_precios)
+    guardar_en_archivo = _exclusivo(Inventario.guardar_en_archivo)
+    guardar_cambios = _exclusivo(Inventario.guardar_cambios)
+    preparar_cambios = _exclusivo(Inventario.preparar_cambios)
+    guardar_snapshot_binario = _exclusivo(Inventario.guardar_snapshot_binario)
+    cargar_desde_archivo = _exclusivo(Inventario.cargar_desde_archivo)
+    cargar_snapshot_binario = _exclusivo(Inventario.cargar_snapshot_binario)
@@ -0,0 +1,301 @@
+import heapq
+import multiprocessing
+import os
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from inventario import ErrorLote, Inventario
+from producto import Producto
+
+# Un producto viaja entre procesos como tupla: (id, nombre, cantidad, precio, categoria).
+# Así no se serializan sus observadores, que apuntan al inventario que lo contiene.
+DatosProducto = Tuple[int, str, int, float, Optional[str]]
+
+
+def _a_datos(producto: Producto) -> DatosProducto:
+    return (producto.id, producto.nombre, producto.cantidad, producto.precio, producto.categoria)
+
+
+def _de_datos(datos: DatosProducto) -> Producto:
+    return Producto.desde_datos_confiables(*datos)
+
+
+def _buscar_por_id(inventario: Inventario, id_producto: int) -> Optional[DatosProducto]:
+    producto = inventario.buscar_por_id(id_producto)
+    return _a_datos(producto) if producto is not None else None
+
+
+def _totales(inventario: Inventario) -> Tuple[int, int, float]:
+    # El valor se suma sin redondear; se redondea una sola vez al juntar los fragmentos
+    return len(inventario), inventario._unidades_totales, inventario._valor_total
+
+
+# Lo que sabe hacer cada proceso trabajador sobre su propio Inventario
+_OPERACIONES: Dict[str, Callable] = {
+    'agregar': lambda inventario, datos: inventario.agregar_producto(_de_datos(datos)),
+    'eliminar': Inventario.eliminar_producto,
+    'actualizar': Inventario.actualizar_producto,
+    'ajustar': Inventario.ajustar_cantidad,
+    'buscar_id': _buscar_por_id,
+    'buscar_nombre': lambda inventario, nombre: [_a_datos(p) for p in inventario.buscar_por_nombre(nombre)],
+    'errores_alta': lambda inventario, lote: inventario._errores_alta([_de_datos(d) for d in lote]),
+    'agregar_lote': lambda inventario, lote: inventario.agregar_lote(_de_datos(d) for d in lote),
+    'errores_actualizacion': Inventario._errores_actualizacion,
+    'actualizar_lote': Inventario.actualizar_lote,
+    'totales': _totales,
+    'resumen_categorias': Inventario.resumen_por_categoria,
+    'contiene': Inventario.__contains__,
+}
+
+
+def _responder(conexion, correcto: bool, resultado) -> bool:
+    """
+    Envía la respuesta a un pedido. Si el resultado (o la excepción) no se puede
+    serializar se envía un error en su lugar, para que el proceso principal no se
+    quede esperando una respuesta que nunca llega.
+
+    Returns:
+        False si la conexión con el proceso principal se cortó.
+    """
+    try:
+        # send() serializa todo antes de escribir, así que si falla no queda nada a medias
+        conexion.send((correcto, resultado))
+    except (BrokenPipeError, EOFError, OSError):
+        return False
+    except Exception as e:
+        conexion.send((False, RuntimeError(f"No se pudo enviar la respuesta del fragmento: {e!r}")))
+    return True
+
+
+def _trabajar(conexion):
+    """Bucle de un proceso trabajador: atiende pedidos (operación, argumentos) hasta recibir None"""
+    inventario = Inventario()
+    while True:
+        try:
+            pedido = conexion.recv()
+        except EOFError:
+            break
+        if pedido is None:
+            break
+        operacion, argumentos = pedido
+        try:
+            correcto, resultado = True, _OPERACIONES[operacion](inventario, *argumentos)
+        except Exception as e:
+            correcto, resultado = False, e
+        if not _responder(conexion, correcto, resultado):
+            break
+    conexion.close()
+
+
+class InventarioFragmentado:
+    """
+    Inventario repartido entre varios procesos para no quedar limitado por el GIL.
+
+    Cada proceso trabajador tiene su propio Inventario con los productos cuyo ID le
+    corresponde por hash (hash(id) % procesos). Las operaciones sobre un ID van solo a
+    su fragmento; buscar_por_nombre y las estadísticas se piden a todos los fragmentos
+    a la vez y se juntan los resultados.
+
+    Los productos devueltos son copias: modificarlos no cambia el inventario (para eso
+    están actualizar_producto y ajustar_cantidad). Una instancia debe usarse desde un
+    solo hilo; el paralelismo está en los procesos, que trabajan al mismo tiempo
+    cuando una operación toca varios fragmentos (búsquedas, estadísticas y lotes).
+    """
+
+    def __init__(self, procesos: Optional[int] = None):
+        """
+        Args:
+            procesos: Cantidad de fragmentos (por omisión, uno por CPU)
+        """
+        procesos = procesos or os.cpu_count() or 1
+        self._conexiones = []
+        self._procesos = []
+        for _ in range(procesos):
+            propia, del_trabajador = multiprocessing.Pipe()
+            proceso = multiprocessing.Process(target=_trabajar, args=(del_trabajador,), daemon=True)
+            proceso.start()
+            del_trabajador.close()
+            self._conexiones.append(propia)
+            self._procesos.append(proceso)
+
+    def agregar_producto(self, producto: Producto) -> bool:
+        """Agrega un producto a su fragmento; False si el ID ya existe"""
+        return self._pedir(self._fragmento(producto.id), 'agregar', _a_datos(producto))
+
+    def eliminar_producto(self, id_producto: int) -> bool:
+        """Elimina un producto por su ID; False si no existe"""
+        return self._pedir(self._fragmento(id_producto), 'eliminar', id_producto)
+
+    def actualizar_producto(self, id_producto: int, cantidad: Optional[int] = None,
+                            precio: Optional[float] = None) -> bool:
+        """Actualiza la cantidad y/o precio de un producto; False si no existe"""
+        return self._pedir(self._fragmento(id_producto), 'actualizar', id_producto, cantidad, precio)
+
+    def ajustar_cantidad(self, id_producto: int, diferencia: int) -> bool:
+        """Suma o resta unidades en un solo paso, como Inventario.ajustar_cantidad"""
+        return self._pedir(self._fragmento(id_producto), 'ajustar', id_producto, diferencia)
+
+    def buscar_por_id(self, id_producto: int) -> Optional[Producto]:
+        """Devuelve una copia del producto, o None si no existe"""
+        datos = self._pedir(self._fragmento(id_producto), 'buscar_id', id_producto)
+        return _de_datos(datos) if datos is not None else None
+
+    def agregar_lote(self, productos: Iterable[Producto]) -> int:
+        """
+        Agrega varios productos a la vez (todo o nada). Primero todos los fragmentos
+        validan su parte y solo si ninguno encontró errores se aplican.
+
+        Raises:
+            ErrorLote: Si algún ID ya existe o se repite dentro del lote.
+        """
+        productos = list(productos)
+        filas = self._agrupar(producto.id for producto in productos)
+        lotes = {fragmento: ([_a_datos(productos[fila]) for fila in filas_fragmento],)
+                 for fragmento, filas_fragmento in filas.items()}
+        self._validar('errores_alta', lotes, filas)
+        self._repartir('agregar_lote', lotes)
+        return len(productos)
+
+    def actualizar_lote(self, cambios: Iterable[Tuple[int, Optional[int], Optional[float]]]) -> int:
+        """
+        Actualiza cantidad y/o precio de varios productos (todo o nada), con las mismas
+        reglas que Inventario.actualizar_lote. Cada fragmento aplica su parte en paralelo.
+
+        Raises:
+            ErrorLote: Con todas las filas inválidas, numeradas según el lote original.
+        """
+        cambios = list(cambios)
+        filas = self._agrupar(id_producto for id_producto, _, _ in cambios)
+        lotes = {fragmento: ([cambios[fila] for fila in filas_fragmento],)
+                 for fragmento, filas_fragmento in filas.items()}
+        self._validar('errores_actualizacion', lotes, filas)
+        self._repartir('actualizar_lote', lotes)
+        return len(cambios)
+
+    def buscar_por_nombre(self, nombre: str) -> List[Producto]:
+        """
+        Busca en todos los fragmentos a la vez, como Inventario.buscar_por_nombre.
+
+        Returns:
+            Copias de los productos que coinciden, ordenadas por ID.
+        """
+        resultados = self._repartir('buscar_nombre', self._a_todos(nombre)).values()
+        # Cada fragmento ya devuelve sus productos ordenados por ID
+        return [_de_datos(datos) for datos in heapq.merge(*resultados, key=lambda datos: datos[0])]
+
+    def estadisticas(self) -> Dict:
+        """
+        Devuelve los totales de todo el inventario sumando los de cada fragmento.
+
+        Returns:
+            Diccionario con 'productos', 'unidades_totales' y 'valor_total' (USD).
+        """
+        totales = self._repartir('totales', self._a_todos()).values()
+        return {
+            'productos': sum(productos for productos, _, _ in totales),
+            'unidades_totales': sum(unidades for _, unidades, _ in totales),
+            'valor_total': round(sum(valor for _, _, valor in totales), 2)
+        }
+
+    def resumen_por_categoria(self) -> Dict[Optional[str], Dict]:
+        """Junta el resumen por categoría de todos los fragmentos"""
+        resumen: Dict[Optional[str], Dict] = {}
+        for parcial in self._repartir('resumen_categorias', self._a_todos()).values():
+            for categoria, totales in parcial.items():
+                acumulado = resumen.setdefault(categoria, {'productos': 0, 'unidades': 0, 'valor': 0.0})
+                acumulado['productos'] += totales['productos']
+                acumulado['unidades'] += totales['unidades']
+                acumulado['valor'] = round(acumulado['valor'] + totales['valor'], 2)
+        return resumen
+
+    def cantidad_productos(self) -> int:
+        """Devuelve la cantidad total de productos en todos los fragmentos"""
+        return self.estadisticas()['productos']
+
+    def cerrar(self):
+        """Detiene los procesos trabajadores; el inventario deja de poder usarse"""
+        for conexion in self._conexiones:
+            try:
+                conexion.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for proceso, conexion in zip(self._procesos, self._conexiones):
+            proceso.join(timeout=5)
+            if proceso.is_alive():
+                proceso.terminate()
+            conexion.close()
+        self._conexiones = []
+        self._procesos = []
+
+    def _fragmento(self, id_producto: int) -> int:
+        """Fragmento (proceso) al que pertenece un ID"""
+        return hash(id_producto) % len(self._conexiones)
+
+    def _pedir(self, fragmento: int, operacion: str, *argumentos):
+        """Ejecuta una operación en un fragmento y espera su resultado"""
+        conexion = self._conexiones[fragmento]
+        conexion.send((operacion, argumentos))
+        return self._respuesta(conexion)
+
+    def _repartir(self, operacion: str, argumentos: Dict[int, Tuple]) -> Dict[int, object]:
+        """
+        Envía la operación a varios fragmentos (fragmento -> argumentos) antes de esperar
+        a ninguno, para que trabajen al mismo tiempo, y devuelve fragmento -> resultado.
+        """
+        for fragmento, argumentos_fragmento in argumentos.items():
+            self._conexiones[fragmento].send((operacion, argumentos_fragmento))
+        resultados = {}
+        error = None
+        # Se leen todas las respuestas aunque alguna sea un error, para no dejar
+        # respuestas viejas en las tuberías
+        for fragmento in argumentos:
+            try:
+                resultados[fragmento] = self._respuesta(self._conexiones[fragmento])
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+        return resultados
+
+    def _a_todos(self, *argumentos) -> Dict[int, Tuple]:
+        """Argumentos para _repartir que envían lo mismo a todos los fragmentos"""
+        return {fragmento: argumentos for fragmento in range(len(self._conexiones))}
+
+    def _agrupar(self, ids: Iterable[int]) -> Dict[int, List[int]]:
+        """Agrupa las posiciones de un lote por fragmento: fragmento -> filas del lote"""
+        filas: Dict[int, List[int]] = {}
+        for fila, id_producto in enumerate(ids):
+            filas.setdefault(self._fragmento(id_producto), []).append(fila)
+        return filas
+
+    def _validar(self, operacion: str, lotes: Dict[int, Tuple], filas: Dict[int, List[int]]):
+        """Pide a cada fragmento los errores de su parte del lote y los informa juntos"""
+        errores = []
+        for fragmento, errores_fragmento in self._repartir(operacion, lotes).items():
+            # Cada fragmento numera sus filas desde cero; se traducen a las del lote original
+            errores.extend((filas[fragmento][fila], mensaje) for fila, mensaje in errores_fragmento)
+        if errores:
+            raise ErrorLote(sorted(errores))
+
+    @staticmethod
+    def _respuesta(conexion):
+        try:
+            correcto, resultado = conexion.recv()
+        except EOFError:
+            raise RuntimeError("El proceso de un fragmento terminó sin responder") from None
+        if not correcto:
+            raise resultado
+        return resultado
+
+    def __len__(self) -> int:
+        """Devuelve la cantidad de productos en el inventario"""
+        return self.cantidad_productos()
+
+    def __contains__(self, id_producto: int) -> bool:
+        """Verifica si un producto existe en el inventario por ID"""
+        return self._pedir(self._fragmento(id_producto), 'contiene', id_producto)
+
+    def __enter__(self) -> 'InventarioFragmentado':
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
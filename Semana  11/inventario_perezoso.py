@@ -0,0 +1,283 @@
+import os
+from collections.abc import MutableMapping
+from functools import wraps
+from typing import Callable, Dict, Iterable, Iterator, Optional, Set
+
+from eventos import InventarioRecargado
+from inventario import Inventario
+from producto import Producto
+from snapshot_binario import SnapshotBinario, escribir_snapshot_combinado
+
+
+class ProductosPerezosos(MutableMapping):
+    """
+    Diccionario ID -> Producto respaldado por una copia binaria abierta con mmap.
+    Los registros de la copia están ordenados por ID, así que la propia copia sirve de
+    índice ID -> posición (búsqueda binaria) sin construir nada al abrirla. Un Producto
+    se crea recién la primera vez que se pide y desde entonces se guarda en memoria;
+    las altas y bajas se llevan aparte sin modificar el archivo.
+    """
+
+    def __init__(self, al_materializar: Callable[[Producto], None]):
+        self._snapshot: Optional[SnapshotBinario] = None
+        self._materializados: Dict[int, Producto] = {}
+        self._eliminados: Set[int] = set()  # IDs de la copia que ya no están en el inventario
+        self._agregados = 0  # productos en memoria que no tienen una fila viva en la copia
+        self._al_materializar = al_materializar
+
+    def usar_snapshot(self, snapshot: SnapshotBinario):
+        """Vacía el diccionario y pasa a leer de la copia indicada"""
+        self.clear()
+        self._snapshot = snapshot
+
+    def cambiar_snapshot(self, snapshot: SnapshotBinario, con_cambios: bool = True):
+        """
+        Pasa a leer de otra copia sin olvidar los productos en memoria, que siguen
+        siendo los mismos objetos para quien los tenga.
+
+        Args:
+            snapshot: Copia nueva
+            con_cambios: True si la copia ya incluye los productos en memoria y las bajas
+                (la que escribe guardar_snapshot_binario); False si es la misma copia
+                de antes, vuelta a abrir
+        """
+        if self._snapshot is not None:
+            self._snapshot.cerrar()
+        self._snapshot = snapshot
+        if not con_cambios:
+            return
+        self._eliminados.clear()
+        self._agregados = sum(1 for id_producto in self._materializados if self._fila(id_producto) is None)
+
+    @property
+    def snapshot(self) -> Optional[SnapshotBinario]:
+        return self._snapshot
+
+    def _fila(self, id_producto: int) -> Optional[int]:
+        """Fila de la copia donde está el producto, si sigue vigente"""
+        if self._snapshot is None or id_producto in self._eliminados:
+            return None
+        return self._snapshot.buscar_fila(id_producto)
+
+    def __getitem__(self, id_producto: int) -> Producto:
+        producto = self._materializados.get(id_producto)
+        if producto is not None:
+            return producto
+        fila = self._fila(id_producto)
+        if fila is None:
+            raise KeyError(id_producto)
+        producto = self._materializados[id_producto] = self._snapshot.producto(fila)
+        self._al_materializar(producto)
+        return producto
+
+    def __setitem__(self, id_producto: int, producto: Producto):
+        if id_producto not in self._materializados and self._fila(id_producto) is None:
+            self._agregados += 1
+        self._materializados[id_producto] = producto
+
+    def __delitem__(self, id_producto: int):
+        en_copia = self._fila(id_producto) is not None
+        if id_producto in self._materializados:
+            del self._materializados[id_producto]
+            if not en_copia:
+                self._agregados -= 1
+        elif not en_copia:
+            raise KeyError(id_producto)
+        if en_copia:
+            self._eliminados.add(id_producto)
+
+    def __contains__(self, id_producto) -> bool:
+        return id_producto in self._materializados or self._fila(id_producto) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        """Recorre los IDs de la copia (en orden) y luego los agregados después de abrirla"""
+        if self._snapshot is not None:
+            for id_producto in self._snapshot.ids():
+                if id_producto not in self._eliminados:
+                    yield id_producto
+        for id_producto in list(self._materializados):
+            if self._fila(id_producto) is None:
+                yield id_producto
+
+    def __len__(self) -> int:
+        vigentes = len(self._snapshot) - len(self._eliminados) if self._snapshot is not None else 0
+        return vigentes + self._agregados
+
+    def clear(self):
+        """Olvida los productos en memoria y cierra la copia"""
+        self._materializados.clear()
+        self._eliminados.clear()
+        self._agregados = 0
+        if self._snapshot is not None:
+            self._snapshot.cerrar()
+            self._snapshot = None
+
+    def materializados(self) -> Dict[int, Producto]:
+        """Productos que ya se crearon en memoria (consultados, modificados o agregados)"""
+        return self._materializados
+
+    def eliminados(self) -> Set[int]:
+        """IDs de la copia que se eliminaron del inventario"""
+        return self._eliminados
+
+    def recorrer(self) -> Iterator[Producto]:
+        """
+        Recorre todos los productos sin guardar en memoria los que todavía no se
+        crearon: para esos se entrega un Producto temporal leído de la copia.
+        """
+        if self._snapshot is not None:
+            for producto in self._snapshot:
+                if producto.id in self._eliminados:
+                    continue
+                yield self._materializados.get(producto.id, producto)
+        for id_producto, producto in list(self._materializados.items()):
+            if self._fila(id_producto) is None:
+                yield producto
+
+
+def _con_indices(metodo):
+    """Envuelve un método de Inventario que necesita los índices para construirlos antes"""
+    @wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        self._asegurar_indices()
+        return metodo(self, *args, **kwargs)
+    return envoltura
+
+
+class InventarioPerezoso(Inventario):
+    """
+    Inventario que abre la copia binaria sin cargarla: cargar_snapshot_binario solo
+    mapea el archivo, y cada Producto se crea la primera vez que se consulta por ID,
+    se recorre o se modifica. Los índices (nombres, precios, categorías y totales) se
+    construyen recién cuando se usa una búsqueda o estadística que los necesita,
+    leyendo las filas de la copia sin quedarse con los productos.
+
+    Al guardar la copia binaria, los productos que nunca se tocaron se copian con sus
+    bytes originales y solo se serializan los que se crearon en memoria.
+    """
+
+    def __init__(self, cache_busquedas: int = 256):
+        super().__init__(cache_busquedas)
+        self._productos = ProductosPerezosos(self._suscribir)
+        # Un inventario vacío tiene sus índices al día
+        self._indexado = True
+
+    def cargar_snapshot_binario(self, nombre_archivo: str, verificar: bool = True) -> bool:
+        """
+        Abre una copia binaria sin leer sus productos.
+
+        Args:
+            nombre_archivo: Ruta del archivo binario
+            verificar: Comprobar el CRC del archivo antes de usarlo
+
+        Returns:
+            True si se abrió correctamente, False en caso de error.
+        """
+        try:
+            if not os.path.exists(nombre_archivo):
+                return False
+            snapshot = SnapshotBinario(nombre_archivo, verificar)
+        except Exception as e:
+            print(f"Error al cargar la copia binaria: {e}")
+            return False
+
+        self._limpiar()
+        self._productos.usar_snapshot(snapshot)
+        self._indexado = False
+        self._eventos.emitir(InventarioRecargado())
+        return True
+
+    def guardar_snapshot_binario(self, nombre_archivo: str) -> bool:
+        """
+        Guarda la copia binaria reutilizando los bytes de la copia abierta para los
+        productos que no se crearon en memoria.
+
+        Si el destino es el archivo que está abierto, la copia se escribe con otro
+        nombre y se cambia por la vieja recién después de cerrar el mapeo (en Windows
+        no se puede reemplazar un archivo mapeado); luego se sigue leyendo de la nueva.
+
+        Args:
+            nombre_archivo: Ruta del archivo binario (puede ser el mismo que se abrió)
+
+        Returns:
+            True si se guardó correctamente, False en caso de error.
+        """
+        snapshot = self._productos.snapshot
+        if snapshot is None:
+            return super().guardar_snapshot_binario(nombre_archivo)
+        if not (snapshot.ruta is not None and os.path.exists(nombre_archivo)
+                and os.path.samefile(snapshot.ruta, nombre_archivo)):
+            try:
+                escribir_snapshot_combinado(snapshot, self._productos.materializados(),
+                                            self._productos.eliminados(), nombre_archivo)
+                return True
+            except Exception as e:
+                print(f"Error al guardar la copia binaria: {e}")
+                return False
+
+        nuevo = nombre_archivo + ".nuevo"
+        try:
+            escribir_snapshot_combinado(snapshot, self._productos.materializados(),
+                                        self._productos.eliminados(), nuevo)
+        except Exception as e:
+            print(f"Error al guardar la copia binaria: {e}")
+            if os.path.exists(nuevo):
+                os.remove(nuevo)
+            return False
+        snapshot.cerrar()
+        try:
+            os.replace(nuevo, nombre_archivo)
+        except OSError as e:
+            # La copia vieja sigue en su lugar: se vuelve a abrir y no se pierde nada
+            print(f"Error al guardar la copia binaria: {e}")
+            os.remove(nuevo)
+            self._productos.cambiar_snapshot(SnapshotBinario(nombre_archivo, verificar=False),
+                                             con_cambios=False)
+            return False
+        self._productos.cambiar_snapshot(SnapshotBinario(nombre_archivo, verificar=False))
+        return True
+
+    def productos_en_memoria(self) -> int:
+        """Devuelve cuántos productos se crearon en memoria hasta ahora"""
+        return len(self._productos.materializados())
+
+    def _asegurar_indices(self):
+        """Construye los índices y totales la primera vez que se necesitan"""
+        if self._indexado:
+            return
+        self._indexado = True
+        with self._lote():
+            for producto in self._productos.recorrer():
+                self._indexar(producto)
+
+    def _recorrer_productos(self) -> Iterable[Producto]:
+        return self._productos.recorrer()
+
+    def _indexar(self, producto: Producto):
+        if self._indexado:
+            super()._indexar(producto)
+
+    def _desindexar(self, producto: Producto):
+        if self._indexado:
+            super()._desindexar(producto)
+
+    def _reindexar(self, producto: Producto, campo: str, anterior, nuevo):
+        if self._indexado:
+            super()._reindexar(producto, campo, anterior, nuevo)
+
+    def _limpiar(self):
+        for producto in self._productos.materializados().values():
+            self._desuscribir(producto)
+        self._productos.clear()
+        super()._limpiar()
+        self._indexado = True
+
+    buscar_por_nombre = _con_indices(Inventario.buscar_por_nombre)
+    buscar_aproximado = _con_indices(Inventario.buscar_aproximado)
+    autocompletar = _con_indices(Inventario.autocompletar)
+    buscar_por_rango_precio = _con_indices(Inventario.buscar_por_rango_precio)
+    buscar_por_rango_cantidad = _con_indices(Inventario.buscar_por_rango_cantidad)
+    productos_por_precio = _con_indices(Inventario.productos_por_precio)
+    estadisticas = _con_indices(Inventario.estadisticas)
+    resumen_por_categoria = _con_indices(Inventario.resumen_por_categoria)
+    productos_por_categoria = _con_indices(Inventario.productos_por_categoria)
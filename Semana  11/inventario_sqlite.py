@@ -0,0 +1,480 @@
+import sqlite3
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from indices import _PatronLevenshtein, normalizar_texto
+from inventario import Inventario
+from producto import Producto
+
+_ESQUEMA = (
+    # INTEGER PRIMARY KEY es el rowid de SQLite: la tabla ya está ordenada e indexada por ID
+    """CREATE TABLE IF NOT EXISTS productos (
+           id INTEGER PRIMARY KEY,
+           nombre TEXT NOT NULL,
+           nombre_normalizado TEXT NOT NULL,
+           cantidad INTEGER NOT NULL,
+           precio REAL NOT NULL,
+           categoria TEXT
+       )""",
+    "CREATE INDEX IF NOT EXISTS productos_nombre ON productos (nombre_normalizado)",
+    # Las búsquedas por rango y productos_por_precio recorren el índice en orden
+    "CREATE INDEX IF NOT EXISTS productos_precio ON productos (precio, id)",
+    "CREATE INDEX IF NOT EXISTS productos_cantidad ON productos (cantidad, id)",
+)
+
+# Índice de texto completo por trigramas del nombre normalizado, para buscar por
+# subcadena sin recorrer la tabla. Es de "contenido externo": guarda solo el índice y
+# los disparadores lo mantienen al día con la tabla de productos.
+_ESQUEMA_NOMBRES = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS productos_nombres USING fts5(
+           nombre_normalizado, content='productos', content_rowid='id', tokenize='trigram'
+       )""",
+    """CREATE TRIGGER IF NOT EXISTS productos_nombres_alta AFTER INSERT ON productos BEGIN
+           INSERT INTO productos_nombres (rowid, nombre_normalizado) VALUES (new.id, new.nombre_normalizado);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS productos_nombres_baja AFTER DELETE ON productos BEGIN
+           INSERT INTO productos_nombres (productos_nombres, rowid, nombre_normalizado)
+           VALUES ('delete', old.id, old.nombre_normalizado);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS productos_nombres_cambio AFTER UPDATE OF nombre_normalizado ON productos BEGIN
+           INSERT INTO productos_nombres (productos_nombres, rowid, nombre_normalizado)
+           VALUES ('delete', old.id, old.nombre_normalizado);
+           INSERT INTO productos_nombres (rowid, nombre_normalizado) VALUES (new.id, new.nombre_normalizado);
+       END""",
+)
+
+# Los trigramas solo sirven para consultas de 3 caracteres o más
+_MINIMO_TRIGRAMAS = 3
+
+# Las consultas son textos fijos con parámetros: sqlite3 prepara cada una la primera vez
+# y reutiliza la sentencia compilada (caché de sentencias de la conexión)
+_COLUMNAS = "id, nombre, cantidad, precio, categoria"
+_SELECCIONAR = f"SELECT {_COLUMNAS} FROM productos WHERE id = ?"
+_EXISTE = "SELECT 1 FROM productos WHERE id = ?"
+_INSERTAR = ("INSERT INTO productos (id, nombre, nombre_normalizado, cantidad, precio, categoria) "
+             "VALUES (?, ?, ?, ?, ?, ?)")
+_REEMPLAZAR = ("UPDATE productos SET nombre = ?, nombre_normalizado = ?, cantidad = ?, precio = ?, "
+               "categoria = ? WHERE id = ?")
+_ELIMINAR = "DELETE FROM productos WHERE id = ?"
+_ACTUALIZAR_CAMPO = {
+    'cantidad': "UPDATE productos SET cantidad = ? WHERE id = ?",
+    'precio': "UPDATE productos SET precio = ? WHERE id = ?",
+    'categoria': "UPDATE productos SET categoria = ? WHERE id = ?",
+}
+_ACTUALIZAR_NOMBRE = "UPDATE productos SET nombre = ?, nombre_normalizado = ? WHERE id = ?"
+
+# Mayor que cualquier carácter: "abc" + _MAXIMO acota por arriba a todo lo que empieza con "abc"
+_MAXIMO = "\U0010ffff"
+
+Fila = Tuple[int, str, int, float, Optional[str]]
+
+
+class ProductosSQLite(MutableMapping):
+    """
+    Diccionario ID -> Producto guardado en una base SQLite, con una caché acotada de
+    los productos usados más recientemente.
+
+    Los productos de la caché son los "vigentes": los mismos objetos que devuelve el
+    inventario, suscritos a sus cambios. Cuando uno sale de la caché se llama a
+    `al_descartar` para que deje de estar suscrito; modificar después ese objeto ya
+    no cambia la base (hay que volver a pedir el producto).
+
+    Cada escritura se confirma apenas termina, salvo dentro de agrupar(): ahí se
+    acumulan en una transacción que se confirma al salir del bloque más externo (y
+    cada `lote_escrituras` escrituras, para que un lote enorme no la haga crecer sin
+    límite). Así nunca quedan escrituras sin confirmar fuera de un lote en curso.
+    """
+
+    def __init__(self, ruta: str, al_materializar: Callable[[Producto], None],
+                 al_descartar: Callable[[Producto], None], cache: int = 10_000,
+                 lote_escrituras: int = 1_000):
+        """
+        Args:
+            ruta: Archivo de la base (":memory:" para una base temporal)
+            al_materializar: Se llama con cada Producto vigente que se crea a partir de una fila
+            al_descartar: Se llama con cada Producto vigente que sale de la caché
+            cache: Máximo de productos en memoria (0 para no guardar ninguno)
+            lote_escrituras: Escrituras por transacción dentro de agrupar() antes de
+                confirmar automáticamente
+        """
+        # isolation_level=None: las transacciones se abren y confirman a mano
+        self._conexion = sqlite3.connect(ruta, isolation_level=None)
+        # WAL permite que otros procesos lean la base mientras este escribe, y con
+        # synchronous=NORMAL cada confirmación no espera al disco (sigue siendo atómica)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        for sentencia in _ESQUEMA:
+            self._conexion.execute(sentencia)
+        self.nombres_indexados = self._crear_indice_nombres()
+        self._al_materializar = al_materializar
+        self._al_descartar = al_descartar
+        self._cache: 'OrderedDict[int, Producto]' = OrderedDict()
+        self._limite_cache = cache
+        self._lote_escrituras = lote_escrituras
+        self._escrituras = 0  # escrituras en la transacción abierta
+        self._agrupando = 0  # bloques agrupar() abiertos
+        self._cantidad = self._conexion.execute("SELECT count(*) FROM productos").fetchone()[0]
+        # Aumenta con cada escritura; sirve para saber si un resultado calculado sigue valiendo
+        self.generacion = 0
+
+    def _crear_indice_nombres(self) -> bool:
+        """
+        Crea el índice de trigramas de los nombres (y lo llena si la base ya tenía
+        productos). Devuelve False si este SQLite no tiene FTS5 con trigramas
+        (hace falta la versión 3.34 o posterior); entonces se busca recorriendo la tabla.
+        """
+        existia = self._conexion.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'productos_nombres'").fetchone() is not None
+        try:
+            with self._conexion:
+                self._conexion.execute("BEGIN")
+                for sentencia in _ESQUEMA_NOMBRES:
+                    self._conexion.execute(sentencia)
+                if not existia:
+                    self._conexion.execute("INSERT INTO productos_nombres (productos_nombres) VALUES ('rebuild')")
+        except sqlite3.OperationalError:
+            return False
+        return True
+
+    def consultar(self, sql: str, parametros: Tuple = ()) -> sqlite3.Cursor:
+        """Ejecuta una consulta de lectura (ve también lo que aún no se confirmó)"""
+        return self._conexion.execute(sql, parametros)
+
+    def producto_de_fila(self, fila: Fila) -> Producto:
+        """Devuelve el producto vigente de una fila, creándolo y guardándolo en la caché si no está"""
+        producto = self._cache.get(fila[0])
+        if producto is not None:
+            self._cache.move_to_end(fila[0])
+            return producto
+        producto = Producto.desde_datos_confiables(*fila)
+        if self._limite_cache > 0:
+            self._al_materializar(producto)
+            self._recordar(producto)
+        return producto
+
+    def _recordar(self, producto: Producto):
+        """Guarda en la caché un producto vigente, descartando los menos usados si no entra"""
+        if self._limite_cache <= 0:
+            self._al_descartar(producto)
+            return
+        anterior = self._cache.get(producto.id)
+        if anterior is not None and anterior is not producto:
+            self._al_descartar(anterior)
+        self._cache[producto.id] = producto
+        self._cache.move_to_end(producto.id)
+        while len(self._cache) > self._limite_cache:
+            self._al_descartar(self._cache.popitem(last=False)[1])
+
+    def __getitem__(self, id_producto: int) -> Producto:
+        producto = self._cache.get(id_producto)
+        if producto is not None:
+            self._cache.move_to_end(id_producto)
+            return producto
+        fila = self._conexion.execute(_SELECCIONAR, (id_producto,)).fetchone()
+        if fila is None:
+            raise KeyError(id_producto)
+        return self.producto_de_fila(fila)
+
+    def __setitem__(self, id_producto: int, producto: Producto):
+        datos = (producto.nombre, normalizar_texto(producto.nombre), producto.cantidad,
+                 producto.precio, producto.categoria)
+        try:
+            self._escribir(_INSERTAR, (id_producto, *datos))
+            self._cantidad += 1
+        except sqlite3.IntegrityError:
+            self._escribir(_REEMPLAZAR, (*datos, id_producto))
+        self._recordar(producto)
+
+    def __delitem__(self, id_producto: int):
+        if self._escribir(_ELIMINAR, (id_producto,)) == 0:
+            raise KeyError(id_producto)
+        self._cantidad -= 1
+        self._cache.pop(id_producto, None)
+
+    def __contains__(self, id_producto) -> bool:
+        return (id_producto in self._cache
+                or self._conexion.execute(_EXISTE, (id_producto,)).fetchone() is not None)
+
+    def __iter__(self) -> Iterator[int]:
+        """Recorre los IDs en orden"""
+        for fila in self._conexion.execute("SELECT id FROM productos ORDER BY id"):
+            yield fila[0]
+
+    def __len__(self) -> int:
+        return self._cantidad
+
+    def actualizar_campo(self, producto: Producto, campo: str, nuevo):
+        """Escribe en la base un campo que cambió a través de los setters del producto"""
+        if campo == 'nombre':
+            self._escribir(_ACTUALIZAR_NOMBRE, (nuevo, normalizar_texto(nuevo), producto.id))
+        else:
+            self._escribir(_ACTUALIZAR_CAMPO[campo], (nuevo, producto.id))
+
+    def recorrer(self) -> Iterator[Producto]:
+        """
+        Recorre todos los productos en orden de ID con una sola consulta. Los que están
+        en la caché se entregan tal cual (son los vigentes); los demás son copias
+        temporales, así la caché no se llena con toda la tabla.
+        """
+        for fila in self._conexion.execute(f"SELECT {_COLUMNAS} FROM productos ORDER BY id"):
+            producto = self._cache.get(fila[0])
+            yield producto if producto is not None else Producto.desde_datos_confiables(*fila)
+
+    def en_cache(self) -> List[Producto]:
+        """Productos que están en la caché"""
+        return list(self._cache.values())
+
+    def clear(self):
+        """Borra todos los productos de la base"""
+        self._escribir("DELETE FROM productos", ())
+        for producto in self._cache.values():
+            self._al_descartar(producto)
+        self._cache.clear()
+        self._cantidad = 0
+
+    @contextmanager
+    def agrupar(self) -> Iterator[None]:
+        """Junta las escrituras del bloque en una transacción que se confirma al terminar (se puede anidar)"""
+        self._agrupando += 1
+        try:
+            yield
+        finally:
+            self._agrupando -= 1
+            if not self._agrupando:
+                self.confirmar()
+
+    def _escribir(self, sql: str, parametros: Tuple) -> int:
+        """Ejecuta una escritura y devuelve las filas afectadas; fuera de agrupar() la confirma enseguida"""
+        if not self._conexion.in_transaction:
+            self._conexion.execute("BEGIN")
+        filas = self._conexion.execute(sql, parametros).rowcount
+        self.generacion += 1
+        self._escrituras += 1
+        if not self._agrupando or self._escrituras >= self._lote_escrituras:
+            self.confirmar()
+        return filas
+
+    def hay_pendientes(self) -> bool:
+        """Indica si hay escrituras sin confirmar"""
+        return self._conexion.in_transaction
+
+    def confirmar(self):
+        """Confirma la transacción abierta, si hay una"""
+        if self._conexion.in_transaction:
+            self._conexion.execute("COMMIT")
+        self._escrituras = 0
+
+    def cerrar(self):
+        """Confirma lo pendiente y cierra la base"""
+        self.confirmar()
+        self._conexion.close()
+
+
+class InventarioSQLite(Inventario):
+    """
+    Inventario guardado en una base SQLite en lugar de tener todos los productos en
+    memoria y reescribir un JSON completo. Ofrece la misma interfaz que Inventario.
+
+    Solo una caché acotada de productos vive en memoria. Las búsquedas y estadísticas
+    se resuelven con consultas SQL en lugar de los índices en memoria:
+    - búsqueda por ID: la clave primaria de la tabla
+    - autocompletar: índice sobre el nombre normalizado (sin mayúsculas ni tildes)
+    - búsqueda por rango de precio o cantidad: un índice sobre cada columna
+    - búsqueda por subcadena: índice de trigramas (FTS5) del nombre normalizado; las
+      consultas de menos de 3 caracteres, o si SQLite no tiene FTS5, recorren la
+      tabla (O(n), pero sin crear objetos para las filas que no coinciden)
+    - búsqueda aproximada: recorre los nombres de longitud parecida
+
+    Solo los productos de la caché son vigentes (suscritos a sus cambios): los que
+    salen de ella, y los que mostrar_todos() entrega fuera de la caché, son copias
+    cuyas modificaciones no llegan a la base. Para modificar un producto conviene
+    pedirlo justo antes o usar los métodos del inventario.
+
+    Cada operación suelta (agregar, eliminar, actualizar, despachar o un setter de un
+    producto) se confirma en la base al terminar. Las operaciones por lotes se
+    escriben en una sola transacción que se confirma al final (y cada
+    `lote_escrituras` escrituras). Una sola instancia (un solo hilo) debe escribir en
+    la base; otros procesos pueden leerla al mismo tiempo gracias al modo WAL.
+
+    Como la base ya es el archivo, no se anotan los IDs cambiados: hay_cambios()
+    indica si quedan escrituras sin confirmar (solo pasa durante un lote), y
+    guardar_cambios() exporta la copia JSON completa.
+    """
+
+    def __init__(self, ruta: str, cache: int = 10_000, lote_escrituras: int = 1_000):
+        """
+        Args:
+            ruta: Archivo de la base (se crea si no existe)
+            cache: Máximo de productos que se mantienen en memoria
+            lote_escrituras: Escrituras por transacción en una operación por lotes
+                antes de confirmar automáticamente
+        """
+        super().__init__()
+        self._productos = ProductosSQLite(ruta, self._suscribir, self._desuscribir, cache,
+                                          lote_escrituras)
+        self._resultados_totales: Optional[Tuple[int, Dict, Dict]] = None
+
+    def confirmar(self):
+        """Confirma en la base todos los cambios hechos hasta ahora"""
+        self._productos.confirmar()
+
+    def cerrar(self):
+        """Confirma los cambios y cierra la base"""
+        self._productos.cerrar()
+
+    def hay_cambios(self) -> bool:
+        """Indica si hay cambios escritos en la base que todavía no se confirmaron"""
+        return self._productos.hay_pendientes()
+
+    # Las operaciones sueltas que escriben varias veces se confirman una sola vez al final
+    def actualizar_producto(self, id_producto: int, cantidad: Optional[int] = None,
+                            precio: Optional[float] = None) -> bool:
+        with self._productos.agrupar():
+            return super().actualizar_producto(id_producto, cantidad, precio)
+
+    def despachar(self, carrito: Union[Dict[int, int], Iterable[Tuple[int, int]]]) -> Dict:
+        with self._productos.agrupar():
+            return super().despachar(carrito)
+
+    def preparar_cambios(self, nombre_archivo: str, consolidar_desde: float = 0.25):
+        """Sin IDs anotados no se puede armar un delta: se exporta la copia completa"""
+        return self.preparar_copia(nombre_archivo)
+
+    def buscar_por_nombre(self, nombre: str) -> List[Producto]:
+        consulta = normalizar_texto(nombre)
+        if self._productos.nombres_indexados and len(consulta) >= _MINIMO_TRIGRAMAS:
+            # La consulta va entre comillas para que FTS5 la tome como una frase literal
+            frase = '"' + consulta.replace('"', '""') + '"'
+            return self._productos_de(f"SELECT {_COLUMNAS} FROM productos WHERE id IN "
+                                      "(SELECT rowid FROM productos_nombres WHERE productos_nombres MATCH ?) "
+                                      "ORDER BY id", (frase,))
+        return self._productos_de(f"SELECT {_COLUMNAS} FROM productos "
+                                  "WHERE instr(nombre_normalizado, ?) > 0 ORDER BY id", (consulta,))
+
+    def autocompletar(self, prefijo: str, limite: int = 10) -> List[Producto]:
+        consulta = normalizar_texto(prefijo)
+        return self._productos_de(f"SELECT {_COLUMNAS} FROM productos "
+                                  "WHERE nombre_normalizado >= ? AND nombre_normalizado < ? "
+                                  "ORDER BY nombre_normalizado, id LIMIT ?",
+                                  (consulta, consulta + _MAXIMO, limite))
+
+    def buscar_aproximado(self, nombre: str, max_distancia: int = 2) -> List[Tuple[Producto, int]]:
+        consulta = normalizar_texto(nombre)
+        patron = _PatronLevenshtein(consulta)
+        # Dos textos cuyas longitudes difieren en más de max_distancia no pueden estar más cerca
+        cursor = self._productos.consultar(
+            "SELECT id, nombre_normalizado FROM productos WHERE length(nombre_normalizado) BETWEEN ? AND ?",
+            (len(consulta) - max_distancia, len(consulta) + max_distancia))
+        distancias: Dict[str, int] = {}
+        cercanos = []
+        for id_producto, normalizado in cursor:
+            distancia = distancias.get(normalizado)
+            if distancia is None:
+                distancia = distancias[normalizado] = patron.distancia(normalizado)
+            if distancia <= max_distancia:
+                cercanos.append((id_producto, distancia))
+        cercanos.sort(key=lambda par: (par[1], par[0]))
+        return [(self._productos[id_producto], distancia) for id_producto, distancia in cercanos]
+
+    def buscar_por_rango_precio(self, minimo: Optional[float] = None,
+                                maximo: Optional[float] = None) -> List[Producto]:
+        return self._por_rango('precio', minimo, maximo)
+
+    def buscar_por_rango_cantidad(self, minimo: Optional[int] = None,
+                                  maximo: Optional[int] = None) -> List[Producto]:
+        return self._por_rango('cantidad', minimo, maximo)
+
+    def productos_por_precio(self, descendente: bool = False) -> Iterator[Producto]:
+        orden = "DESC" if descendente else "ASC"
+        cursor = self._productos.consultar(f"SELECT {_COLUMNAS} FROM productos ORDER BY precio {orden}, id {orden}")
+        return (self._productos.producto_de_fila(fila) for fila in cursor)
+
+    def productos_por_categoria(self, categoria: Optional[str]) -> List[Producto]:
+        return self._productos_de(f"SELECT {_COLUMNAS} FROM productos WHERE categoria IS ? ORDER BY id",
+                                  (categoria,))
+
+    def mostrar_todos(self) -> List[Producto]:
+        """Todos los productos; los que no están en la caché son copias (ver la clase)"""
+        return list(self._productos.recorrer())
+
+    def estadisticas(self) -> Dict:
+        return dict(self._totales()[1])
+
+    def resumen_por_categoria(self) -> Dict[Optional[str], Dict]:
+        return {categoria: dict(totales) for categoria, totales in self._totales()[2].items()}
+
+    def _totales(self) -> Tuple[int, Dict, Dict]:
+        """
+        Calcula estadísticas y resumen por categoría con una consulta y los reutiliza
+        mientras no haya escrituras nuevas.
+        """
+        generacion = self._productos.generacion
+        if self._resultados_totales is None or self._resultados_totales[0] != generacion:
+            resumen = {}
+            productos = unidades = 0
+            valor = 0.0
+            for categoria, cantidad, suma_unidades, suma_valor in self._productos.consultar(
+                    "SELECT categoria, count(*), total(cantidad), total(cantidad * precio) "
+                    "FROM productos GROUP BY categoria"):
+                resumen[categoria] = {'productos': cantidad, 'unidades': int(suma_unidades),
+                                      'valor': round(suma_valor, 2)}
+                productos += cantidad
+                unidades += int(suma_unidades)
+                valor += suma_valor
+            estadisticas = {'productos': productos, 'unidades_totales': unidades,
+                            'valor_total': round(valor, 2)}
+            self._resultados_totales = (generacion, estadisticas, resumen)
+        return self._resultados_totales
+
+    def _por_rango(self, columna: str, minimo, maximo) -> List[Producto]:
+        condiciones = []
+        parametros = []
+        if minimo is not None:
+            condiciones.append(f"{columna} >= ?")
+            parametros.append(minimo)
+        if maximo is not None:
+            condiciones.append(f"{columna} <= ?")
+            parametros.append(maximo)
+        donde = f"WHERE {' AND '.join(condiciones)} " if condiciones else ""
+        return self._productos_de(f"SELECT {_COLUMNAS} FROM productos {donde}ORDER BY {columna}, id",
+                                  tuple(parametros))
+
+    def _productos_de(self, sql: str, parametros: Tuple) -> List[Producto]:
+        return [self._productos.producto_de_fila(fila) for fila in self._productos.consultar(sql, parametros)]
+
+    def _recorrer_productos(self):
+        return self._productos.recorrer()
+
+    # La base ya guarda cada cambio: no se anotan IDs cambiados, que crecerían sin límite
+    def _marcar_cambiado(self, id_producto: int):
+        pass
+
+    # La base es el índice: no se mantienen índices ni totales en memoria
+    def _indexar(self, producto: Producto):
+        pass
+
+    def _desindexar(self, producto: Producto):
+        pass
+
+    def _reindexar(self, producto: Producto, campo: str, anterior, nuevo):
+        self._productos.actualizar_campo(producto, campo, nuevo)
+
+    def _limpiar(self):
+        # Se borra antes para que Inventario._limpiar no recorra la tabla para desuscribir
+        # (clear() ya desuscribe los productos de la caché)
+        self._productos.clear()
+        super()._limpiar()
+
+    @contextmanager
+    def _lote(self):
+        """Una operación por lotes se escribe en una transacción que se confirma al terminar"""
+        with self._productos.agrupar(), super()._lote():
+            yield
+
+    def __enter__(self) -> 'InventarioSQLite':
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
@@ -0,0 +1,96 @@
+import json
+import re
+from typing import IO, Iterator
+
+_ESPACIOS = " \t\n\r"
+_SEPARADORES = _ESPACIOS + ",]"
+# Saltar espacios con una expresión regular (en C) en lugar de carácter por carácter,
+# como hace el propio módulo json
+_BLANCOS = re.compile(r"[ \t\n\r]*")
+
+
+def iterar_arreglo_json(archivo: IO[str], tamano_bloque: int = 64 * 1024) -> Iterator:
+    """
+    Recorre un archivo cuyo contenido es un arreglo JSON, devolviendo un elemento a la vez.
+    Lee el archivo por bloques y decodifica cada elemento apenas está completo, así la
+    memoria usada depende del tamaño de un elemento y del bloque, no del archivo entero.
+
+    Args:
+        archivo: Archivo de texto abierto para lectura
+        tamano_bloque: Cantidad de caracteres a leer en cada bloque
+
+    Raises:
+        ValueError: Si el contenido no es un arreglo JSON válido.
+    """
+    decodificador = json.JSONDecoder()
+    bufer = ""
+    posicion = 0
+    fin_archivo = False
+
+    def saltar_espacios() -> bool:
+        """Avanza hasta el siguiente carácter significativo; False si no hay más datos"""
+        nonlocal bufer, posicion, fin_archivo
+        while True:
+            posicion = _BLANCOS.match(bufer, posicion).end()
+            if posicion < len(bufer):
+                return True
+            if fin_archivo:
+                return False
+            leer_bloque()
+
+    def leer_bloque():
+        """Agrega un bloque al búfer descartando lo que ya se procesó"""
+        nonlocal bufer, posicion, fin_archivo
+        bloque = archivo.read(tamano_bloque)
+        if not bloque:
+            fin_archivo = True
+        bufer = bufer[posicion:] + bloque
+        posicion = 0
+
+    def verificar_final():
+        """Después del corchete de cierre solo pueden quedar espacios"""
+        if saltar_espacios():
+            raise ValueError("Hay contenido después del arreglo JSON")
+
+    if not saltar_espacios() or bufer[posicion] != "[":
+        raise ValueError("El archivo no contiene un arreglo JSON")
+    posicion += 1
+
+    if not saltar_espacios():
+        raise ValueError("Arreglo JSON incompleto")
+    if bufer[posicion] == "]":
+        posicion += 1
+        verificar_final()
+        return
+
+    while True:
+        # Intentamos decodificar el siguiente elemento; si el búfer lo corta a la mitad
+        # leemos otro bloque y volvemos a intentar
+        while True:
+            try:
+                elemento, fin = decodificador.raw_decode(bufer, posicion)
+            except json.JSONDecodeError:
+                if fin_archivo:
+                    raise ValueError("Elemento JSON inválido o incompleto")
+                leer_bloque()
+                continue
+            # Un número cortado por el bloque ("2.5e" se lee como 2.5) podría seguir en el
+            # próximo: solo aceptamos el elemento si después viene un separador
+            if not fin_archivo and (fin == len(bufer) or bufer[fin] not in _SEPARADORES):
+                leer_bloque()
+                continue
+            break
+        posicion = fin
+        yield elemento
+
+        if not saltar_espacios():
+            raise ValueError("Arreglo JSON incompleto")
+        separador = bufer[posicion]
+        posicion += 1
+        if separador == "]":
+            verificar_final()
+            return
+        if separador != ",":
+            raise ValueError(f"Se esperaba ',' o ']' y se encontró {separador!r}")
+        if not saltar_espacios():
+            raise ValueError("Arreglo JSON incompleto")
@@ -1,9 +1,24 @@
-from inventario import Inventario
+from autoguardado import Autoguardado
+from inventario import Inventario, ruta_delta
+from inventario_perezoso import InventarioPerezoso
 from producto import Producto
+import atexit
 import os
+import threading
+import time
+from typing import Callable
 
 # Nombre del archivo donde se guardará el inventario
 ARCHIVO_INVENTARIO = "inventario_campitos_ecuador.json"
+# Copia binaria para arrancar rápido; el JSON sigue siendo el archivo principal
+ARCHIVO_SNAPSHOT = "inventario_campitos_ecuador.bin"
+# Segundos durante los cuales se agrupan los cambios antes del guardado automático
+VENTANA_AUTOGUARDADO = 2.0
+
+# Protege al inventario entre el menú y el hilo de autoguardado. El menú lo toma en
+# cada operación sobre el inventario (también en las consultas: InventarioPerezoso
+# lee productos y arma índices la primera vez que se los pide).
+CERROJO_INVENTARIO = threading.RLock()
 
 
 def mostrar_menu():
@@ -71,25 +86,96 @@ def inicializar_inventario() -> Inventario:
     return inventario
 
 
+def snapshot_al_dia() -> bool:
+    """Indica si la copia binaria es posterior al JSON y a su archivo de cambios"""
+    if not (os.path.exists(ARCHIVO_SNAPSHOT) and os.path.exists(ARCHIVO_INVENTARIO)):
+        return False
+    ultima_modificacion = os.path.getmtime(ARCHIVO_INVENTARIO)
+    if os.path.exists(ruta_delta(ARCHIVO_INVENTARIO)):
+        ultima_modificacion = max(ultima_modificacion, os.path.getmtime(ruta_delta(ARCHIVO_INVENTARIO)))
+    return os.path.getmtime(ARCHIVO_SNAPSHOT) >= ultima_modificacion
+
+
+def cargar_inventario(inventario: Inventario) -> bool:
+    """
+    Carga el inventario usando la copia binaria si está al día con el JSON
+    (con InventarioPerezoso solo se abre, y cada producto se lee cuando se usa);
+    si no, lee el JSON.
+    """
+    if snapshot_al_dia() and inventario.cargar_snapshot_binario(ARCHIVO_SNAPSHOT):
+        return True
+    return inventario.cargar_desde_archivo(ARCHIVO_INVENTARIO)
+
+
+def preparar_guardado(inventario: Inventario) -> Callable[[], bool]:
+    """
+    Copia los productos del inventario y devuelve la función que escribe el JSON
+    completo en un archivo temporal y lo renombra. Esa función ya no toca el
+    inventario, así que el autoguardado la corre después de soltar el cerrojo.
+    Si nada cambió desde la última carga o guardado no se escribe ningún archivo.
+    """
+    if not inventario.hay_cambios() and os.path.exists(ARCHIVO_INVENTARIO):
+        return lambda: True
+    return inventario.preparar_copia(ARCHIVO_INVENTARIO)
+
+
+def guardar_inventario(inventario: Inventario, al_salir: bool = False) -> bool:
+    """
+    Guarda el inventario en el hilo que llama (quien llama debe tener el cerrojo).
+
+    La copia binaria de arranque rápido no se actualiza en cada guardado, solo al
+    salir. Mientras tanto queda vieja y cargar_inventario lee el JSON.
+
+    Args:
+        inventario: Inventario a guardar
+        al_salir: True en el último guardado, para dejar la copia binaria al día
+    """
+    try:
+        escribir = preparar_guardado(inventario)
+    except Exception as e:
+        print(f"Error al guardar el inventario: {e}")
+        return False
+    if not escribir():
+        return False
+    if al_salir and not snapshot_al_dia():
+        inventario.guardar_snapshot_binario(ARCHIVO_SNAPSHOT)
+    return True
+
+
 def main():
     """
     Función principal que ejecuta el sistema de gestión de inventarios
     para Campitos Store Ecuador con productos de la canasta familiar.
     """
-    inventario = Inventario()
+    inventario = InventarioPerezoso()
 
     # Intentamos cargar el inventario al iniciar la aplicación
-    if inventario.cargar_desde_archivo(ARCHIVO_INVENTARIO):
+    if cargar_inventario(inventario):
         print(f"✅ Inventario cargado desde {ARCHIVO_INVENTARIO}")
         print(f"   Total de productos: {len(inventario)}")
     else:
         print("📝 No se encontró un inventario previo. Creando inventario inicial...")
         inventario = inicializar_inventario()
-        if inventario.guardar_en_archivo(ARCHIVO_INVENTARIO):
+        if guardar_inventario(inventario):
             print(f"✅ Inventario inicial creado con {len(inventario)} productos de la canasta familiar ecuatoriana")
         else:
             print("❌ Error al crear el inventario inicial")
 
+    # Los cambios se guardan solos en segundo plano; al salir (también por un error
+    # o Ctrl+C) se guarda lo que haya quedado pendiente
+    autoguardado = Autoguardado(lambda: preparar_guardado(inventario), VENTANA_AUTOGUARDADO,
+                                CERROJO_INVENTARIO)
+    autoguardado.iniciar()
+
+    def terminar() -> bool:
+        """Detiene el autoguardado, guarda lo pendiente y deja la copia binaria al día"""
+        if not autoguardado.detener():
+            return False
+        with CERROJO_INVENTARIO:
+            return guardar_inventario(inventario, al_salir=True)
+
+    atexit.register(terminar)
+
     while True:
         mostrar_menu()
         opcion = input("Seleccione una opción (1-9): ").strip()
@@ -103,15 +189,19 @@ def main():
                 nombre = input("Ingrese el nombre del producto: ")
                 cantidad = int(input("Ingrese la cantidad disponible: "))
                 precio = float(input("Ingrese el precio del producto (USD): "))
+                categoria = input("Ingrese la categoría (opcional, Enter para omitir): ").strip() or None
 
                 # Validamos que el nombre no esté vacío
                 if not nombre.strip():
                     print("❌ Error: El nombre del producto no puede estar vacío.")
                     continue
 
-                nuevo_producto = Producto(id_producto, nombre, cantidad, precio)
+                nuevo_producto = Producto(id_producto, nombre, cantidad, precio, categoria)
 
-                if inventario.agregar_producto(nuevo_producto):
+                with CERROJO_INVENTARIO:
+                    agregado = inventario.agregar_producto(nuevo_producto)
+                if agregado:
+                    autoguardado.avisar()
                     print("✅ Producto agregado exitosamente!")
                 else:
                     print("❌ Error: Ya existe un producto con ese ID.")
@@ -129,13 +219,18 @@ def main():
                 id_producto = int(input("Ingrese el ID del producto a eliminar: "))
 
                 # Mostramos información del producto antes de eliminar
-                producto = inventario.buscar_por_id(id_producto)
+                with CERROJO_INVENTARIO:
+                    producto = inventario.buscar_por_id(id_producto)
+                    descripcion = str(producto)
                 if producto:
-                    print(f"Producto a eliminar: {producto}")
+                    print(f"Producto a eliminar: {descripcion}")
                     confirmacion = input("¿Está seguro de que desea eliminar este producto? (s/n): ").strip().lower()
 
                     if confirmacion == 's':
-                        if inventario.eliminar_producto(id_producto):
+                        with CERROJO_INVENTARIO:
+                            eliminado = inventario.eliminar_producto(id_producto)
+                        if eliminado:
+                            autoguardado.avisar()
                             print("✅ Producto eliminado exitosamente!")
                         else:
                             print("❌ Error al eliminar el producto.")
@@ -155,12 +250,14 @@ def main():
                 id_producto = int(input("Ingrese el ID del producto a actualizar: "))
 
                 # Verificamos que el producto exista
-                producto = inventario.buscar_por_id(id_producto)
+                with CERROJO_INVENTARIO:
+                    producto = inventario.buscar_por_id(id_producto)
+                    descripcion = str(producto)
                 if not producto:
                     print("❌ Error: No existe un producto con ese ID.")
                     continue
 
-                print(f"Producto actual: {producto}")
+                print(f"Producto actual: {descripcion}")
 
                 # Preguntamos qué desea actualizar
                 print("\n¿Qué desea actualizar?")
@@ -186,9 +283,12 @@ def main():
                         print("❌ Error: El precio debe ser un número válido.")
                         continue
 
-                if inventario.actualizar_producto(id_producto, cantidad, precio):
+                with CERROJO_INVENTARIO:
+                    actualizado = inventario.actualizar_producto(id_producto, cantidad, precio)
+                    producto_actualizado = str(inventario.buscar_por_id(id_producto))
+                if actualizado:
+                    autoguardado.avisar()
                     print("✅ Producto actualizado exitosamente!")
-                    producto_actualizado = inventario.buscar_por_id(id_producto)
                     print(f"Producto actualizado: {producto_actualizado}")
                 else:
                     print("❌ Error al actualizar el producto.")
@@ -205,7 +305,11 @@ def main():
             if not nombre:
                 print("❌ Error: Debe ingresar un nombre para buscar.")
             else:
-                resultados = inventario.buscar_por_nombre(nombre)
+                with CERROJO_INVENTARIO:
+                    resultados = [str(producto) for producto in inventario.buscar_por_nombre(nombre)]
+                    # Si no hay resultados sugerimos nombres parecidos por si hubo un error de escritura
+                    sugerencias = [] if resultados else [str(producto) for producto, _ in
+                                                         inventario.buscar_aproximado(nombre)[:5]]
 
                 if resultados:
                     print(f"\n✅ Se encontraron {len(resultados)} producto(s):")
@@ -213,6 +317,10 @@ def main():
                         print(f"{i}. {producto}")
                 else:
                     print("❌ No se encontraron productos con ese nombre.")
+                    if sugerencias:
+                        print("¿Quiso decir?")
+                        for producto in sugerencias:
+                            print(f"   • {producto}")
 
         elif opcion == "5":
             # Buscar producto por ID
@@ -221,10 +329,12 @@ def main():
                 print("-" * 30)
                 id_producto = int(input("Ingrese el ID del producto a buscar: "))
 
-                producto = inventario.buscar_por_id(id_producto)
+                with CERROJO_INVENTARIO:
+                    producto = inventario.buscar_por_id(id_producto)
+                    descripcion = str(producto)
                 if producto:
                     print(f"\n✅ Producto encontrado:")
-                    print(producto)
+                    print(descripcion)
                 else:
                     print("❌ No se encontró un producto con ese ID.")
 
@@ -235,29 +345,46 @@ def main():
             # Mostrar todos los productos
             print("\n📦 INVENTARIO COMPLETO")
             print("-" * 30)
-            productos = inventario.mostrar_todos()
-
-            if productos:
-                # Ordenamos los productos por ID para mejor visualización
-                productos_ordenados = sorted(productos, key=lambda p: p.id)
-
-                print(f"Total de productos: {len(productos_ordenados)}")
-                print("-" * 65)
-                for producto in productos_ordenados:
-                    print(f"• {producto}")
-
-                # Calculamos el valor total del inventario en dólares
-                valor_total = sum(p.cantidad * p.precio for p in productos)
-                print("-" * 65)
-                print(f"Valor total del inventario: ${valor_total:,.2f} USD")
-            else:
-                print("📭 El inventario está vacío.")
+            # Se muestra con el cerrojo tomado para no ver el inventario a mitad de un cambio
+            with CERROJO_INVENTARIO:
+                productos = inventario.mostrar_todos()
+
+                if productos:
+                    # Ordenamos los productos por ID para mejor visualización
+                    productos_ordenados = sorted(productos, key=lambda p: p.id)
+
+                    print(f"Total de productos: {len(productos_ordenados)}")
+                    print("-" * 65)
+                    for producto in productos_ordenados:
+                        print(f"• {producto}")
+
+                    # El inventario mantiene el valor total, no hace falta recorrer los productos
+                    estadisticas = inventario.estadisticas()
+                    print("-" * 65)
+                    print(f"Unidades en inventario: {estadisticas['unidades_totales']:,}")
+                    print(f"Valor total del inventario: ${estadisticas['valor_total']:,.2f} USD")
+
+                    # Resumen por categoría (solo si hay productos categorizados)
+                    resumen = inventario.resumen_por_categoria()
+                    if any(categoria is not None for categoria in resumen):
+                        print("-" * 65)
+                        for categoria, totales in resumen.items():
+                            print(f"{categoria or 'Sin categoría'}: {totales['productos']} producto(s), "
+                                  f"{totales['unidades']:,} unidades, ${totales['valor']:,.2f} USD")
+                else:
+                    print("📭 El inventario está vacío.")
 
         elif opcion == "7":
             # Guardar inventario en archivo
             print("\n💾 GUARDAR INVENTARIO")
             print("-" * 30)
-            if inventario.guardar_en_archivo(ARCHIVO_INVENTARIO):
+            with CERROJO_INVENTARIO:
+                hay_cambios = inventario.hay_cambios()
+            if not hay_cambios:
+                ultimo = autoguardado.ultimo_guardado()
+                detalle = f" (último guardado: {time.strftime('%H:%M:%S', time.localtime(ultimo))})" if ultimo else ""
+                print(f"ℹ️  No hay cambios sin guardar{detalle}.")
+            elif autoguardado.guardar_ahora():
                 print(f"✅ Inventario guardado exitosamente en {ARCHIVO_INVENTARIO}")
                 print(f"   Total de productos guardados: {len(inventario)}")
             else:
@@ -270,7 +397,9 @@ def main():
             confirmacion = input("¿Está seguro? Se perderán los cambios no guardados. (s/n): ").strip().lower()
 
             if confirmacion == 's':
-                if inventario.cargar_desde_archivo(ARCHIVO_INVENTARIO):
+                with CERROJO_INVENTARIO:
+                    cargado = cargar_inventario(inventario)
+                if cargado:
                     print(f"✅ Inventario cargado exitosamente desde {ARCHIVO_INVENTARIO}")
                     print(f"   Total de productos cargados: {len(inventario)}")
                 else:
@@ -281,7 +410,8 @@ def main():
         elif opcion == "9":
             # Salir del programa
             print("\n💾 Guardando inventario antes de salir...")
-            if inventario.guardar_en_archivo(ARCHIVO_INVENTARIO):
+            atexit.unregister(terminar)
+            if terminar():
                 print(f"✅ Inventario guardado en {ARCHIVO_INVENTARIO}")
             else:
                 print("❌ Error al guardar el inventario. Los cambios podrían perderse.")
@@ -1,15 +1,28 @@
 import json
 import os
-from typing import Dict, List, Optional
+import sys
+from typing import Callable, Dict, Optional, Tuple
+
+
+def _internar(texto: Optional[str]) -> Optional[str]:
+    """Interna un texto opcional para compartir una sola copia entre productos"""
+    return None if texto is None else sys.intern(texto)
 
 
 class Producto:
     """
     Clase que representa un producto en el inventario de Campitos Store Ecuador.
-    Cada producto tiene un ID único, nombre, cantidad y precio en dólares.
+    Cada producto tiene un ID único, nombre, cantidad, precio en dólares y,
+    opcionalmente, una categoría (por ejemplo "Lácteos").
+
+    Usa __slots__ para no crear un __dict__ por producto, e interna los nombres y
+    categorías para que "Leche" repetido en muchos productos ocupe memoria una sola vez.
     """
 
-    def __init__(self, id_producto: int, nombre: str, cantidad: int, precio: float):
+    __slots__ = ('_id', '_nombre', '_cantidad', '_precio', '_categoria', '_observadores')
+
+    def __init__(self, id_producto: int, nombre: str, cantidad: int, precio: float,
+                 categoria: Optional[str] = None):
         # Validamos que los valores sean válidos
         if id_producto <= 0:
             raise ValueError("El ID debe ser un número positivo")
@@ -19,9 +32,31 @@ class Producto:
             raise ValueError("El precio no puede ser negativo")
 
         self._id = id_producto
-        self._nombre = nombre
+        self._nombre = sys.intern(nombre)
         self._cantidad = cantidad
         self._precio = precio
+        self._categoria = _internar(categoria)
+        # Funciones que se llaman cuando cambia un atributo (por ejemplo, el inventario
+        # que contiene al producto y necesita mantener sus índices actualizados).
+        # Es una tupla que se reemplaza al cambiar, así muchos productos pueden compartirla.
+        self._observadores: Tuple[Callable, ...] = ()
+
+    @classmethod
+    def desde_datos_confiables(cls, id_producto: int, nombre: str, cantidad: int, precio: float,
+                               categoria: Optional[str] = None) -> 'Producto':
+        """
+        Crea un producto sin validar sus valores. Solo debe usarse con datos que ya
+        se validaron antes, como una copia de seguridad guardada por el propio sistema;
+        evita las comprobaciones de __init__ al cargar millones de productos.
+        """
+        producto = object.__new__(cls)
+        producto._id = id_producto
+        producto._nombre = sys.intern(nombre)
+        producto._cantidad = cantidad
+        producto._precio = precio
+        producto._categoria = _internar(categoria)
+        producto._observadores = ()
+        return producto
 
     # Métodos para obtener los atributos (getters)
     @property
@@ -44,27 +79,86 @@ class Producto:
         """Devuelve el precio unitario del producto en dólares"""
         return self._precio
 
+    @property
+    def categoria(self) -> Optional[str]:
+        """Devuelve la categoría del producto, o None si no tiene"""
+        return self._categoria
+
     # Métodos para establecer los atributos (setters)
     @nombre.setter
     def nombre(self, nuevo_nombre: str):
         """Establece un nuevo nombre para el producto"""
         if not nuevo_nombre.strip():
             raise ValueError("El nombre no puede estar vacío")
-        self._nombre = nuevo_nombre
+        anterior = self._nombre
+        self._nombre = sys.intern(nuevo_nombre)
+        self._notificar('nombre', anterior, nuevo_nombre)
 
     @cantidad.setter
     def cantidad(self, nueva_cantidad: int):
         """Establece una nueva cantidad para el producto"""
         if nueva_cantidad < 0:
             raise ValueError("La cantidad no puede ser negativa")
+        anterior = self._cantidad
         self._cantidad = nueva_cantidad
+        self._notificar('cantidad', anterior, nueva_cantidad)
 
     @precio.setter
     def precio(self, nuevo_precio: float):
         """Establece un nuevo precio para el producto en dólares"""
         if nuevo_precio < 0:
             raise ValueError("El precio no puede ser negativo")
+        anterior = self._precio
         self._precio = nuevo_precio
+        self._notificar('precio', anterior, nuevo_precio)
+
+    @categoria.setter
+    def categoria(self, nueva_categoria: Optional[str]):
+        """Establece la categoría del producto (None para dejarlo sin categoría)"""
+        anterior = self._categoria
+        self._categoria = _internar(nueva_categoria)
+        self._notificar('categoria', anterior, nueva_categoria)
+
+    def agregar_observador(self, observador: Callable):
+        """
+        Registra una función que se llamará como observador(producto, campo, anterior, nuevo)
+        cada vez que cambie el nombre, la cantidad o el precio del producto.
+        """
+        if observador not in self._observadores:
+            self._observadores = self._observadores + (observador,)
+
+    def agregar_observadores(self, observadores: Tuple[Callable, ...]):
+        """
+        Registra varios observadores a la vez. Si el producto no tenía ninguno guarda la
+        misma tupla recibida: el inventario pasa siempre la suya, y todos sus productos
+        la comparten en lugar de tener cada uno su propia copia.
+        """
+        if not self._observadores:
+            self._observadores = observadores
+        else:
+            for observador in observadores:
+                self.agregar_observador(observador)
+
+    def quitar_observador(self, observador: Callable):
+        """Deja de notificar a un observador registrado previamente"""
+        if observador in self._observadores:
+            self._observadores = tuple(o for o in self._observadores if o != observador)
+
+    def _notificar(self, campo: str, anterior, nuevo):
+        """Avisa a los observadores que un atributo cambió"""
+        for observador in self._observadores:
+            observador(self, campo, anterior, nuevo)
+
+    def __copy__(self) -> 'Producto':
+        """
+        Una copia es un producto independiente, sin los observadores del original:
+        cambiarla no debe tocar los índices ni los totales del inventario que lo contiene.
+        """
+        return Producto.desde_datos_confiables(self._id, self._nombre, self._cantidad, self._precio,
+                                               self._categoria)
+
+    def __deepcopy__(self, memo: Dict) -> 'Producto':
+        return self.__copy__()
 
     def to_dict(self) -> Dict:
         """
@@ -75,24 +169,31 @@ class Producto:
             'id': self._id,
             'nombre': self._nombre,
             'cantidad': self._cantidad,
-            'precio': self._precio
+            'precio': self._precio,
+            'categoria': self._categoria
         }
 
     @classmethod
-    def from_dict(cls, data: Dict):
+    def from_dict(cls, data: Dict, validar: bool = True):
         """
         Crea un producto a partir de un diccionario.
-        Útil para cargar desde archivo JSON.
+        Útil para cargar desde archivo JSON. La categoría es opcional para
+        poder leer archivos guardados antes de que existiera. Con validar=False
+        se omiten las validaciones (solo para datos confiables).
         """
-        return cls(data['id'], data['nombre'], data['cantidad'], data['precio'])
+        constructor = cls if validar else cls.desde_datos_confiables
+        return constructor(data['id'], data['nombre'], data['cantidad'], data['precio'], data.get('categoria'))
 
     def __str__(self) -> str:
         """
         Representación en string del producto.
-        Formato: ID: 1, Producto: Arroz, Cantidad: 50, Precio: $2.50
+        Formato: ID: 1, Producto: Arroz, Cantidad: 50, Precio: $2.50 (y la categoría si tiene)
         """
-        return f"ID: {self._id}, Producto: {self._nombre}, Cantidad: {self._cantidad}, Precio: ${self._precio:.2f}"
+        texto = f"ID: {self._id}, Producto: {self._nombre}, Cantidad: {self._cantidad}, Precio: ${self._precio:.2f}"
+        if self._categoria:
+            texto += f", Categoría: {self._categoria}"
+        return texto
 
     def __repr__(self) -> str:
         """Representación oficial del objeto para debugging"""
-        return f"Producto(id={self._id}, nombre='{self._nombre}', cantidad={self._cantidad}, precio={self._precio})"
\ No newline at end of file
+        return f"Producto(id={self._id}, nombre='{self._nombre}', cantidad={self._cantidad}, precio={self._precio}, categoria={self._categoria!r})"
\ No newline at end of file
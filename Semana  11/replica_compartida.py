@@ -0,0 +1,257 @@
+"""
+Réplicas de solo lectura del inventario en memoria compartida.
+
+Un proceso escritor publica el inventario con PublicadorInventario y los procesos
+que solo consultan (reportes, verificadores de precios) lo abren con
+ReplicaInventario, sin cargar su propia copia: todos leen las mismas páginas.
+
+Cada publicación es una versión inmutable: la copia binaria completa (el formato de
+snapshot_binario, con IDs, cantidades y precios en registros ordenados y la tabla de
+nombres) en su propio segmento "<nombre>_<versión>". Un segmento de control
+"<nombre>" indica cuál es la última versión. Una réplica sigue viendo la versión que
+abrió, completa y sin mezclas, hasta que llama a actualizar().
+"""
+import struct
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from inventario import Inventario
+from producto import Producto
+from snapshot_binario import SnapshotBinario, imagen_snapshot
+
+# Segmento de control: secuencia (impar mientras el publicador lo escribe), versión y
+# tamaño en bytes de la copia publicada
+_CONTROL = struct.Struct("<QQQ")
+
+
+def _nombre_version(nombre: str, version: int) -> str:
+    return f"{nombre}_{version}"
+
+
+def _adjuntar(nombre: str) -> shared_memory.SharedMemory:
+    """
+    Se adjunta a un segmento existente sin hacerse responsable de borrarlo.
+    Antes de Python 3.13 todo proceso que abre un segmento queda registrado para
+    borrarlo al terminar, y una réplica que termina no debe borrar la versión
+    publicada: se quita el registro apenas se adjunta. Si la réplica comparte el
+    proceso de limpieza con el publicador (el mismo proceso, o uno lanzado con
+    multiprocessing) eso quita también el registro del publicador; por eso
+    PublicadorInventario vuelve a registrar cada segmento antes de borrarlo.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(nombre, track=False)
+    segmento = shared_memory.SharedMemory(nombre)
+    resource_tracker.unregister(segmento._name, "shared_memory")
+    return segmento
+
+
+class PublicadorInventario:
+    """
+    Publica copias del inventario en memoria compartida. Debe haber un solo
+    publicador por nombre; es quien crea y borra los segmentos.
+    """
+
+    def __init__(self, nombre: str = "inventario_campitos", conservar: int = 2):
+        """
+        Args:
+            nombre: Nombre del segmento de control (las réplicas lo usan para encontrarlo)
+            conservar: Versiones que se mantienen publicadas, para que una réplica que
+                leyó el control justo antes de una publicación todavía pueda abrir la suya
+
+        Raises:
+            FileExistsError: Si ya hay un publicador con ese nombre.
+        """
+        self.nombre = nombre
+        self.conservar = max(1, conservar)
+        self.version = 0
+        self._control = shared_memory.SharedMemory(nombre, create=True, size=_CONTROL.size)
+        _CONTROL.pack_into(self._control.buf, 0, 0, 0, 0)
+        self._publicadas: List[shared_memory.SharedMemory] = []
+
+    def publicar(self, inventario: Inventario) -> int:
+        """
+        Publica el estado actual del inventario como una versión nueva.
+
+        Args:
+            inventario: Inventario a publicar
+
+        Returns:
+            Número de la versión publicada.
+        """
+        imagen = imagen_snapshot(inventario._recorrer_productos())
+        version = self.version + 1
+        # Un segmento no puede tener tamaño 0, aunque el inventario esté vacío
+        memoria = shared_memory.SharedMemory(_nombre_version(self.nombre, version), create=True,
+                                             size=max(1, len(imagen)))
+        memoria.buf[:len(imagen)] = imagen
+        self._publicadas.append(memoria)
+
+        # La secuencia queda impar mientras se escribe; una réplica que la ve impar o
+        # distinta antes y después de leer vuelve a intentar
+        secuencia, _, _ = _CONTROL.unpack_from(self._control.buf, 0)
+        struct.pack_into("<Q", self._control.buf, 0, secuencia + 1)
+        _CONTROL.pack_into(self._control.buf, 0, secuencia + 1, version, len(imagen))
+        struct.pack_into("<Q", self._control.buf, 0, secuencia + 2)
+        self.version = version
+
+        while len(self._publicadas) > self.conservar:
+            self._borrar(self._publicadas.pop(0))
+        return version
+
+    def cerrar(self):
+        """Borra todas las versiones y el control; las réplicas abiertas siguen leyendo la suya"""
+        for memoria in self._publicadas:
+            self._borrar(memoria)
+        self._publicadas = []
+        if self._control is not None:
+            self._borrar(self._control)
+            self._control = None
+
+    @staticmethod
+    def _borrar(memoria: shared_memory.SharedMemory):
+        memoria.close()
+        # Una réplica que comparte el proceso de limpieza pudo haber quitado el registro
+        # (ver _adjuntar), y ese proceso muestra un error si se quita un registro que no está
+        if sys.version_info < (3, 13):
+            resource_tracker.register(memoria._name, "shared_memory")
+        memoria.unlink()
+
+    def __enter__(self) -> 'PublicadorInventario':
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+
+class ReplicaInventario:
+    """
+    Vista de solo lectura de la última versión publicada. Las consultas leen los
+    registros directo de la memoria compartida (sin copiarlos); los productos que
+    devuelve son objetos nuevos, así que modificarlos no cambia nada.
+    """
+
+    def __init__(self, nombre: str = "inventario_campitos", verificar: bool = False):
+        """
+        Args:
+            nombre: Nombre usado por el publicador
+            verificar: Comprobar el CRC de cada versión al abrirla (recorre toda la copia)
+
+        Raises:
+            FileNotFoundError: Si no hay un publicador con ese nombre.
+        """
+        self.nombre = nombre
+        self.verificar = verificar
+        self.version = 0
+        self._control = _adjuntar(nombre)
+        self._memoria: Optional[shared_memory.SharedMemory] = None
+        self._snapshot: Optional[SnapshotBinario] = None
+        # Los totales de una versión no cambian: se calculan una vez y se guardan
+        self._estadisticas: Optional[Dict] = None
+        self.actualizar()
+
+    def actualizar(self) -> bool:
+        """
+        Pasa a la última versión publicada.
+
+        Returns:
+            True si cambió de versión, False si ya tenía la última.
+        """
+        while True:
+            version, tamano = self._leer_control()
+            if version == self.version:
+                return False
+            try:
+                memoria = _adjuntar(_nombre_version(self.nombre, version))
+                break
+            except FileNotFoundError:
+                continue  # el publicador ya la reemplazó; se lee el control otra vez
+
+        try:
+            snapshot = SnapshotBinario.desde_memoria(memoria.buf[:tamano], self.verificar)
+        except Exception:
+            memoria.close()
+            raise
+        self._soltar_version()
+        self._memoria, self._snapshot, self.version = memoria, snapshot, version
+        return True
+
+    def _leer_control(self) -> Tuple[int, int]:
+        """Lee (versión, tamaño) de forma consistente aunque el publicador esté escribiendo"""
+        while True:
+            secuencia, version, tamano = _CONTROL.unpack_from(self._control.buf, 0)
+            if secuencia % 2 == 0 and struct.unpack_from("<Q", self._control.buf, 0)[0] == secuencia:
+                return version, tamano
+            time.sleep(0)
+
+    def buscar_por_id(self, id_producto: int) -> Optional[Producto]:
+        """
+        Busca un producto por su ID (búsqueda binaria sobre los registros).
+
+        Returns:
+            Una copia del producto, o None si no existe en esta versión.
+        """
+        if self._snapshot is None:
+            return None
+        fila = self._snapshot.buscar_fila(id_producto)
+        return self._snapshot.producto(fila) if fila is not None else None
+
+    def precio(self, id_producto: int) -> Optional[float]:
+        """Devuelve solo el precio de un producto, sin decodificar su nombre (None si no existe)"""
+        if self._snapshot is None:
+            return None
+        fila = self._snapshot.buscar_fila(id_producto)
+        return self._snapshot.registro(fila)[2] if fila is not None else None
+
+    def estadisticas(self) -> Dict:
+        """
+        Devuelve los totales de la versión abierta, con las mismas claves que
+        Inventario.estadisticas. Se calculan una sola vez por versión.
+        """
+        if self._estadisticas is None:
+            unidades = 0
+            valor = 0.0
+            if self._snapshot is not None:
+                for _, cantidad, precio, _ in self._snapshot.registros():
+                    unidades += cantidad
+                    valor += cantidad * precio
+            self._estadisticas = {'productos': len(self), 'unidades_totales': unidades,
+                                  'valor_total': round(valor, 2)}
+        return self._estadisticas
+
+    def mostrar_todos(self) -> List[Producto]:
+        """Devuelve copias de todos los productos de la versión, ordenados por ID"""
+        return list(self)
+
+    def cerrar(self):
+        """Suelta la versión abierta y el control"""
+        self._soltar_version()
+        if self._control is not None:
+            self._control.close()
+            self._control = None
+
+    def _soltar_version(self):
+        if self._snapshot is not None:
+            self._snapshot.cerrar()
+            self._snapshot = None
+        if self._memoria is not None:
+            self._memoria.close()
+            self._memoria = None
+        self._estadisticas = None
+
+    def __len__(self) -> int:
+        return len(self._snapshot) if self._snapshot is not None else 0
+
+    def __contains__(self, id_producto: int) -> bool:
+        return self._snapshot is not None and self._snapshot.buscar_fila(id_producto) is not None
+
+    def __iter__(self) -> Iterator[Producto]:
+        if self._snapshot is not None:
+            yield from self._snapshot
+
+    def __enter__(self) -> 'ReplicaInventario':
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
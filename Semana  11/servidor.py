@@ -0,0 +1,269 @@
+"""
+Servidor TCP (asyncio) que expone el inventario a las terminales de la tienda.
+
+Protocolo: una petición JSON por línea y una respuesta JSON por línea, en el mismo
+orden. Un cliente puede enviar muchas peticiones seguidas sin esperar las respuestas
+(pipelining). El campo "id" de la petición, si viene, se devuelve tal cual en la respuesta.
+
+    {"id": 1, "op": "agregar", "producto": {"id": 7, "nombre": "Arroz", "cantidad": 5, "precio": 2.5}}
+    {"id": 2, "op": "actualizar", "id_producto": 7, "cantidad": 10, "precio": 2.75}
+    {"id": 3, "op": "eliminar", "id_producto": 7}
+    {"id": 4, "op": "buscar", "nombre": "arroz", "limite": 20}
+    {"id": 5, "op": "buscar_id", "id_producto": 7}
+    {"id": 6, "op": "despachar", "carrito": [[7, 2], [8, 1]]}
+    {"id": 7, "op": "estadisticas"}
+
+Respuestas: {"id": ..., "ok": true, "resultado": ...} o {"id": ..., "ok": false, "error": "..."}
+
+Las escrituras se confirman en memoria de inmediato y se guardan en lote: cada
+`intervalo_guardado` segundos, si hubo cambios, se agrega un delta al archivo
+(ver Inventario.guardar_cambios). Un corte pierde como mucho ese intervalo. La
+escritura del archivo corre en otro hilo para no frenar la atención de peticiones.
+
+Uso: python servidor.py [--puerto 8765] [--archivo inventario_campitos_ecuador.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+from typing import Callable, Dict, Optional, Tuple
+
+from inventario import Inventario
+from producto import Producto
+
+# Una línea más larga que esto se considera un error del cliente
+LIMITE_LINEA = 1024 * 1024
+
+
+class ErrorPeticion(ValueError):
+    """Petición mal formada o con parámetros inválidos"""
+
+
+def _campo(datos: Dict, campo: str, tipos: Tuple[type, ...], descripcion: str, opcional: bool = False):
+    """
+    Lee un campo de la petición verificando su tipo (un bool no cuenta como número).
+
+    Raises:
+        ErrorPeticion: Si falta un campo obligatorio o tiene otro tipo.
+    """
+    if campo not in datos or (opcional and datos[campo] is None):
+        if opcional:
+            return None
+        raise ErrorPeticion(f"Falta el campo {campo!r}")
+    valor = datos[campo]
+    if not isinstance(valor, tipos) or isinstance(valor, bool):
+        raise ErrorPeticion(f"El campo {campo!r} debe ser {descripcion}")
+    return valor
+
+
+def _entero(datos: Dict, campo: str, opcional: bool = False) -> Optional[int]:
+    return _campo(datos, campo, (int,), "un número entero", opcional)
+
+
+def _numero(datos: Dict, campo: str, opcional: bool = False) -> Optional[float]:
+    return _campo(datos, campo, (int, float), "un número", opcional)
+
+
+def _texto(datos: Dict, campo: str, opcional: bool = False) -> Optional[str]:
+    valor = _campo(datos, campo, (str,), "un texto", opcional)
+    if valor is not None and not valor.strip():
+        raise ErrorPeticion(f"El campo {campo!r} no puede estar vacío")
+    return valor
+
+
+class ServidorInventario:
+    """
+    Atiende conexiones con el protocolo de líneas JSON sobre un Inventario.
+    Todas las operaciones corren en el hilo del event loop, una a la vez, así que el
+    inventario no necesita cerrojos.
+    """
+
+    def __init__(self, inventario: Inventario, archivo: Optional[str] = None,
+                 intervalo_guardado: float = 0.2, max_resultados: int = 50):
+        """
+        Args:
+            inventario: Inventario a exponer
+            archivo: Archivo JSON donde se guardan los cambios (None para no guardar)
+            intervalo_guardado: Segundos entre guardados en lote
+            max_resultados: Límite de productos devueltos por una búsqueda
+        """
+        self.inventario = inventario
+        self.archivo = archivo
+        self.intervalo_guardado = intervalo_guardado
+        self.max_resultados = max_resultados
+        self._servidor: Optional[asyncio.AbstractServer] = None
+        self._tarea_guardado: Optional[asyncio.Task] = None
+        # Escritura del archivo que corre en otro hilo (a lo sumo una a la vez)
+        self._escritura: Optional[asyncio.Future] = None
+        self._operaciones: Dict[str, Callable[[Dict], object]] = {
+            'agregar': self._agregar,
+            'actualizar': self._actualizar,
+            'eliminar': self._eliminar,
+            'buscar': self._buscar,
+            'buscar_id': self._buscar_id,
+            'despachar': self._despachar,
+            'estadisticas': self._estadisticas,
+        }
+
+    async def iniciar(self, host: str = "127.0.0.1", puerto: int = 8765) -> asyncio.AbstractServer:
+        """Empieza a escuchar conexiones y a guardar en lote"""
+        self._servidor = await asyncio.start_server(self._atender, host, puerto, limit=LIMITE_LINEA)
+        if self.archivo is not None:
+            self._tarea_guardado = asyncio.create_task(self._guardar_periodicamente())
+        return self._servidor
+
+    async def cerrar(self):
+        """Deja de aceptar conexiones y guarda los cambios pendientes"""
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+        if self._tarea_guardado is not None:
+            self._tarea_guardado.cancel()
+            try:
+                await self._tarea_guardado
+            except asyncio.CancelledError:
+                pass
+        await self._guardar()
+
+    async def _atender(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        """Procesa las peticiones de una conexión en orden hasta que el cliente la cierra"""
+        try:
+            while True:
+                try:
+                    linea = await lector.readline()
+                except ValueError:  # la línea supera LIMITE_LINEA
+                    escritor.write(self._codificar({'ok': False, 'error': "Petición demasiado larga"}))
+                    break
+                if not linea:
+                    break
+                escritor.write(self.procesar(linea))
+                # drain() solo espera si el cliente no está leyendo las respuestas
+                await escritor.drain()
+        except ConnectionError:
+            pass
+        finally:
+            escritor.close()
+            try:
+                await escritor.wait_closed()
+            except ConnectionError:
+                pass
+
+    def procesar(self, linea: bytes) -> bytes:
+        """Ejecuta una petición y devuelve la línea de respuesta ya codificada"""
+        respuesta: Dict = {}
+        try:
+            peticion = json.loads(linea)
+            if not isinstance(peticion, dict):
+                raise ErrorPeticion("La petición debe ser un objeto JSON")
+            if 'id' in peticion:
+                respuesta['id'] = peticion['id']
+            operacion = self._operaciones.get(peticion.get('op'))
+            if operacion is None:
+                raise ErrorPeticion(f"Operación desconocida: {peticion.get('op')!r}")
+            respuesta['resultado'] = operacion(peticion)
+            respuesta['ok'] = True
+        except json.JSONDecodeError:
+            respuesta.update(ok=False, error="JSON inválido")
+        except KeyError as e:
+            respuesta.update(ok=False, error=f"Falta el campo {e}")
+        except (ValueError, TypeError) as e:
+            respuesta.update(ok=False, error=str(e))
+        except Exception as e:
+            # Un error inesperado en una petición no debe cortar la conexión ni
+            # las peticiones que el cliente ya envió detrás
+            respuesta.update(ok=False, error=f"Error interno: {e}")
+        return self._codificar(respuesta)
+
+    @staticmethod
+    def _codificar(respuesta: Dict) -> bytes:
+        return json.dumps(respuesta, ensure_ascii=False).encode('utf-8') + b"\n"
+
+    def _agregar(self, peticion: Dict) -> bool:
+        datos = peticion.get('producto')
+        if not isinstance(datos, dict):
+            raise ErrorPeticion("El campo 'producto' debe ser un objeto JSON")
+        producto = Producto(_entero(datos, 'id'), _texto(datos, 'nombre'), _entero(datos, 'cantidad'),
+                            _numero(datos, 'precio'), _texto(datos, 'categoria', opcional=True))
+        return self.inventario.agregar_producto(producto)
+
+    def _actualizar(self, peticion: Dict) -> bool:
+        cantidad = _entero(peticion, 'cantidad', opcional=True)
+        precio = _numero(peticion, 'precio', opcional=True)
+        if (cantidad is not None and cantidad < 0) or (precio is not None and precio < 0):
+            raise ErrorPeticion("La cantidad y el precio no pueden ser negativos")
+        return self.inventario.actualizar_producto(_entero(peticion, 'id_producto'), cantidad, precio)
+
+    def _eliminar(self, peticion: Dict) -> bool:
+        return self.inventario.eliminar_producto(_entero(peticion, 'id_producto'))
+
+    def _buscar(self, peticion: Dict):
+        limite = _entero(peticion, 'limite', opcional=True)
+        limite = self.max_resultados if limite is None else min(limite, self.max_resultados)
+        productos = self.inventario.buscar_por_nombre(_texto(peticion, 'nombre'))
+        return [producto.to_dict() for producto in productos[:max(limite, 0)]]
+
+    def _buscar_id(self, peticion: Dict):
+        producto = self.inventario.buscar_por_id(_entero(peticion, 'id_producto'))
+        return producto.to_dict() if producto is not None else None
+
+    def _despachar(self, peticion: Dict) -> Dict:
+        carrito = peticion.get('carrito')
+        if not isinstance(carrito, list) or not all(isinstance(linea, list) and len(linea) == 2
+                                                    for linea in carrito):
+            raise ErrorPeticion("El campo 'carrito' debe ser una lista de pares [id, unidades]")
+        # Las unidades se validan en despachar (cada línea inválida se informa por separado)
+        return self.inventario.despachar([tuple(linea) for linea in carrito])
+
+    def _estadisticas(self, peticion: Dict) -> Dict:
+        return self.inventario.estadisticas()
+
+    async def _guardar(self):
+        """
+        Guarda los cambios acumulados, si los hay. Los cambios se toman en el event loop
+        (no hay otras operaciones a la vez) y el archivo se escribe en otro hilo.
+        """
+        if self._escritura is not None:
+            # Si cancelan la tarea de guardado la escritura en curso sigue en su hilo:
+            # esperamos a que termine para no escribir dos deltas a la vez
+            await self._escritura
+            self._escritura = None
+        if self.archivo is None or not self.inventario.hay_cambios():
+            return
+        try:
+            escribir = self.inventario.preparar_cambios(self.archivo)
+        except OSError as e:
+            print(f"Error al guardar los cambios del inventario: {e}")
+            return
+        self._escritura = asyncio.get_running_loop().run_in_executor(None, escribir)
+        await asyncio.shield(self._escritura)
+        self._escritura = None
+
+    async def _guardar_periodicamente(self):
+        while True:
+            await asyncio.sleep(self.intervalo_guardado)
+            await self._guardar()
+
+
+async def _ejecutar(host: str, puerto: int, archivo: Optional[str]):
+    inventario = Inventario()
+    if archivo is not None and os.path.exists(archivo):
+        inventario.cargar_desde_archivo(archivo)
+    servidor = ServidorInventario(inventario, archivo)
+    await servidor.iniciar(host, puerto)
+    print(f"Inventario con {len(inventario)} productos escuchando en {host}:{puerto}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await servidor.cerrar()
+
+
+if __name__ == "__main__":
+    argumentos = argparse.ArgumentParser(description="Servidor de inventario de Campitos Store Ecuador")
+    argumentos.add_argument("--host", default="127.0.0.1")
+    argumentos.add_argument("--puerto", type=int, default=8765)
+    argumentos.add_argument("--archivo", default=None, help="JSON donde guardar los cambios")
+    opciones = argumentos.parse_args()
+    try:
+        asyncio.run(_ejecutar(opciones.host, opciones.puerto, opciones.archivo))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,333 @@
+"""
+Formato binario de copia del inventario pensado para abrirse con mmap sin procesar
+todo el archivo.
+
+Estructura (enteros en little-endian):
+    cabecera      magia b"CSEI", versión, tamaño de registro, CRC32 del resto del archivo,
+                  cantidad de productos y desplazamiento de cada sección
+    registros     uno por producto, ordenados por ID: id (q), cantidad (q), precio (d),
+                  código de categoría (i, -1 = sin categoría)
+    desplazamientos  cantidad + 1 enteros (Q) que marcan dónde empieza cada nombre
+    nombres       nombres en UTF-8, uno detrás de otro
+    categorías    arreglo JSON con los nombres de las categorías (el código es la posición)
+"""
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from producto import Producto
+
+MAGIA = b"CSEI"
+VERSION = 1
+
+_CABECERA = struct.Struct("<4sHHIQQQQQ")
+_REGISTRO = struct.Struct("<qqdi4x")
+_DESPLAZAMIENTO = struct.Struct("<Q")
+_ID = struct.Struct("<q")
+
+
+class _Escritor:
+    """Arma las secciones de una copia binaria fila por fila, en orden de ID"""
+
+    def __init__(self, categorias: Iterable[str] = ()):
+        self.categorias: List[str] = list(categorias)
+        self._codigos = {categoria: codigo for codigo, categoria in enumerate(self.categorias)}
+        self.registros = bytearray()
+        self.desplazamientos: List[int] = []
+        self.nombres = bytearray()
+
+    def agregar(self, producto: Producto):
+        """Serializa un producto al final"""
+        codigo = -1
+        if producto.categoria is not None:
+            codigo = self._codigos.get(producto.categoria)
+            if codigo is None:
+                codigo = self._codigos[producto.categoria] = len(self.categorias)
+                self.categorias.append(producto.categoria)
+        self.registros += _REGISTRO.pack(producto.id, producto.cantidad, producto.precio, codigo)
+        self.desplazamientos.append(len(self.nombres))
+        self.nombres += producto.nombre.encode('utf-8')
+
+    def copiar_filas(self, snapshot: 'SnapshotBinario', desde: int, hasta: int):
+        """
+        Copia tal cual los bytes de las filas [desde, hasta) de otra copia, sin decodificarlas.
+        Los códigos de categoría siguen siendo válidos porque la tabla de categorías
+        empieza con la de esa copia.
+        """
+        if desde >= hasta:
+            return
+        mapa = snapshot._mapa
+        self.registros += mapa[snapshot._inicio_registros + desde * _REGISTRO.size:
+                               snapshot._inicio_registros + hasta * _REGISTRO.size]
+        limites = struct.unpack_from(f"<{hasta - desde + 1}Q", mapa,
+                                     snapshot._inicio_desplazamientos + desde * _DESPLAZAMIENTO.size)
+        corrimiento = len(self.nombres) - limites[0]
+        self.desplazamientos.extend(limite + corrimiento for limite in limites[:-1])
+        self.nombres += mapa[snapshot._inicio_nombres + limites[0]:snapshot._inicio_nombres + limites[-1]]
+
+    def imagen(self) -> bytes:
+        """Devuelve la copia completa (cabecera y secciones) tal como se guarda en el archivo"""
+        cantidad = len(self.desplazamientos)
+        desplazamientos = struct.pack(f"<{cantidad + 1}Q", *self.desplazamientos, len(self.nombres))
+        tabla_categorias = json.dumps(self.categorias, ensure_ascii=False).encode('utf-8')
+
+        secciones = (self.registros, desplazamientos, self.nombres, tabla_categorias)
+        crc = 0
+        for seccion in secciones:
+            crc = zlib.crc32(seccion, crc)
+        inicio_registros = _CABECERA.size
+        inicio_desplazamientos = inicio_registros + len(self.registros)
+        inicio_nombres = inicio_desplazamientos + len(desplazamientos)
+        inicio_categorias = inicio_nombres + len(self.nombres)
+        cabecera = _CABECERA.pack(MAGIA, VERSION, _REGISTRO.size, crc, cantidad, inicio_registros,
+                                  inicio_desplazamientos, inicio_nombres, inicio_categorias)
+        return b"".join((cabecera, *secciones))
+
+    def escribir(self, ruta: str):
+        """Escribe el archivo de forma atómica (archivo temporal + rename)"""
+        temporal = ruta + ".tmp"
+        with open(temporal, 'wb') as archivo:
+            archivo.write(self.imagen())
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(temporal, ruta)
+
+
+def escribir_snapshot(productos: Iterable[Producto], ruta: str):
+    """
+    Escribe la copia binaria de los productos de forma atómica (archivo temporal + rename).
+
+    Args:
+        productos: Productos a guardar (se ordenan por ID)
+        ruta: Ruta del archivo binario
+    """
+    _escritor_de(productos).escribir(ruta)
+
+
+def imagen_snapshot(productos: Iterable[Producto]) -> bytes:
+    """
+    Arma la copia binaria de los productos en memoria, sin escribirla en un archivo
+    (por ejemplo, para publicarla en memoria compartida).
+
+    Args:
+        productos: Productos a incluir (se ordenan por ID)
+    """
+    return _escritor_de(productos).imagen()
+
+
+def _escritor_de(productos: Iterable[Producto]) -> _Escritor:
+    escritor = _Escritor()
+    for producto in sorted(productos, key=lambda p: p.id):
+        escritor.agregar(producto)
+    return escritor
+
+
+def escribir_snapshot_combinado(base: 'SnapshotBinario', cambiados: Dict[int, Producto],
+                                eliminados: Set[int], ruta: str):
+    """
+    Escribe una copia nueva a partir de otra copia más los cambios hechos sobre ella.
+    Las filas que no cambiaron se copian en bloque con sus bytes originales; solo los
+    productos de `cambiados` se vuelven a serializar.
+
+    Args:
+        base: Copia abierta de la que se parte. No debe estar en `ruta`: en Windows no
+            se puede reemplazar un archivo mientras está mapeado (ver
+            InventarioPerezoso.guardar_snapshot_binario)
+        cambiados: Productos nuevos o que reemplazan a su fila de la copia, por ID
+        eliminados: IDs de la copia que no deben aparecer en la nueva
+        ruta: Ruta del archivo binario a escribir
+    """
+    escritor = _Escritor(base.categorias)
+    fila = 0
+    for id_producto in sorted(cambiados.keys() | eliminados):
+        hasta = base._primera_fila_desde(id_producto, fila)
+        escritor.copiar_filas(base, fila, hasta)
+        fila = hasta
+        if fila < len(base) and base.id_en(fila) == id_producto:
+            fila += 1  # la fila original queda reemplazada o eliminada
+        producto = cambiados.get(id_producto)
+        if producto is not None:
+            escritor.agregar(producto)
+    escritor.copiar_filas(base, fila, len(base))
+    escritor.escribir(ruta)
+
+
+class SnapshotBinario:
+    """
+    Copia binaria abierta con mmap. Solo se lee la cabecera al abrir; cada registro
+    y cada nombre se decodifica cuando se pide, y un ID se encuentra con búsqueda
+    binaria porque los registros están ordenados.
+
+    También puede leerse una copia que ya está en memoria (ver desde_memoria).
+    """
+
+    def __init__(self, ruta: str, verificar: bool = True):
+        """
+        Args:
+            ruta: Ruta del archivo binario
+            verificar: Si es True se comprueba el CRC32 (recorre el archivo una vez, sin decodificarlo)
+
+        Raises:
+            ValueError: Si el archivo no tiene el formato esperado o está dañado.
+        """
+        self.ruta: Optional[str] = ruta
+        self._mapa: Union[mmap.mmap, memoryview, None] = None
+        self._archivo = open(ruta, 'rb')
+        try:
+            self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._archivo.close()
+            raise ValueError("El archivo binario está vacío")
+        try:
+            self._leer_cabecera(verificar)
+        except Exception:
+            self.cerrar()
+            raise
+
+    @classmethod
+    def desde_memoria(cls, memoria, verificar: bool = True) -> 'SnapshotBinario':
+        """
+        Abre una copia que ya está en memoria, sin copiarla: los registros y nombres
+        se leen directo de `memoria` (bytes, memoryview o el buffer de una memoria
+        compartida), que no debe cambiar mientras la copia esté abierta.
+
+        Raises:
+            ValueError: Si los datos no tienen el formato esperado o están dañados.
+        """
+        snapshot = object.__new__(cls)
+        snapshot.ruta = None
+        snapshot._archivo = None
+        snapshot._mapa = memoryview(memoria)
+        try:
+            snapshot._leer_cabecera(verificar)
+        except Exception:
+            snapshot.cerrar()
+            raise
+        return snapshot
+
+    def _leer_cabecera(self, verificar: bool):
+        if len(self._mapa) < _CABECERA.size:
+            raise ValueError("El archivo binario está incompleto")
+        (magia, version, tamano_registro, crc, self._cantidad, self._inicio_registros,
+         self._inicio_desplazamientos, self._inicio_nombres,
+         self._inicio_categorias) = _CABECERA.unpack_from(self._mapa, 0)
+        self._vista_ids: Optional[memoryview] = None
+        if magia != MAGIA:
+            raise ValueError("El archivo no es una copia binaria del inventario")
+        if version != VERSION or tamano_registro != _REGISTRO.size:
+            raise ValueError(f"Versión de copia binaria no soportada: {version}")
+        if verificar:
+            with memoryview(self._mapa) as vista:
+                calculado = zlib.crc32(vista[_CABECERA.size:])
+            if calculado != crc:
+                raise ValueError("La copia binaria está dañada (CRC incorrecto)")
+        self.categorias: List[str] = json.loads(str(self._mapa[self._inicio_categorias:], 'utf-8'))
+
+    def __len__(self) -> int:
+        return self._cantidad
+
+    def registro(self, fila: int) -> Tuple[int, int, float, Optional[str]]:
+        """Devuelve (id, cantidad, precio, categoría) de una fila"""
+        id_producto, cantidad, precio, codigo = _REGISTRO.unpack_from(
+            self._mapa, self._inicio_registros + fila * _REGISTRO.size)
+        return id_producto, cantidad, precio, None if codigo < 0 else self.categorias[codigo]
+
+    def id_en(self, fila: int) -> int:
+        """Devuelve solo el ID de una fila"""
+        return _ID.unpack_from(self._mapa, self._inicio_registros + fila * _REGISTRO.size)[0]
+
+    def nombre(self, fila: int) -> str:
+        """Decodifica el nombre de una fila"""
+        posicion = self._inicio_desplazamientos + fila * _DESPLAZAMIENTO.size
+        inicio, = _DESPLAZAMIENTO.unpack_from(self._mapa, posicion)
+        fin, = _DESPLAZAMIENTO.unpack_from(self._mapa, posicion + _DESPLAZAMIENTO.size)
+        return str(self._mapa[self._inicio_nombres + inicio:self._inicio_nombres + fin], 'utf-8')
+
+    def producto(self, fila: int) -> Producto:
+        """Construye el Producto de una fila (sin validar: los datos vienen de una copia propia)"""
+        id_producto, cantidad, precio, categoria = self.registro(fila)
+        return Producto.desde_datos_confiables(id_producto, self.nombre(fila), cantidad, precio, categoria)
+
+    def _primera_fila_desde(self, id_producto: int, izquierda: int = 0) -> int:
+        """Primera fila a partir de `izquierda` cuyo ID es mayor o igual al dado (búsqueda binaria)"""
+        if sys.byteorder == 'little':
+            if self._vista_ids is None:
+                # Vista de solo los IDs (el primer entero de cada registro), sin copiarlos,
+                # para que bisect haga la búsqueda en C
+                with memoryview(self._mapa) as vista:
+                    registros = vista[self._inicio_registros:self._inicio_desplazamientos]
+                    self._vista_ids = registros.cast('q')[::_REGISTRO.size // _ID.size]
+            return bisect.bisect_left(self._vista_ids, id_producto, izquierda)
+        derecha = self._cantidad
+        while izquierda < derecha:
+            medio = (izquierda + derecha) // 2
+            if self.id_en(medio) < id_producto:
+                izquierda = medio + 1
+            else:
+                derecha = medio
+        return izquierda
+
+    def buscar_fila(self, id_producto: int) -> Optional[int]:
+        """Busca la fila de un ID con búsqueda binaria; None si no está"""
+        fila = self._primera_fila_desde(id_producto)
+        if fila < self._cantidad and self.id_en(fila) == id_producto:
+            return fila
+        return None
+
+    def registros(self) -> Iterator[Tuple[int, int, float, int]]:
+        """
+        Recorre (id, cantidad, precio, código de categoría) de todas las filas sin
+        decodificar nombres; es la forma rápida de sumar cantidades o valores.
+        """
+        with memoryview(self._mapa) as vista:
+            yield from _REGISTRO.iter_unpack(vista[self._inicio_registros:self._inicio_desplazamientos])
+
+    def ids(self) -> Iterator[int]:
+        """Recorre los IDs en orden sin decodificar nombres ni crear productos"""
+        for fila in range(self._cantidad):
+            yield self.id_en(fila)
+
+    def __iter__(self) -> Iterator[Producto]:
+        """Recorre todos los productos en orden de ID, leyendo directo del mapeo sin copiarlo"""
+        vista = memoryview(self._mapa)
+        registros = vista[self._inicio_registros:self._inicio_desplazamientos]
+        desplazamientos = vista[self._inicio_desplazamientos:self._inicio_nombres]
+        nombres = vista[self._inicio_nombres:self._inicio_categorias]
+        limites = _DESPLAZAMIENTO.iter_unpack(desplazamientos)
+        try:
+            inicio, = next(limites)
+            categorias = self.categorias
+            for id_producto, cantidad, precio, codigo in _REGISTRO.iter_unpack(registros):
+                fin, = next(limites)
+                yield Producto.desde_datos_confiables(
+                    id_producto, str(nombres[inicio:fin], 'utf-8'), cantidad, precio,
+                    None if codigo < 0 else categorias[codigo])
+                inicio = fin
+        finally:
+            # Soltamos las vistas para que el mapeo se pueda cerrar
+            del limites
+            for parte in (registros, desplazamientos, nombres, vista):
+                parte.release()
+
+    def cerrar(self):
+        """Libera el mapeo y el archivo (o la vista de la memoria en desde_memoria)"""
+        if getattr(self, '_vista_ids', None) is not None:
+            self._vista_ids.release()
+            self._vista_ids = None
+        if isinstance(self._mapa, memoryview):
+            self._mapa.release()
+        elif self._mapa is not None and not self._mapa.closed:
+            self._mapa.close()
+        if self._archivo is not None:
+            self._archivo.close()
+
+    def __enter__(self) -> 'SnapshotBinario':
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from bitacora import Bitacora, InventarioPersistente
+from producto import Producto
+
+
+@pytest.fixture
+def ruta(tmp_path):
+    return str(tmp_path / "inventario.json")
+
+
+def abrir(ruta: str, **opciones) -> InventarioPersistente:
+    inventario = InventarioPersistente(ruta, **opciones)
+    inventario.abrir()
+    return inventario
+
+
+def test_reabrir_aplica_la_bitacora(ruta):
+    inventario = abrir(ruta, compactar_cada=None)
+    inventario.agregar_producto(Producto(1, "Arroz", 10, 2.5))
+    inventario.agregar_producto(Producto(2, "Leche", 5, 1.2))
+    inventario.actualizar_producto(1, cantidad=7, precio=3.0)
+    inventario.buscar_por_id(2).nombre = "Leche entera"
+    inventario.eliminar_producto(2)
+    inventario.agregar_producto(Producto(3, "Café", 1, 5.0))
+    inventario.cerrar()
+
+    reabierto = abrir(ruta, compactar_cada=None)
+    assert [p.to_dict() for p in reabierto.mostrar_todos()] == [
+        {'id': 1, 'nombre': "Arroz", 'cantidad': 7, 'precio': 3.0, 'categoria': None},
+        {'id': 3, 'nombre': "Café", 'cantidad': 1, 'precio': 5.0, 'categoria': None},
+    ]
+    assert reabierto.estadisticas()['unidades_totales'] == 8
+    reabierto.cerrar()
+
+
+def test_linea_cortada_se_ignora_y_no_se_pega_a_la_siguiente(ruta):
+    inventario = abrir(ruta, compactar_cada=None)
+    inventario.agregar_producto(Producto(1, "Arroz", 10, 2.5))
+    inventario.cerrar()
+    # Corte en medio de una escritura: la última línea queda sin terminar
+    with open(ruta + ".bitacora", 'a', encoding='utf-8') as archivo:
+        archivo.write(json.dumps({'op': 'eliminar', 'id': 1})[:10])
+
+    reabierto = abrir(ruta, compactar_cada=None)
+    assert reabierto.buscar_por_id(1) is not None
+    reabierto.actualizar_producto(1, cantidad=3)
+    reabierto.cerrar()
+
+    assert [entrada['op'] for entrada in Bitacora.leer(ruta + ".bitacora")] == ['agregar', 'actualizar']
+    final = abrir(ruta, compactar_cada=None)
+    assert final.buscar_por_id(1).cantidad == 3
+    final.cerrar()
+
+
+def test_linea_sin_terminar_al_leer(tmp_path):
+    ruta = str(tmp_path / "bitacora")
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        archivo.write('{"op": "eliminar", "id": 1}\n{"op": "elim')
+    assert list(Bitacora.leer(ruta)) == [{'op': 'eliminar', 'id': 1}]
+
+
+def test_compactar_incorpora_la_bitacora_en_la_copia(ruta):
+    inventario = abrir(ruta, compactar_cada=5)
+    for i in range(1, 13):
+        inventario.agregar_producto(Producto(i, f"Producto {i}", i, 1.0))
+    inventario.esperar_compactacion()
+    esperado = [p.to_dict() for p in inventario.mostrar_todos()]
+    inventario.cerrar()
+
+    with open(ruta, encoding='utf-8') as archivo:
+        assert len(json.load(archivo)) >= 10
+    reabierto = abrir(ruta, compactar_cada=None)
+    assert [p.to_dict() for p in reabierto.mostrar_todos()] == esperado
+    reabierto.cerrar()
@@ -0,0 +1,97 @@
+import json
+import os
+
+import pytest
+
+from inventario import Inventario, ruta_delta
+from producto import Producto
+
+
+def crear_inventario() -> Inventario:
+    inventario = Inventario()
+    for i in range(1, 11):
+        inventario.agregar_producto(Producto(i, f"Producto {i}", 10, 1.5 + i, "Granos" if i % 2 else None))
+    return inventario
+
+
+def estado(inventario: Inventario):
+    productos = sorted((producto.to_dict() for producto in inventario.mostrar_todos()),
+                       key=lambda datos: datos['id'])
+    return productos, inventario.estadisticas()
+
+
+@pytest.fixture
+def archivo(tmp_path):
+    return str(tmp_path / "inventario.json")
+
+
+def test_guardar_cambios_escribe_un_delta_que_se_aplica_al_cargar(archivo):
+    inventario = crear_inventario()
+    assert inventario.guardar_cambios(archivo)
+    inventario.actualizar_producto(3, cantidad=99)
+    inventario.eliminar_producto(4)
+    inventario.agregar_producto(Producto(20, "Nuevo", 1, 2.0))
+    assert inventario.guardar_cambios(archivo, consolidar_desde=10)
+    inventario.buscar_por_id(5).nombre = "Renombrado"
+    assert inventario.guardar_cambios(archivo, consolidar_desde=10)
+
+    with open(ruta_delta(archivo), encoding='utf-8') as delta:
+        assert len(delta.readlines()) == 2
+    cargado = Inventario()
+    assert cargado.cargar_desde_archivo(archivo)
+    assert estado(cargado) == estado(inventario)
+    assert not cargado.hay_cambios()
+
+
+def test_delta_con_ultima_linea_cortada(archivo):
+    inventario = crear_inventario()
+    inventario.guardar_cambios(archivo)
+    inventario.actualizar_producto(1, cantidad=50)
+    inventario.guardar_cambios(archivo, consolidar_desde=10)
+    esperado = estado(inventario)
+    # Un corte en medio de la escritura deja una línea sin terminar: se ignora
+    with open(ruta_delta(archivo), 'a', encoding='utf-8') as delta:
+        delta.write(json.dumps({'guardar': [], 'eliminar': [1]})[:15])
+
+    cargado = Inventario()
+    assert cargado.cargar_desde_archivo(archivo)
+    assert estado(cargado) == esperado
+
+
+def test_consolidar_reescribe_la_copia_y_borra_el_delta(archivo):
+    inventario = crear_inventario()
+    inventario.guardar_cambios(archivo)
+    inventario.actualizar_producto(2, precio=9.0)
+    inventario.guardar_cambios(archivo, consolidar_desde=10)
+    inventario.actualizar_producto(2, precio=8.0)
+    assert inventario.guardar_cambios(archivo, consolidar_desde=0)
+    assert not os.path.exists(ruta_delta(archivo))
+    cargado = Inventario()
+    cargado.cargar_desde_archivo(archivo)
+    assert cargado.buscar_por_id(2).precio == 8.0
+
+
+def test_despachar_descuenta_todo_el_carrito():
+    inventario = crear_inventario()
+    resultado = inventario.despachar([(1, 4), (2, 10), (1, 6)])
+    assert resultado['despachado']
+    assert [linea['estado'] for linea in resultado['lineas']] == ['ok', 'ok', 'ok']
+    assert inventario.buscar_por_id(1).cantidad == 0
+    assert inventario.buscar_por_id(2).cantidad == 0
+    assert inventario.estadisticas()['unidades_totales'] == 80
+
+
+@pytest.mark.parametrize("carrito, estado_fallido", [
+    ([(1, 5), (2, 11)], 'sin_stock'),
+    ([(1, 5), (1, 6)], 'sin_stock'),  # las líneas del mismo ID se suman
+    ([(1, 5), (99, 1)], 'no_existe'),
+    ([(1, 5), (2, 0)], 'cantidad_invalida'),
+    ([(1, 5), (2, True)], 'cantidad_invalida'),
+])
+def test_despachar_es_todo_o_nada(carrito, estado_fallido):
+    inventario = crear_inventario()
+    antes = estado(inventario)
+    resultado = inventario.despachar(carrito)
+    assert not resultado['despachado']
+    assert resultado['lineas'][-1]['estado'] == estado_fallido
+    assert estado(inventario) == antes
@@ -0,0 +1,72 @@
+import random
+import sys
+import threading
+
+import pytest
+
+from inventario_concurrente import InventarioConcurrente
+from producto import Producto
+
+PRODUCTOS = 50
+HILOS = 8
+
+
+@pytest.fixture(autouse=True)
+def cambios_de_hilo_frecuentes():
+    """Cambiar de hilo más seguido hace más probable que aparezcan las carreras"""
+    anterior = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    yield
+    sys.setswitchinterval(anterior)
+
+
+def crear(stock: int) -> InventarioConcurrente:
+    inventario = InventarioConcurrente(franjas=8)
+    for i in range(1, PRODUCTOS + 1):
+        inventario.agregar_producto(Producto(i, f"Producto {i}", stock, 1.0))
+    return inventario
+
+
+def en_paralelo(trabajo):
+    hilos = [threading.Thread(target=trabajo, args=(semilla,)) for semilla in range(HILOS)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+
+def test_ajustes_concurrentes_no_pierden_actualizaciones():
+    inventario = crear(stock=0)
+    operaciones = 3_000
+
+    def sumar(semilla: int):
+        azar = random.Random(semilla)
+        for _ in range(operaciones):
+            inventario.ajustar_cantidad(azar.randint(1, PRODUCTOS), 1)
+            if azar.random() < 0.01:
+                inventario.buscar_por_rango_cantidad(0, 10)
+
+    en_paralelo(sumar)
+    total = sum(producto.cantidad for producto in inventario.mostrar_todos())
+    assert total == HILOS * operaciones
+    assert inventario.estadisticas()['unidades_totales'] == total
+
+
+def test_despachos_concurrentes_no_venden_de_mas():
+    stock = 20
+    inventario = crear(stock)
+    vendidas = []
+
+    def vender(semilla: int):
+        azar = random.Random(semilla)
+        total = 0
+        for _ in range(500):
+            carrito = [(azar.randint(1, PRODUCTOS), azar.randint(1, 3)) for _ in range(azar.randint(1, 4))]
+            if inventario.despachar(carrito)['despachado']:
+                total += sum(cantidad for _, cantidad in carrito)
+        vendidas.append(total)
+
+    en_paralelo(vender)
+    restantes = [producto.cantidad for producto in inventario.mostrar_todos()]
+    assert min(restantes) >= 0
+    assert sum(vendidas) + sum(restantes) == stock * PRODUCTOS
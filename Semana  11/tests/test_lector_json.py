@@ -0,0 +1,36 @@
+import io
+import json
+
+import pytest
+
+from lector_json import iterar_arreglo_json
+
+ELEMENTOS = [{"id": 1, "nombre": "Café \"molido\"", "precio": 2.5e-1}, 12345.678e2, "texto, con ] y [",
+             [], {}, None, True, -0.5, {"anidado": [1, [2, {"x": "}"}]]}]
+
+
+def leer(texto: str, tamano_bloque: int):
+    return list(iterar_arreglo_json(io.StringIO(texto), tamano_bloque))
+
+
+@pytest.mark.parametrize("tamano_bloque", [1, 2, 3, 5, 7, 16, 64 * 1024])
+def test_elementos_cortados_por_cualquier_limite_de_bloque(tamano_bloque):
+    texto = json.dumps(ELEMENTOS, ensure_ascii=False, indent=2)
+    assert leer(texto, tamano_bloque) == ELEMENTOS
+
+
+@pytest.mark.parametrize("tamano_bloque", range(1, 12))
+def test_numero_cortado_en_el_limite_no_se_trunca(tamano_bloque):
+    # "2.5e3" leído hasta "2.5" también es un número válido: no debe aceptarse a medias
+    assert leer("[2.5e3, 10, 123456789]", tamano_bloque) == [2500.0, 10, 123456789]
+
+
+@pytest.mark.parametrize("texto", ["[]", "  [ ]  ", "\n[\n]\n"])
+def test_arreglo_vacio(texto):
+    assert leer(texto, 1) == []
+
+
+@pytest.mark.parametrize("texto", ["", "{}", "[1, 2", "[1,, 2]", "[1] 2", "[1 2]"])
+def test_contenido_invalido(texto):
+    with pytest.raises(ValueError):
+        leer(texto, 2)
@@ -0,0 +1,83 @@
+import pytest
+
+from inventario import Inventario
+from inventario_perezoso import InventarioPerezoso
+from producto import Producto
+from snapshot_binario import SnapshotBinario, escribir_snapshot, imagen_snapshot
+
+PRODUCTOS = [
+    Producto(7, "Azúcar morena", 3, 1.8, "Granos"),
+    Producto(1, "Café", 0, 5.5),
+    Producto(300, "Leche \"entera\" 1 L", 1_000_000, 0.99, "Lácteos"),
+    Producto(42, "ñ" * 300, 12, 1234.5, "Granos"),
+]
+
+
+def como_datos(productos):
+    return sorted((producto.to_dict() for producto in productos), key=lambda datos: datos['id'])
+
+
+@pytest.fixture
+def ruta(tmp_path):
+    return str(tmp_path / "inventario.bin")
+
+
+def test_ida_y_vuelta(ruta):
+    escribir_snapshot(PRODUCTOS, ruta)
+    with SnapshotBinario(ruta) as snapshot:
+        assert len(snapshot) == len(PRODUCTOS)
+        assert list(snapshot.ids()) == [1, 7, 42, 300]
+        assert como_datos(snapshot) == como_datos(PRODUCTOS)
+        assert snapshot.producto(snapshot.buscar_fila(42)).nombre == "ñ" * 300
+        assert snapshot.buscar_fila(2) is None
+
+
+def test_desde_memoria_igual_que_el_archivo(ruta):
+    escribir_snapshot(PRODUCTOS, ruta)
+    with SnapshotBinario.desde_memoria(imagen_snapshot(PRODUCTOS)) as snapshot:
+        assert como_datos(snapshot) == como_datos(PRODUCTOS)
+
+
+def test_archivo_danado(ruta):
+    escribir_snapshot(PRODUCTOS, ruta)
+    with open(ruta, 'r+b') as archivo:
+        archivo.seek(-3, 2)
+        archivo.write(b"xyz")
+    with pytest.raises(ValueError):
+        SnapshotBinario(ruta)
+
+
+def test_inventario_guarda_y_carga(ruta):
+    inventario = Inventario()
+    for producto in PRODUCTOS:
+        inventario.agregar_producto(producto)
+    assert inventario.guardar_snapshot_binario(ruta)
+    cargado = Inventario()
+    assert cargado.cargar_snapshot_binario(ruta)
+    assert como_datos(cargado.mostrar_todos()) == como_datos(PRODUCTOS)
+    assert cargado.estadisticas() == inventario.estadisticas()
+
+
+def test_perezoso_reescribe_el_archivo_que_tiene_abierto(ruta):
+    inventario = Inventario()
+    inventario.agregar_lote(Producto(i, f"Producto {i}", i, 1.5) for i in range(1, 501))
+    inventario.guardar_snapshot_binario(ruta)
+
+    perezoso = InventarioPerezoso()
+    assert perezoso.cargar_snapshot_binario(ruta)
+    perezoso.eliminar_producto(5)
+    perezoso.actualizar_producto(7, cantidad=99)
+    perezoso.agregar_producto(Producto(1000, "Nuevo", 1, 2.0))
+    vigente = perezoso.buscar_por_id(7)
+    assert perezoso.guardar_snapshot_binario(ruta)
+    # Sigue leyendo de la copia nueva sin perder los productos que ya tenía en memoria
+    assert perezoso.buscar_por_id(7) is vigente
+    assert perezoso.buscar_por_id(5) is None
+    assert len(perezoso) == 500
+
+    perezoso.eliminar_producto(8)
+    assert perezoso.guardar_snapshot_binario(ruta)
+    cargado = InventarioPerezoso()
+    assert cargado.cargar_snapshot_binario(ruta)
+    assert como_datos(cargado.mostrar_todos()) == como_datos(perezoso.mostrar_todos())
+    assert cargado.buscar_por_id(7).cantidad == 99